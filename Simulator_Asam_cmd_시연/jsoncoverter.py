@@ -14,6 +14,19 @@ def get_TTC(ego_vel,tgr_vel,dist):
     else:
         return dist
 
+def get_graph(values,labels,time_step=0.1):
+    # labels("0_10", "_-4", "8_")의 위쪽 경계로 구간 번호를 한 번에 찾고, 구간별 머문 시간 [s]을 반환
+    # 첫 구간이 0부터 시작하면 0 이하 값은 두 번째 구간에 포함 (chart-server 막대 차트와 동일)
+    # chart-server의 histogram.bin_index와 같은 규칙 - 시뮬레이터 PC에서 이 파일만 따로 실행하고
+    # histogram은 server.service 패키지(riskengine) 안에서만 import되므로 가져다 쓰지 않고 복사해 둠 (규칙을 바꾸면 함께 수정)
+    edges=[float(label.rsplit("_",1)[1]) for label in labels[:-1]]
+    values=np.asarray(values,dtype=np.float64)
+    values=values[~np.isnan(values)]
+    bins=np.searchsorted(edges,values,side="right")
+    if not labels[0].startswith("_"):
+        bins[(bins==0)&(values<=0)]=1
+    return np.round(np.bincount(bins,minlength=len(labels))*time_step,2).tolist()
+
 data=origin["Result"]
 simul_set=data.iloc[:,[0,1]][:7]
 simul_set=simul_set.loc[1:].reset_index()
@@ -76,8 +89,8 @@ Ego_live_table={
 }
 
 Ego_live_graph={
-    "Speed":[],
-    "Acceleration":[],
+    "Speed":get_graph(raw_file["속도  [km/h]"],graph_category["Speed"]),
+    "Acceleration":get_graph(raw_file["가속도  [m/s^2]"],graph_category["Acceleration"]),
     "Headway":[],
     "TTC":[]
 }
@@ -129,6 +142,9 @@ aheaddist_data["EgoFollowDistance"]=raw_dist["앞 차량과의 거리  [m]"].mea
 aheaddist_data["NumberOfConflict"]= len([ttc_data for ttc_data in Ego_live_table["TTC"] if ttc_data<=0.8])
 aheaddist_data["TTC"]= sum(Ego_live_table["TTC"])/len(Ego_live_table["TTC"])
 
+Ego_live_graph["Headway"]=get_graph(raw_dist["앞 차량과의 거리  [m]"],graph_category["Headway"])
+Ego_live_graph["TTC"]=get_graph(Ego_live_table["TTC"],graph_category["TTC"])
+
 final.append(aheaddist_data)
 
 Ego_live_table["Headway"]=[raw_dist["앞 차량과의 거리  [m]"].min(),raw_dist["앞 차량과의 거리  [m]"].mean(),raw_dist["앞 차량과의 거리  [m]"].max()]
@@ -154,11 +170,13 @@ rel_live_table={
     "TTC":Ego_live_table["TTC"]
 }
 
+rel_accel=rel_speed.diff().fillna(0)/0.1
+
 rel_live_graph={
-    "Speed":[],
-    "Acceleration":[],
-    "Headway":[],
-    "TTC":[]
+    "Speed":get_graph(rel_speed,graph_category["Speed"]),
+    "Acceleration":get_graph(rel_accel,graph_category["Acceleration"]),
+    "Headway":Ego_live_graph["Headway"],
+    "TTC":Ego_live_graph["TTC"]
 }
 
 final.append(rel_live_table)
@@ -0,0 +1,39 @@
+import argparse
+import os
+import sys
+import time
+
+from server.service import batch
+
+# 📌 기본 입력 디렉토리 (Excel 파일 저장 위치)
+DATA_DIRECTORY = os.path.join(os.path.dirname(__file__), "server", "data")
+
+
+def print_result(result):
+    if result["error"]:
+        print(f"❌ {result['base_name']} 실패: {result['error']}")
+    else:
+        print(f"✅ {result['base_name']} → {result['output']} ({result['seconds']:.2f}s)")
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="디렉토리의 모든 <base>.xlsx + <base>_Raw.xlsx 쌍을 병렬로 JSON 리포트로 변환")
+    parser.add_argument("directory", nargs="?", default=DATA_DIRECTORY, help="엑셀 파일 디렉토리")
+    parser.add_argument("-o", "--output-dir", default="outputs", help="JSON 저장 디렉토리")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="작업 프로세스 수 (기본값: CPU 코어 수)")
+    args = parser.parse_args()
+
+    base_names = batch.discover_pairs(args.directory)
+    print(f"🔍 시나리오 {len(base_names)}개 발견: {args.directory}")
+
+    start = time.perf_counter()
+    results = batch.run_batch(args.directory, args.output_dir, args.workers, base_names, on_result=print_result)
+    failed = [result for result in results if result["error"]]
+
+    print(f"📊 완료: 성공 {len(results) - len(failed)}개, 실패 {len(failed)}개, 총 {time.perf_counter() - start:.2f}s")
+    if len(results) > len(failed):
+        print(f"🧮 전체 요약 (count/min/max/mean/std/p5/p50/p95) → {batch.write_summary(results, args.output_dir)}")
+    for result in failed:
+        print(f"⚠️ {result['base_name']}\n{result.get('traceback', result['error'])}")
+    sys.exit(1 if failed else 0)
@@ -53,6 +53,7 @@ mappingDesciption = {
   "FuelConsumtion": "연료소모량[L]",
   "MTTC" : "가속도를 고려한 TTC",
   "PET" : "운전자가 충돌 지역을 떠나는 시점과 다른 운전자가 해당 지역에 도착하는 시점 사이의 차이",
+  "PET_Count" : "임계 거리(2m) 진입 후 이탈한 PET 이벤트 횟수",
   "Headway" : "차간 간격",
   "DRAC" : "다른 차량과의 충돌을 방지하기 위해 적용해야 하는 최소 제동 Rate",
   "RCRI" : "선행차량과 후행차량의 정지거리를 비교하여 위험조건 판별",
@@ -0,0 +1,58 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from server.service.pet import THRESHOLD_DISTANCE, detect_pet_events
+
+
+def reference_pet(dist, sim_time, threshold: float = THRESHOLD_DISTANCE) -> list:
+    """
+    비교용 순수 파이썬 단일 패스 구현 (detect_pet_events와 같은 진입/이탈 규칙)
+    """
+    result = []
+    entry_time = None
+    for i in range(1, len(dist)):
+        if entry_time is None and dist[i - 1] > threshold and dist[i] <= threshold:
+            entry_time = sim_time[i]
+        elif entry_time is not None and dist[i] > threshold:
+            if sim_time[i] - entry_time > 0:
+                result.append(sim_time[i] - entry_time)
+            entry_time = None
+    return result
+
+
+def synthetic_trace(rows: int = 10 ** 6, seed: int = 0):
+    """
+    임계 거리를 자주 넘나드는 밀집 교통 상황의 합성 거리 데이터
+    """
+    rng = np.random.default_rng(seed)
+    sim_time = np.arange(rows) * 0.1
+    dist = THRESHOLD_DISTANCE + np.cumsum(rng.normal(0, 0.3, rows)) * 0.05 + np.sin(sim_time) * 1.5
+    return dist, sim_time
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="detect_pet_events를 순수 파이썬 구현과 비교 (결과 확인 + 소요 시간)")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10 ** 4, 10 ** 5, 10 ** 6], help="합성 데이터 행 수")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드")
+    args = parser.parse_args()
+
+    failed = False
+    for rows in args.rows:
+        dist, sim_time = synthetic_trace(rows, args.seed)
+
+        start = time.perf_counter()
+        events = detect_pet_events(dist, sim_time)
+        vectorized = time.perf_counter() - start
+
+        start = time.perf_counter()
+        reference = reference_pet(dist.tolist(), sim_time.tolist())
+        loop = time.perf_counter() - start
+
+        same = len(events["pet"]) == len(reference) and np.allclose(events["pet"], reference)
+        failed |= not same
+        print(f"{'✅' if same else '❌'} {rows:>8} rows | {len(events['pet']):>6} PET events | "
+              f"interval {vectorized * 1000:8.2f} ms | python loop {loop * 1000:8.2f} ms")
+    sys.exit(1 if failed else 0)
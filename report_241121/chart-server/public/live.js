@@ -0,0 +1,211 @@
+// 📌 /live/{name}/events 실시간 분석 스트림을 받아 페이지를 제자리에서 갱신
+// 서버는 처음에 전체 상태(snapshot), 이후에는 바뀐 값과 새 차트 점만(delta/end) 보냄
+(function (global) {
+  var SERIES = ["Speed", "Acceleration", "Headway", "TTC"];
+  var CATEGORIES = ["Ego_vehicle", "Around_Vehicle"];
+  // 페이지에 유지할 차트 점 개수 (10 Hz 기준 10분)
+  var MAX_POINTS = 6000;
+
+  function appendPoints(points, delta) {
+    ["frames", "time"].forEach(function (key) {
+      Array.prototype.push.apply(points[key], delta[key]);
+    });
+    CATEGORIES.forEach(function (category) {
+      SERIES.forEach(function (name) {
+        Array.prototype.push.apply(points[category][name], delta[category][name]);
+      });
+    });
+    var extra = points.frames.length - MAX_POINTS;
+    if (extra > 0) {
+      points.frames.splice(0, extra);
+      points.time.splice(0, extra);
+      CATEGORIES.forEach(function (category) {
+        SERIES.forEach(function (name) {
+          points[category][name].splice(0, extra);
+        });
+      });
+    }
+  }
+
+  function mergeDelta(state, delta) {
+    ["frames", "time", "state", "errors", "latency"].forEach(function (key) {
+      state[key] = delta[key];
+    });
+    Object.assign(state.realTimeData, delta.realTimeData || {});
+    state.accidentRiskData.forEach(function (elem) {
+      var changed = (delta.accidentRiskData || {})[elem.title];
+      if (changed) {
+        elem.drivingTime = changed.drivingTime;
+        Object.assign(elem.rows, changed.rows);
+      }
+    });
+    appendPoints(state.points, delta.points);
+  }
+
+  // onUpdate(state, message, type): type은 "snapshot", "delta", "end"
+  function followLive(url, onUpdate) {
+    if (!url || !global.EventSource) return null;
+    var state = null;
+    var source = new EventSource(url);
+
+    source.addEventListener("snapshot", function (event) {
+      state = JSON.parse(event.data);
+      onUpdate(state, state, "snapshot");
+      if (state.state === "finished") source.close();
+    });
+    ["delta", "end"].forEach(function (type) {
+      source.addEventListener(type, function (event) {
+        var message = JSON.parse(event.data);
+        mergeDelta(state, message);
+        onUpdate(state, message, type);
+        if (type === "end") source.close();
+      });
+    });
+    return source;
+  }
+
+  function element(tag, text, className) {
+    var node = document.createElement(tag);
+    if (text !== undefined) node.textContent = text;
+    if (className) node.className = className;
+    return node;
+  }
+
+  function formatValue(value) {
+    if (typeof value === "boolean") return value ? "True" : "False";
+    return value === undefined || value === null ? "" : String(value);
+  }
+
+  // 실시간 표/지표/차트 - snapshot에서 한 번 만들고 이후에는 값이 바뀐 셀과 차트만 갱신
+  function LiveView(target, mappingTitle, mappingDesciption) {
+    var status = null;
+    var realtimeCells = {};
+    var riskCells = {};
+    var charts = [];
+
+    function build(state) {
+      Array.prototype.slice.call(target.querySelectorAll(".live-content")).forEach(function (node) {
+        node.remove();
+      });
+      var content = element("div", undefined, "live-content");
+      status = element("p", "", "live-status");
+      content.appendChild(status);
+
+      realtimeCells = {};
+      Object.keys(state.realTimeData).forEach(function (category) {
+        content.appendChild(element("h3", category));
+        var table = document.createElement("table");
+        var headRow = document.createElement("tr");
+        [""].concat(SERIES).forEach(function (title) {
+          headRow.appendChild(element("th", title));
+        });
+        table.appendChild(headRow);
+        realtimeCells[category] = state.realTimeData[category].map(function (row) {
+          var tr = document.createElement("tr");
+          var cells = row.map(function (value) {
+            var td = element("td", formatValue(value));
+            tr.appendChild(td);
+            return td;
+          });
+          table.appendChild(tr);
+          return cells;
+        });
+        content.appendChild(table);
+      });
+
+      riskCells = {};
+      state.accidentRiskData.forEach(function (elem) {
+        content.appendChild(element("h3", mappingTitle[elem.title] || elem.title));
+        var table = document.createElement("table");
+        var headRow = document.createElement("tr");
+        ["Metrics", "Description", "Value", "Ego Driving time[s]"].forEach(function (title) {
+          headRow.appendChild(element("th", title));
+        });
+        table.appendChild(headRow);
+        var keys = Object.keys(elem.rows);
+        riskCells[elem.title] = { rows: {} };
+        keys.forEach(function (key, index) {
+          var tr = document.createElement("tr");
+          tr.appendChild(element("td", key));
+          tr.appendChild(element("td", mappingDesciption[key]));
+          riskCells[elem.title].rows[key] = tr.appendChild(element("td", formatValue(elem.rows[key])));
+          if (index === 0) {
+            var time = element("td", formatValue(elem.drivingTime));
+            time.setAttribute("rowspan", keys.length);
+            riskCells[elem.title].drivingTime = tr.appendChild(time);
+          }
+          table.appendChild(tr);
+        });
+        content.appendChild(table);
+      });
+
+      charts = [];
+      CATEGORIES.forEach(function (category) {
+        content.appendChild(element("h3", category));
+        var row = element("div", undefined, "real-data-charts");
+        SERIES.forEach(function (name) {
+          var chartDiv = element("div", undefined, "chart-container");
+          var canvas = document.createElement("canvas");
+          chartDiv.appendChild(canvas);
+          row.appendChild(chartDiv);
+          charts.push({
+            category: category,
+            name: name,
+            chart: new Chart(canvas, {
+              type: "line",
+              data: { labels: [], datasets: [{ data: [], borderWidth: 1, pointRadius: 0 }] },
+              options: {
+                plugins: { title: { display: true, text: name }, legend: { display: false } },
+                responsive: true,
+                maintainAspectRatio: false,
+                animation: false,
+              },
+            }),
+          });
+        });
+        content.appendChild(row);
+      });
+      target.appendChild(content);
+      target.hidden = false;
+    }
+
+    function updateCells(state, message) {
+      Object.keys(message.realTimeData || {}).forEach(function (category) {
+        (realtimeCells[category] || []).forEach(function (cells, i) {
+          cells.forEach(function (td, j) {
+            td.textContent = formatValue(state.realTimeData[category][i][j]);
+          });
+        });
+      });
+      Object.keys(message.accidentRiskData || {}).forEach(function (title) {
+        var cells = riskCells[title];
+        var changed = message.accidentRiskData[title];
+        if (!cells) return;
+        Object.keys(changed.rows).forEach(function (key) {
+          if (cells.rows[key]) cells.rows[key].textContent = formatValue(changed.rows[key]);
+        });
+        if (cells.drivingTime) cells.drivingTime.textContent = formatValue(changed.drivingTime);
+      });
+    }
+
+    function updateCharts(state) {
+      charts.forEach(function (entry) {
+        var data = entry.chart.data;
+        data.labels = state.points.time;
+        data.datasets[0].data = state.points[entry.category][entry.name];
+        entry.chart.update("none");
+      });
+    }
+
+    return function update(state, message, type) {
+      if (type === "snapshot") build(state);
+      else updateCells(state, message);
+      updateCharts(state);
+      status.textContent = (state.state === "finished" ? "실행 종료" : "실행 중") + " · 프레임 " + state.frames +
+        " · 시뮬레이션 시간 " + formatValue(state.time) + "s";
+    };
+  }
+
+  global.followLive = followLive;
+  global.LiveView = LiveView;
+})(window);
@@ -0,0 +1,52 @@
+// 📌 /report/{base_name}/chartData.bin 응답을 typed array로 변환 (숫자 파싱 없음)
+// 형식: "RSER" + uint32 버전 + uint32 헤더 길이 + JSON 헤더 + (8바이트 정렬) 값 영역
+(function (global) {
+  var ARRAY_TYPES = {
+    float32: Float32Array,
+    float64: Float64Array,
+    uint32: Uint32Array,
+  };
+
+  function padded(size) {
+    return Math.ceil(size / 8) * 8;
+  }
+
+  function decodeSeries(buffer) {
+    var view = new DataView(buffer);
+    var magic = String.fromCharCode(view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3));
+    if (magic !== "RSER") {
+      throw new Error("시계열 바이너리 형식이 아닙니다.");
+    }
+    var headerSize = view.getUint32(8, true);
+    var header = JSON.parse(new TextDecoder("utf-8").decode(new Uint8Array(buffer, 12, headerSize)));
+    var base = padded(12 + headerSize);
+    var ArrayType = ARRAY_TYPES[header.dtype];
+    // 샘플 번호(x)는 정수 배열 (값은 NaN이 그대로 들어 있음)
+    var XArrayType = ARRAY_TYPES[header.x_dtype || "uint32"];
+
+    var result = {};
+    header.series.forEach(function (entry) {
+      // 값 버퍼는 8바이트 정렬이므로 복사 없이 바로 typed array로 감쌈
+      var y = new ArrayType(buffer, base + entry.offset, entry.length);
+      var value = y;
+      if (entry.x_offset !== undefined) {
+        value = { x: new XArrayType(buffer, base + entry.x_offset, entry.length), y: y };
+      }
+      result[entry.category] = result[entry.category] || {};
+      result[entry.category][entry.name] = value;
+    });
+    return result;
+  }
+
+  function fetchSeries(url) {
+    return fetch(url).then(function (response) {
+      if (!response.ok) {
+        throw new Error("시계열 데이터를 불러오지 못했습니다. (" + response.status + ")");
+      }
+      return response.arrayBuffer();
+    }).then(decodeSeries);
+  }
+
+  global.decodeSeries = decodeSeries;
+  global.fetchSeries = fetchSeries;
+})(window);
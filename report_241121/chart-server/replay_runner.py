@@ -0,0 +1,62 @@
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+
+from server.service import live
+from server.service import sheetcache
+
+# 📌 기본 입력 디렉토리 (Excel 파일 저장 위치)
+DATA_DIRECTORY = os.path.join(os.path.dirname(__file__), "server", "data")
+
+
+def replay(raw_path: str, scenario: str, host: str, port: int, speed: float):
+    """
+    기록된 Raw 엑셀을 시뮬레이터처럼 0.1초 프레임 단위로 실시간 분석 서버에 전송
+    speed: 재생 배속 (0이면 기다리지 않고 바로 전송)
+    """
+    frames = live.frames_from_raw(sheetcache.read_sheets(raw_path, ["Speed", "Distnace"]))
+    with socket.create_connection((host, port)) as connection:
+        stream = connection.makefile("wb")
+        stream.write((json.dumps({"scenario": scenario}) + "\n").encode("utf-8"))
+        stream.flush()
+
+        start = time.perf_counter()
+        first_time = None
+        count = 0
+        for frame in frames:
+            first_time = frame["time"] if first_time is None else first_time
+            if speed > 0:
+                delay = (frame["time"] - first_time) / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            stream.write((json.dumps(frame) + "\n").encode("utf-8"))
+            stream.flush()
+            count += 1
+        return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="기록된 <base>_Raw.xlsx를 실시간 분석 서버(LIVE_PORT)로 재생")
+    parser.add_argument("base_name", help="시나리오 이름 (<base>_Raw.xlsx)")
+    parser.add_argument("-d", "--directory", default=DATA_DIRECTORY, help="엑셀 파일 디렉토리")
+    parser.add_argument("--host", default=live.LIVE_HOST, help="실시간 분석 서버 주소")
+    parser.add_argument("--port", type=int, default=live.LIVE_PORT, help="실시간 분석 서버 포트")
+    parser.add_argument("--speed", type=float, default=1.0, help="재생 배속 (0이면 최대 속도)")
+    args = parser.parse_args()
+
+    raw_path = os.path.join(args.directory, f"{args.base_name}_Raw.xlsx")
+    if not os.path.exists(raw_path):
+        print(f"❌ 파일을 찾을 수 없습니다: {raw_path}")
+        sys.exit(1)
+
+    print(f"▶️ 재생 시작: {args.base_name} → {args.host}:{args.port} (x{args.speed})")
+    start = time.perf_counter()
+    try:
+        sent = replay(raw_path, args.base_name, args.host, args.port, args.speed)
+    except ConnectionRefusedError:
+        print(f"❌ 실시간 분석 서버에 연결할 수 없습니다: {args.host}:{args.port}")
+        sys.exit(1)
+    print(f"✅ {sent} 프레임 전송 완료 ({time.perf_counter() - start:.2f}s)")
@@ -1,35 +1,62 @@
+import asyncio
+import hashlib
 import os
+from urllib.parse import quote
 from fastapi import FastAPI, Request
-from fastapi.responses import FileResponse, JSONResponse, HTMLResponse
+from fastapi.responses import FileResponse, JSONResponse, HTMLResponse, PlainTextResponse, RedirectResponse, Response, \
+    StreamingResponse
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from .service import jsonconverter as jsc
+from pydantic import BaseModel
+from .service import binarychart
+from .service import compute
+from .service import downsample
+from .service import live
+from .service import metrics
+from .service import reportmodel
+from .service import resultbuilder
+from .service import snapshot
+from .service.jobs import jobs
+from .service.registry import scenarios
 import time
 import traceback
 
+class GZipExceptEventsMiddleware(GZipMiddleware):
+    """
+    이벤트 스트림(/events)은 압축하지 않음 - 압축 버퍼에 쌓이면 이벤트가 늦게 전달됨
+    """
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].endswith("/events"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
 app = FastAPI(docs_url=None, redoc_url=None)
-templates = Jinja2Templates(directory="templates")
+# 📌 JSON/바이너리 응답 압축 (작은 응답은 그대로)
+app.add_middleware(GZipExceptEventsMiddleware, minimum_size=1024)
+
+# 📌 템플릿/정적 파일 디렉토리 (실행 위치와 상관없이 chart-server 기준)
+ROOT_DIR = os.path.join(os.path.dirname(__file__), "..")
+templates = Jinja2Templates(directory=os.path.join(ROOT_DIR, "templates"))
+# 📌 tojson 필터도 리포트와 같은 JSON 인코더 사용 (orjson이 있으면 orjson)
+templates.env.policies["json.dumps_function"] = resultbuilder.dumps
 
 # 📌 다운로드할 파일이 있는 디렉토리 설정
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 
-# 📌 환경 변수에서 base_name 가져오기
+# 📌 기본 시나리오 (선택) - 설정하면 `/`에서 해당 리포트로 이동
 base_name = os.getenv("BASE_NAME")
-fzp_base_name = os.getenv("FZP_BASE_NAME")
 
-if not base_name:
-    print("❌ BASE_NAME 환경 변수가 설정되지 않았습니다.")
-    raise ValueError("🚨 BASE_NAME 환경 변수가 없습니다. watchdog_runner.py에서 제대로 전달되었는지 확인하세요.")
-
-# 📌 `.fzp`, `.xlsx`, `_Raw.xlsx` 파일 목록 가져오기
+# 📌 서버 시작 시 DATA_DIR에 이미 있는 엑셀 파일 쌍 등록 (이후 쌍은 watchdog_runner.py가 등록)
 try:
-    available_files = os.listdir(DATA_DIR) if os.path.exists(DATA_DIR) else []
-    print(f"📂 존재하는 파일 목록: {available_files}")  # 디버깅 로그 추가
+    registered = scenarios.scan(DATA_DIR)
+    print(f"📂 등록된 시나리오: {registered}")
 except Exception as e:
-    print("🔥 파일 목록을 가져오는 중 오류 발생!")
+    print("🔥 시나리오 목록을 가져오는 중 오류 발생!")
     print(traceback.format_exc())
-    available_files = []
-    
+
 # 📌 `mappingDesciption` 가져오기 (ImportError 예외 처리)
 try:
     from mock.mappingDescription import mappingDesciption
@@ -44,48 +71,384 @@ except ImportError:
     print("⚠️ Warning: mappingTitle을 불러올 수 없습니다. 기본값으로 설정합니다.")
     mappingTitle = {}
 
-@app.get("/", response_class=HTMLResponse)
-async def result(request: Request):
+# 📌 페이지 렌더링 입력(템플릿, 매핑) 버전 - 바뀌면 정적 스냅샷을 다시 만듦
+with open(os.path.join(ROOT_DIR, "templates", "index.html"), "rb") as template_file:
+    RENDER_VERSION = hashlib.sha256(template_file.read() + resultbuilder.dumps(
+        [mappingDesciption, mappingTitle], sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+# 📌 시뮬레이터 프레임을 받는 실시간 분석 소켓 (replay_runner.py로 기록된 실행을 재생 가능)
+live_server = None
+
+
+@app.on_event("startup")
+def start_live_server():
+    global live_server
     try:
-        start = time.time()
-        data = jsc.json_converter(f"{base_name}.xlsx", f"{base_name}_Raw.xlsx")
-        data.save_to_json(output_dir="outputs")
+        live_server = live.LiveServer(live.live_sessions).start()
+        print(f"📡 실시간 분석 소켓 대기 중: {live.LIVE_HOST}:{live.LIVE_PORT}")
+    except OSError as e:
+        print(f"⚠️ Warning: 실시간 분석 소켓을 열 수 없습니다. ({e})")
+
 
-        # 📌 다운로드할 파일 리스트 (파일 존재 여부 체크 후 안전하게 처리)
-        fzp_file = f"{fzp_base_name}.fzp" if f"{fzp_base_name}.fzp" in available_files else None
-        xlsx_file = f"{base_name}.xlsx" if f"{base_name}.xlsx" in available_files else None
-        raw_xlsx_file = f"{base_name}_Raw.xlsx" if f"{base_name}_Raw.xlsx" in available_files else None
+@app.on_event("shutdown")
+def stop_live_server():
+    if live_server is not None:
+        live_server.stop()
 
-        # 파일이 없을 경우 로그 출력
-        if not xlsx_file or not raw_xlsx_file:
-            print(f"⚠️ 다운로드할 xlsx 파일을 찾을 수 없습니다. base_name: {base_name}")
+# 📌 요청마다 실행된 계산 단계와 전체 처리 시간을 Server-Timing 헤더로 전달
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    start = time.perf_counter()
+    with metrics.collect() as timings:
+        response = await call_next(request)
+    total = time.perf_counter() - start
 
-        result_html = templates.TemplateResponse("index.html", {
-            "request": request,
+    # 라우트 경로 템플릿 (마운트된 정적 파일은 마운트 경로)
+    route = request.scope.get("route")
+    path = route.path if route else request.scope.get("root_path") or "unmatched"
+    labels = {"method": request.method, "route": path, "status": response.status_code}
+    metrics.inc("report_http_requests_total", **labels)
+    metrics.inc("report_http_request_seconds_total", total, **labels)
+    response.headers["Server-Timing"] = metrics.server_timing(timings, total)
+    return response
+
+@app.get("/", response_class=HTMLResponse)
+async def index(request: Request):
+    # 기본 시나리오가 지정되어 있으면 바로 리포트로 이동
+    if base_name and base_name in scenarios:
+        return RedirectResponse(url=f"/report/{base_name}")
+    return templates.TemplateResponse("scenarios.html", {
+        "request": request,
+        "scenarios": scenarios.names(),
+    })
+
+# 📌 브라우저가 따로 불러오는 리포트 섹션 (리포트 버전이 같으면 ETag로 304 응답)
+SECTIONS = reportmodel.SECTIONS
+
+# 버전이 붙은 URL은 내용이 바뀌지 않으므로 오래 캐시, 버전 없는 URL은 매번 재검증
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+
+def not_registered(base_name: str):
+    return JSONResponse(status_code=404, content={"message": f"시나리오 '{base_name}'이 등록되지 않았습니다."})
+
+
+def server_error(e: Exception):
+    print("🔥 서버에서 예외 발생! 🔥")
+    print(traceback.format_exc())
+    return JSONResponse(
+        status_code=500,
+        content={"message": "서버 내부 오류 발생", "detail": str(e)},
+    )
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match", "")
+    return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+
+def cached_json(request: Request, etag: str, requested_version: str, current: str, build,
+                encode=resultbuilder.dumps, media_type: str = "application/json"):
+    """
+    ETag가 같으면 304, 아니면 encode(build())를 반환 (기본은 JSON)
+    requested_version: URL의 ?v= 값 (현재 버전과 같을 때만 immutable 캐시 허용)
+    """
+    cache_control = IMMUTABLE_CACHE if requested_version == current else REVALIDATE_CACHE
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=encode(build()), media_type=media_type, headers=headers)
+
+
+def api_urls(base_name: str, version: str) -> dict:
+    """
+    페이지가 데이터를 불러올 서버 API 주소
+    """
+    prefix = f"/report/{quote(base_name)}"
+    return {
+        "section": f"{prefix}/sections/{{name}}?v={version}",
+        "preview": f"{prefix}/chartData.bin?points={downsample.CHART_POINTS}&v={version}",
+        "raw": f"{prefix}/chartData?category={{category}}&v={version}",
+        "live": f"/live/{quote(base_name)}/events",
+    }
+
+
+def render_report(base_name: str, scenario, urls: dict) -> str:
+    # 📌 다운로드할 파일 리스트 (파일 존재 여부 체크 후 안전하게 처리)
+    download_files = scenario.download_files
+
+    # 파일이 없을 경우 로그 출력
+    if not download_files["xlsx"] or not download_files["raw_xlsx"]:
+        print(f"⚠️ 다운로드할 xlsx 파일을 찾을 수 없습니다. base_name: {base_name}")
+
+    with metrics.timer("render"):
+        return templates.get_template("index.html").render({
             "data": {
-                "simulationSettings": data.get_simulationSetting() or {},
-                "realTimeData": data.get_realtimeMetrics() or {},
                 "mappingDesciption": mappingDesciption,  # 기본값 있음
                 "mappingTitle": mappingTitle,  # 기본값 있음
-                "accidentRiskData": data.get_accidentRiskRateMetrics() or {},
-                "otherData": data.get_otherMetrics() or {},
-                "chartData": data.get_chartData() or {},
-            },
-            "download_files": {
-                "fzp": fzp_file if fzp_file else "",
-                "xlsx": xlsx_file if xlsx_file else "",
-                "raw_xlsx": raw_xlsx_file if raw_xlsx_file else "",
             },
-            "base_name": base_name
+            "download_files": download_files,
+            "base_name": base_name,
+            "urls": urls,
         })
-        return result_html
+
+
+def write_snapshot(base_name: str) -> str:
+    """
+    리포트 페이지와 데이터 파일을 outputs/snapshots/<base_name>/<버전>/에 정적 파일로 저장
+    (watchdog_runner.py가 파일 쌍을 처리할 때 호출)
+    """
+    scenario = scenarios.get(base_name)
+    report = reportmodel.get_report(base_name, output_dir="outputs", data_dir=scenario.data_dir)
+    snapshot_version = snapshot.version(report.version, RENDER_VERSION)
+    prefix = f"/snapshots/{quote(base_name)}/{snapshot_version}"
+    urls = {
+        "section": f"{prefix}/sections/{{name}}.json",
+        "preview": f"{prefix}/chartData.bin",
+        "raw": f"/report/{quote(base_name)}/chartData?category={{category}}&v={report.version}",
+        "live": f"/live/{quote(base_name)}/events",
+    }
+    files = {f"sections/{name}.json": resultbuilder.dumps(report.sections[name]) for name in SECTIONS}
+    files["chartData.bin"] = binarychart.encode(report.sections["chartData"], "float32", downsample.CHART_POINTS)
+    return snapshot.write(base_name, snapshot_version, render_report(base_name, scenario, urls), files)
+
+
+@app.get("/report/{base_name}", response_class=HTMLResponse)
+async def result(request: Request, base_name: str):
+    scenario = scenarios.get(base_name)
+    if scenario is None:
+        return not_registered(base_name)
+    try:
+        # 📌 분석 결과는 페이지에서 섹션별로 비동기 요청 - 여기서는 입력 파일 버전만 계산
+        version = reportmodel.current_version(base_name, scenario.data_dir)
+
+        # 📌 현재 입력/템플릿으로 만든 정적 스냅샷이 있으면 파일 그대로 전송
+        path = snapshot.find(base_name, snapshot.version(version, RENDER_VERSION))
+        if path:
+            return FileResponse(path, media_type="text/html", headers={"Cache-Control": REVALIDATE_CACHE})
+
+        return HTMLResponse(render_report(base_name, scenario, api_urls(base_name, version)))
     except Exception as e:
-        print("🔥 서버에서 예외 발생! 🔥")
-        print(traceback.format_exc())
-        return JSONResponse(
-            status_code=500,
-            content={"message": "서버 내부 오류 발생", "detail": str(e)},
-        )
+        return server_error(e)
+
+@app.get("/report/{base_name}/sections/{section}")
+async def report_section(request: Request, base_name: str, section: str, v: str = None):
+    scenario = scenarios.get(base_name)
+    if scenario is None:
+        return not_registered(base_name)
+    if section not in SECTIONS:
+        return JSONResponse(status_code=404, content={"message": f"'{section}' 섹션이 없습니다."})
+    try:
+        # 입력 파일이 그대로면 리포트를 계산/조회하지 않고 304
+        current = reportmodel.current_version(base_name, scenario.data_dir)
+        etag = f'"{current}-{section}"'
+        if etag_matches(request, etag):
+            return cached_json(request, etag, v, current, None)
+        # 요청한 섹션만 계산 (다른 섹션과 outputs 저장은 실행하지 않음)
+        report = await compute.get_report(base_name, output_dir="outputs", data_dir=scenario.data_dir, sections=[section])
+        return cached_json(request, f'"{report.version}-{section}"', v, report.version,
+                           lambda: report.sections[section])
+    except Exception as e:
+        return server_error(e)
+
+def query_etag(version: str, name: str, request: Request) -> str:
+    query = hashlib.sha256(str(sorted(request.query_params.items())).encode("utf-8")).hexdigest()[:12]
+    return f'"{version}-{name}-{query}"'
+
+
+# 📌 차트 시계열 API (points를 주면 다운샘플링, 없으면 원본)
+@app.get("/report/{base_name}/chartData")
+async def chart_data(request: Request, base_name: str, category: str = None, series: str = None, points: int = None,
+                     method: str = None, v: str = None):
+    scenario = scenarios.get(base_name)
+    if scenario is None:
+        return not_registered(base_name)
+    try:
+        current = reportmodel.current_version(base_name, scenario.data_dir)
+        if etag_matches(request, query_etag(current, "chartData", request)):
+            return cached_json(request, query_etag(current, "chartData", request), v, current, None)
+        report = await compute.get_report(base_name, output_dir="outputs", data_dir=scenario.data_dir, sections=["chartData"])
+        chart = report.sections["chartData"]
+        if category is not None:
+            if category not in chart:
+                return JSONResponse(status_code=404, content={"message": f"'{category}' 데이터가 없습니다."})
+            chart = {category: chart[category]}
+        if series is not None:
+            chart = {name: {series: table[series]} for name, table in chart.items() if series in table}
+        if points is not None:
+            chart = downsample.downsample_chart(chart, points, method)
+        return cached_json(request, query_etag(report.version, "chartData", request), v, report.version, lambda: chart)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"message": str(e)})
+    except Exception as e:
+        return server_error(e)
+
+# 📌 차트 시계열 바이너리 API - little-endian Float32/Float64 버퍼 (브라우저에서 typed array로 바로 사용)
+@app.get("/report/{base_name}/chartData.bin")
+async def chart_data_binary(request: Request, base_name: str, category: str = None, series: str = None,
+                            points: int = None, method: str = None, dtype: str = "float32", v: str = None):
+    scenario = scenarios.get(base_name)
+    if scenario is None:
+        return not_registered(base_name)
+    try:
+        current = reportmodel.current_version(base_name, scenario.data_dir)
+        if etag_matches(request, query_etag(current, "chartData.bin", request)):
+            return cached_json(request, query_etag(current, "chartData.bin", request), v, current, None)
+        report = await compute.get_report(base_name, output_dir="outputs", data_dir=scenario.data_dir, sections=["chartData"])
+        chart = report.sections["chartData"]
+        if category is not None:
+            if category not in chart:
+                return JSONResponse(status_code=404, content={"message": f"'{category}' 데이터가 없습니다."})
+            chart = {category: chart[category]}
+        if series is not None:
+            chart = {name: {series: table[series]} for name, table in chart.items() if series in table}
+        return cached_json(request, query_etag(report.version, "chartData.bin", request), v, report.version,
+                           lambda: chart, lambda data: binarychart.encode(data, dtype, points, method),
+                           binarychart.MEDIA_TYPE)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"message": str(e)})
+    except Exception as e:
+        return server_error(e)
+
+# 📌 확대 구간 API - 시간 구간 [t0, t1]을 픽셀 폭(width)에 맞는 해상도로 반환
+@app.get("/report/{base_name}/window")
+async def chart_window(request: Request, base_name: str, category: str, series: str, t0: float = None,
+                       t1: float = None, width: int = 1000, v: str = None):
+    scenario = scenarios.get(base_name)
+    if scenario is None:
+        return not_registered(base_name)
+    try:
+        current = reportmodel.current_version(base_name, scenario.data_dir)
+        if etag_matches(request, query_etag(current, "window", request)):
+            return cached_json(request, query_etag(current, "window", request), v, current, None)
+        report = await compute.get_report(base_name, output_dir="outputs", data_dir=scenario.data_dir, sections=["chartData"])
+        pyramid = await asyncio.to_thread(report.pyramid, "outputs")
+        window = pyramid.window(category, series, t0, t1, width)
+        return cached_json(request, query_etag(report.version, "window", request), v, report.version, lambda: window)
+    except KeyError:
+        return JSONResponse(status_code=404, content={"message": f"'{category}/{series}' 데이터가 없습니다."})
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"message": str(e)})
+    except Exception as e:
+        return server_error(e)
+
+class JobRequest(BaseModel):
+    base_name: str
+    sections: list = None
+
+
+def job_links(job) -> dict:
+    """
+    끝난 작업의 리포트 페이지, 섹션 API, outputs JSON 주소
+    """
+    if job.report is None:
+        return None
+    urls = api_urls(job.base_name, job.report.version)
+    links = {
+        "report": f"/report/{quote(job.base_name)}",
+        "sections": {name: urls["section"].replace("{name}", name) for name in job.sections or SECTIONS},
+    }
+    # outputs JSON은 전체 리포트를 계산한 경우에만 저장됨
+    if job.report.written:
+        links["json"] = f"/outputs/{quote(job.report.scenario_name)}.json"
+    return links
+
+
+# 📌 리포트 계산 작업 API - 오래 걸리는 리포트는 작업을 넣고 GET /jobs/{id}로 진행 상황 확인
+@app.post("/jobs", status_code=202)
+async def create_job(request: JobRequest):
+    scenario = scenarios.get(request.base_name)
+    if scenario is None:
+        return not_registered(request.base_name)
+    # sections를 주면 그 섹션만 계산, 없으면 전체 계산 + outputs 저장
+    sections = request.sections or None
+    unknown = [name for name in sections or [] if name not in SECTIONS]
+    if unknown:
+        return JSONResponse(status_code=400, content={"message": f"없는 섹션입니다: {unknown}"})
+    try:
+        job = jobs.submit(request.base_name, sections, output_dir="outputs", data_dir=scenario.data_dir)
+        return JSONResponse(status_code=202, content=job.to_dict(job_links(job)),
+                            headers={"Location": f"/jobs/{job.id}"})
+    except Exception as e:
+        return server_error(e)
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        return JSONResponse(status_code=404, content={"message": f"작업 '{job_id}'을 찾을 수 없습니다."})
+    return JSONResponse(content=job.to_dict(job_links(job)), headers={"Cache-Control": REVALIDATE_CACHE})
+
+# 📌 outputs/*.json 다운로드 API
+@app.get("/outputs/{file_name}")
+async def download_output(file_name: str):
+    file_path = os.path.join("outputs", os.path.basename(file_name))
+
+    if file_name.endswith(".json") and os.path.exists(file_path):
+        return FileResponse(path=file_path, filename=file_name, media_type="application/json")
+    else:
+        return JSONResponse(status_code=404, content={"message": f"파일 '{file_name}'을 찾을 수 없습니다."})
+
+# 📌 실시간 분석 API - 실행 중인 시나리오의 실시간/사고위험 지표 (프레임마다 갱신)
+@app.get("/live")
+async def live_list():
+    return JSONResponse(content={"sessions": live.live_sessions.names()})
+
+@app.get("/live/{name}")
+async def live_status(name: str):
+    session = live.live_sessions.get(name)
+    if session is None:
+        return JSONResponse(status_code=404, content={"message": f"'{name}' 실시간 분석이 없습니다."})
+    return JSONResponse(content=resultbuilder.to_native(session.snapshot()), headers={"Cache-Control": REVALIDATE_CACHE})
+
+def sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {resultbuilder.dumps(resultbuilder.to_native(data))}\n\n"
+
+
+# 📌 실시간 분석 이벤트 스트림 (Server-Sent Events)
+# 처음에 전체 상태(snapshot), 이후 interval마다 바뀐 값과 새 차트 점만 묶어서(delta) 전송
+@app.get("/live/{name}/events")
+async def live_events(request: Request, name: str, interval: float = live.PUSH_INTERVAL):
+    if live.live_sessions.get(name) is None:
+        # 204이면 브라우저 EventSource가 재연결하지 않음
+        return Response(status_code=204)
+    interval = max(interval, 0.05)
+    # 변경분은 세션마다 한 번 계산/인코딩해 모든 구독자가 같은 문자열을 받음
+    feed = live.LiveFeed(name, live.live_sessions, encoder=sse, interval=interval)
+
+    async def stream():
+        idle = 0.0
+        while not feed.done:
+            message = feed.next()
+            if message:
+                idle = 0.0
+                yield message
+            elif idle >= 15:
+                # 프록시가 연결을 끊지 않도록 주기적으로 주석 전송
+                idle = 0.0
+                yield ": keep-alive\n\n"
+            if feed.done or await request.is_disconnected():
+                break
+            await asyncio.sleep(interval)
+            idle += interval
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/live/{name}/view", response_class=HTMLResponse)
+async def live_view(request: Request, name: str):
+    return templates.TemplateResponse("live.html", {
+        "request": request,
+        "name": name,
+        "urls": {"live": f"/live/{quote(name)}/events"},
+        "data": {"mappingDesciption": mappingDesciption, "mappingTitle": mappingTitle},
+    })
+
+# 📌 Prometheus 텍스트 형식 지표 (단계별 소요 시간, 행 수, 읽은 바이트, 캐시 적중률)
+@app.get("/metrics")
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 # 📌 파일 다운로드 API
 @app.get("/download/{file_name}")
@@ -97,4 +460,8 @@ async def download_file(file_name: str):
     else:
         return JSONResponse(status_code=404, content={"message": f"파일 '{file_name}'을 찾을 수 없습니다."})
 
-app.mount("/static", StaticFiles(directory="public"), name="public")
+app.mount("/static", StaticFiles(directory=os.path.join(ROOT_DIR, "public")), name="public")
+
+# 📌 정적 리포트 스냅샷 (버전이 경로에 있으므로 내용이 바뀌지 않음)
+os.makedirs(snapshot.SNAPSHOT_DIR, exist_ok=True)
+app.mount("/snapshots", StaticFiles(directory=snapshot.SNAPSHOT_DIR), name="snapshots")
@@ -0,0 +1,256 @@
+import math
+
+import numpy as np
+
+from . import riskengine
+
+# 📌 분위수 스케치의 상대 오차 (0.01이면 반환값이 실제 분위수 값의 ±1% 이내)
+RELATIVE_ACCURACY = 0.01
+# 부호별 최대 버킷 수 (넘으면 0에 가장 가까운 버킷부터 합침)
+MAX_BUCKETS = 2048
+# 이보다 작은 절대값은 0 버킷에 셈
+MIN_VALUE = 1e-9
+
+QUANTILES = {"p5": 0.05, "p50": 0.5, "p95": 0.95}
+
+
+class QuantileSketch():
+    """
+    로그 간격 버킷에 개수만 세는 분위수 스케치 (DDSketch 방식)
+    배열을 한 번에 넣거나 값을 하나씩 넣을 수 있고, 같은 설정의 스케치끼리 합칠 수 있음
+    """
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY, max_buckets: int = MAX_BUCKETS):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = dict()
+        self.negative = dict()
+        self.zero = 0
+        self.count = 0
+
+    def _index(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _value(self, index: int) -> float:
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def add(self, value: float):
+        if not math.isfinite(value):
+            return
+        if value > MIN_VALUE:
+            store = self.positive
+        elif value < -MIN_VALUE:
+            store, value = self.negative, -value
+        else:
+            self.zero += 1
+            self.count += 1
+            return
+        index = self._index(value)
+        store[index] = store.get(index, 0) + 1
+        self.count += 1
+        if len(store) > self.max_buckets:
+            self._collapse(store)
+
+    def add_array(self, values: np.ndarray):
+        values = values[np.isfinite(values)]
+        zero = np.abs(values) <= MIN_VALUE
+        self.zero += int(np.count_nonzero(zero))
+        self.count += len(values)
+        for store, part in ((self.positive, values[values > MIN_VALUE]), (self.negative, -values[values < -MIN_VALUE])):
+            if not len(part):
+                continue
+            indexes, counts = np.unique(np.ceil(np.log(part) / self._log_gamma).astype(np.int64), return_counts=True)
+            for index, count in zip(indexes.tolist(), counts.tolist()):
+                store[index] = store.get(index, 0) + count
+            if len(store) > self.max_buckets:
+                self._collapse(store)
+
+    def _collapse(self, store: dict):
+        indexes = sorted(store)
+        extra = len(indexes) - self.max_buckets + 1
+        merged = sum(store.pop(index) for index in indexes[:extra])
+        target = indexes[extra]
+        store[target] = store.get(target, 0) + merged
+
+    def merge(self, other: "QuantileSketch"):
+        if other.gamma != self.gamma:
+            raise ValueError("상대 오차가 다른 스케치는 합칠 수 없습니다.")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for index, count in other_store.items():
+                store[index] = store.get(index, 0) + count
+            if len(store) > self.max_buckets:
+                self._collapse(store)
+        self.zero += other.zero
+        self.count += other.count
+        return self
+
+    def quantile(self, q: float):
+        """
+        q 분위수 근사값 (값이 없으면 None)
+        """
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self._value(index)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self._value(index)
+        return self._value(max(self.positive)) if self.positive else 0.0
+
+
+class Accumulator():
+    """
+    개수/최소/최대/합계/평균·분산(Welford)과 분위수 스케치를 한 번의 순회로 계산하는 누적기
+    배열(add_array) 또는 값 스트림(add)으로 넣고, 청크/프로세스별 누적기를 merge로 합침
+    NaN(숫자가 아닌 값 포함)은 통계에서 빼고 invalid로 셈
+    """
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY):
+        self.count = 0
+        self.invalid = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    @classmethod
+    def from_array(cls, values) -> "Accumulator":
+        accumulator = cls()
+        accumulator.add_array(values)
+        return accumulator
+
+    def add(self, value: float):
+        value = float(value)
+        if math.isnan(value):
+            self.invalid += 1
+            return
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.sketch.add(value)
+
+    def add_array(self, values):
+        """
+        배열 하나를 청크로 보고 벡터 연산으로 통계를 구한 뒤 합침
+        """
+        values = riskengine.to_array(values)
+        valid = ~np.isnan(values)
+        chunk = Accumulator(self.sketch.relative_accuracy)
+        chunk.invalid = len(values) - int(np.count_nonzero(valid))
+        values = values[valid]
+        if len(values):
+            chunk.count = len(values)
+            chunk.total = float(np.sum(values))
+            chunk.mean = chunk.total / chunk.count
+            with np.errstate(invalid="ignore"):
+                chunk.m2 = float(np.sum((values - chunk.mean) ** 2))
+            chunk.min = float(np.min(values))
+            chunk.max = float(np.max(values))
+            chunk.sketch.add_array(values)
+        return self.merge(chunk)
+
+    def merge(self, other: "Accumulator"):
+        """
+        다른 누적기를 합침 (평균/분산은 Chan의 병렬 공식)
+        """
+        self.invalid += other.invalid
+        if not other.count:
+            return self
+        if not self.count:
+            self.count, self.total, self.mean, self.m2 = other.count, other.total, other.mean, other.m2
+        else:
+            count = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+            self.count = count
+            self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance) if self.variance > 0 else 0.0
+
+    def quantile(self, q: float):
+        """
+        q 분위수 근사값 (스케치 버킷 대표값을 실제 최소/최대 범위로 제한)
+        """
+        value = self.sketch.quantile(q)
+        return None if value is None else min(max(value, self.min), self.max)
+
+    def row(self, digits: int = 2) -> list:
+        """
+        [min, max, avg] (realTimeData 표의 한 열, 값이 없으면 0)
+        """
+        if not self.count:
+            return [0, 0, 0]
+        return [round(self.min, digits), round(self.max, digits), round(self.total / self.count, digits)]
+
+    def summary(self, digits: int = 2) -> dict:
+        """
+        {count, invalid, min, max, mean, std, p5, p50, p95} (chartSummary, 배치 요약)
+        """
+        result = {"count": self.count, "invalid": self.invalid}
+        if not self.count:
+            return result
+        values = {"min": self.min, "max": self.max, "mean": self.total / self.count, "std": self.std}
+        values.update({name: self.quantile(q) for name, q in QUANTILES.items()})
+        for name, value in values.items():
+            result[name] = round(value, digits) if value is not None and math.isfinite(value) else None
+        return result
+
+
+def table_statistics(table: dict) -> dict:
+    """
+    {지표: 시계열} 테이블의 지표별 누적기
+    """
+    return {name: Accumulator.from_array(values) for name, values in table.items()}
+
+
+def chart_statistics(chart_data: dict) -> dict:
+    """
+    chartData ({구분: {지표: 시계열}})의 구분/지표별 누적기
+    """
+    return {category: table_statistics(table) for category, table in chart_data.items()}
+
+
+def merge_statistics(target: dict, other: dict) -> dict:
+    """
+    {구분: {지표: 누적기}} 두 개를 합침 (target을 갱신해서 반환)
+    """
+    for category, table in other.items():
+        merged = target.setdefault(category, dict())
+        for name, accumulator in table.items():
+            if name in merged:
+                merged[name].merge(accumulator)
+            else:
+                merged[name] = Accumulator().merge(accumulator)
+    return target
+
+
+def summarize(statistics: dict, digits: int = 2) -> dict:
+    return {category: {name: accumulator.summary(digits) for name, accumulator in table.items()}
+            for category, table in statistics.items()}
@@ -0,0 +1,102 @@
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from . import accumulator
+from . import jsonconverter as jsc
+from . import reportmodel
+from . import resultbuilder
+
+RAW_SUFFIX = "_Raw.xlsx"
+
+
+def discover_pairs(directory: str = jsc.DATA_DIR) -> list:
+    """
+    directory에서 <base>.xlsx와 <base>_Raw.xlsx가 모두 있는 시나리오 이름 목록 (이름 순)
+    엑셀 임시 파일(~$로 시작)은 제외
+    """
+    names = {name for name in os.listdir(directory) if name.endswith(".xlsx") and not name.startswith("~$")}
+    pairs = []
+    for name in names:
+        if name.endswith(RAW_SUFFIX):
+            continue
+        base_name = name[:-len(".xlsx")]
+        if f"{base_name}{RAW_SUFFIX}" in names:
+            pairs.append(base_name)
+    return sorted(pairs)
+
+
+def run_one(base_name: str, data_dir: str = jsc.DATA_DIR, output_dir: str = "outputs") -> dict:
+    """
+    시나리오 하나의 리포트를 계산해 outputs/<ScenarioName>.json으로 저장 (작업 프로세스에서 실행)
+    실패해도 예외를 던지지 않고 결과 dict에 오류를 기록
+    """
+    start = time.perf_counter()
+    result = {"base_name": base_name, "output": None, "error": None, "statistics": None}
+    try:
+        model = reportmodel.ReportModel.build(base_name, data_dir=data_dir)
+        result["output"] = model.write_json(output_dir)
+        model.write_pyramid(output_dir)
+        result["statistics"] = model.statistics
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_batch(directory: str = jsc.DATA_DIR, output_dir: str = "outputs", workers: int = None,
+              base_names: list = None, on_result=None) -> list:
+    """
+    directory의 모든 시나리오 쌍을 ProcessPoolExecutor로 병렬 변환
+    workers: 작업 프로세스 수 (기본값은 CPU 코어 수)
+    on_result: 시나리오 하나가 끝날 때마다 결과 dict로 호출되는 함수 (진행 상황 출력용)
+    반환값: base_name 순으로 정렬된 결과 dict 목록 (base_name, output, error, seconds, statistics)
+    """
+    directory = os.path.abspath(directory)
+    base_names = base_names if base_names is not None else discover_pairs(directory)
+    if not base_names:
+        return []
+
+    workers = min(workers or os.cpu_count() or 1, len(base_names))
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(run_one, base_name, directory, output_dir): base_name for base_name in base_names}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                # 작업 프로세스가 비정상 종료된 경우 (메모리 부족 등)
+                result = {"base_name": futures[future], "output": None, "error": f"{type(e).__name__}: {e}", "seconds": None,
+                          "statistics": None}
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return sorted(results, key=lambda result: result["base_name"])
+
+
+def aggregate(results: list) -> dict:
+    """
+    성공한 시나리오들의 chartData 누적기를 합친 배치 전체 요약 ({구분: {지표: 요약}})
+    """
+    statistics = dict()
+    for result in results:
+        if result.get("statistics"):
+            accumulator.merge_statistics(statistics, result["statistics"])
+    return accumulator.summarize(statistics)
+
+
+def write_summary(results: list, output_dir: str = "outputs") -> str:
+    """
+    배치 전체 요약과 시나리오별 요약을 outputs/batch_summary.json으로 저장
+    """
+    data = {
+        "scenarios": {result["base_name"]: accumulator.summarize(result["statistics"])
+                      for result in results if result.get("statistics")},
+        "total": aggregate(results),
+    }
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, "batch_summary.json")
+    resultbuilder.dump(data, path)
+    return path
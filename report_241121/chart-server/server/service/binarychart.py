@@ -0,0 +1,87 @@
+import json
+import struct
+
+import numpy as np
+
+from . import downsample
+
+MAGIC = b"RSER"
+FORMAT_VERSION = 2
+MEDIA_TYPE = "application/vnd.report-series"
+
+DTYPES = {"float32": "<f4", "float64": "<f8"}
+
+# 다운샘플링한 샘플 번호(x)는 float32로는 2^24 이후 정확히 표현되지 않으므로 정수로 저장
+X_DTYPE = "uint32"
+
+
+def encode(chart_data: dict, dtype: str = "float32", points: int = None, method: str = None) -> bytes:
+    """
+    chartData ({구분: {지표: 시계열}})를 typed array로 바로 쓸 수 있는 바이너리로 변환
+
+    형식 (little-endian)
+    - 4바이트 "RSER", uint32 형식 버전, uint32 헤더 길이
+    - UTF-8 JSON 헤더: {"dtype", "x_dtype", "series": [{"category", "name", "offset", "length", "x_offset"}]}
+      (offset은 값 영역 시작부터의 바이트 위치, x_offset은 다운샘플링했을 때만 있음)
+    - 헤더 뒤를 8바이트 경계까지 채운 다음부터 값 영역: 8바이트 정렬된 값 버퍼들
+      (값은 dtype, NaN은 그대로 유지 / 샘플 번호는 x_dtype)
+    points: 주면 시계열마다 다운샘플링하고 샘플 번호(x)도 함께 저장
+    """
+    if dtype not in DTYPES:
+        raise ValueError(f"지원하지 않는 dtype입니다: {dtype}")
+    array_dtype = np.dtype(DTYPES[dtype])
+
+    entries = []
+    buffers = []
+    for category, table in chart_data.items():
+        for name, values in table.items():
+            y = np.asarray(values, dtype=np.float64)
+            entry = {"category": category, "name": name, "length": int(len(y))}
+            if points is not None:
+                # 점 선택만 NaN을 0으로 바꾼 값으로 하고 저장하는 값은 원본 그대로
+                index = downsample.select(np.nan_to_num(y, nan=0.0), points, method)
+                entry["length"] = int(len(index))
+                buffers.append((entry, "x_offset", index.astype(np.dtype(X_DTYPE).newbyteorder("<"))))
+                y = y[index]
+            buffers.append((entry, "offset", y.astype(array_dtype)))
+            entries.append(entry)
+
+    position = 0
+    for entry, key, array in buffers:
+        entry[key] = position
+        position += _padded(array.nbytes)
+    header = json.dumps({"dtype": dtype, "x_dtype": X_DTYPE, "series": entries}, ensure_ascii=False).encode("utf-8")
+    prefix_size = len(MAGIC) + 8
+
+    parts = [MAGIC, struct.pack("<II", FORMAT_VERSION, len(header)), header]
+    parts.append(b"\0" * (_padded(prefix_size + len(header)) - prefix_size - len(header)))
+    for _, _, array in buffers:
+        data = array.tobytes()
+        parts.append(data)
+        parts.append(b"\0" * (_padded(len(data)) - len(data)))
+    return b"".join(parts)
+
+
+def decode(payload: bytes) -> dict:
+    """
+    encode 결과를 {구분: {지표: 배열 또는 {"x", "y"}}}로 복원 (검증/파이썬 클라이언트용)
+    """
+    if payload[:4] != MAGIC:
+        raise ValueError("시계열 바이너리 형식이 아닙니다.")
+    _, header_size = struct.unpack_from("<II", payload, 4)
+    header = json.loads(payload[12:12 + header_size].decode("utf-8"))
+    base = _padded(12 + header_size)
+    dtype = np.dtype(DTYPES[header["dtype"]])
+    x_dtype = np.dtype(header.get("x_dtype", X_DTYPE)).newbyteorder("<")
+    result = dict()
+    for entry in header["series"]:
+        y = np.frombuffer(payload, dtype=dtype, count=entry["length"], offset=base + entry["offset"])
+        if "x_offset" in entry:
+            x = np.frombuffer(payload, dtype=x_dtype, count=entry["length"], offset=base + entry["x_offset"])
+            y = {"x": x, "y": y}
+        result.setdefault(entry["category"], dict())[entry["name"]] = y
+    return result
+
+
+def _padded(size: int) -> int:
+    return (size + 7) // 8 * 8
@@ -0,0 +1,35 @@
+import asyncio
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from . import jsonconverter as jsc
+from . import reportmodel
+
+# 📌 리포트 계산에 쓰는 작업 스레드 수 (동시에 계산하는 시나리오 수 상한)
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", 2))
+
+_executor = ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix="report")
+
+
+def submit(base_name: str, output_dir: str = "outputs", data_dir: str = jsc.DATA_DIR,
+           progress=reportmodel.no_progress, sections: list = None):
+    """
+    리포트 계산(reportmodel.get_report)을 작업 스레드에 맡기고 Future 반환
+    sections: 계산할 섹션 (None이면 전체 + outputs 저장)
+    같은 입력의 중복 계산은 reportmodel.get_report가 막음 (입력마다 모델 하나, 모델 잠금 안에서 계산)
+    """
+    # 요청의 context(Server-Timing 단계 목록)를 작업 스레드로 전달
+    context = contextvars.copy_context()
+    return _executor.submit(context.run, reportmodel.get_report, base_name, output_dir, data_dir, progress, sections)
+
+
+async def get_report(base_name: str, output_dir: str = "outputs", data_dir: str = jsc.DATA_DIR, sections: list = None):
+    """
+    이벤트 루프를 막지 않고 리포트를 가져옴
+    sections가 이미 계산되어 있으면 바로 반환, 아니면 작업 스레드에서 그 섹션만 계산한 결과를 기다림
+    """
+    model = reportmodel.cached_report(base_name, data_dir, sections)
+    if model is not None:
+        return model
+    return await asyncio.wrap_future(submit(base_name, output_dir, data_dir, sections=sections))
@@ -0,0 +1,105 @@
+import os
+
+import numpy as np
+
+# 📌 브라우저로 보내는 시계열 하나당 최대 점 개수
+CHART_POINTS = int(os.getenv("CHART_POINTS", 1000))
+
+# 📌 다운샘플링 방식: "lttb" (Largest-Triangle-Three-Buckets) 또는 "minmax" (구간별 최소/최대)
+CHART_DOWNSAMPLE = os.getenv("CHART_DOWNSAMPLE", "lttb")
+
+# 방식별 최소 점 개수 (lttb는 첫/마지막 점 + 구간 하나, minmax는 구간 하나의 최소/최대)
+MIN_POINTS = {"lttb": 3, "minmax": 2}
+
+
+def lttb(x, y, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets로 선택한 점의 인덱스 (첫 점과 마지막 점 포함)
+    구간마다 이전 선택점, 다음 구간 평균점과 이루는 삼각형 넓이가 가장 큰 점을 선택
+    """
+    _check_points(threshold, "lttb")
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if threshold >= n:
+        return np.arange(n)
+
+    # 첫/마지막 점을 제외한 n - 2개를 threshold - 2개 구간으로 나눔
+    every = (n - 2) / (threshold - 2)
+    edges = np.floor(np.arange(threshold - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+    # 다음 구간 평균점 (마지막 구간은 마지막 점)
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])[1:]
+    avg_y = np.append(sums_y / counts, y[-1])[1:]
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - avg_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax(y, threshold: int) -> np.ndarray:
+    """
+    구간마다 최소/최대값 점을 남긴 인덱스 (시간 순, 최대 threshold개)
+    급제동 같은 짧은 극값이 사라지지 않음
+    """
+    _check_points(threshold, "minmax")
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    buckets = threshold // 2
+    if threshold >= n:
+        return np.arange(n)
+
+    edges = (np.arange(buckets + 1) * n / buckets).astype(np.int64)
+    selected = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        bucket = y[lo:hi]
+        selected.extend(sorted({lo + int(np.argmin(bucket)), lo + int(np.argmax(bucket))}))
+    return np.asarray(selected, dtype=np.int64)
+
+
+def _check_points(points: int, method: str):
+    """
+    점 개수가 방식의 최소값보다 작으면 ValueError (원본 시계열 전체를 보내지 않도록)
+    """
+    if points < MIN_POINTS[method]:
+        raise ValueError(f"points는 {MIN_POINTS[method]} 이상이어야 합니다. ({method}, points={points})")
+
+
+def select(y, points: int = None, method: str = None) -> np.ndarray:
+    """
+    시계열에서 남길 샘플 인덱스 (points개 이하)
+    """
+    points = CHART_POINTS if points is None else points
+    method = method or CHART_DOWNSAMPLE
+    if method == "minmax":
+        return minmax(y, points)
+    if method == "lttb":
+        return lttb(np.arange(len(y)), y, points)
+    raise ValueError(f"지원하지 않는 다운샘플링 방식입니다: {method}")
+
+
+def downsample(values, points: int = None, method: str = None) -> dict:
+    """
+    시계열을 points개 이하로 줄여 {"x": 샘플 인덱스, "y": 값} 반환 (NaN은 0.0)
+    """
+    y = np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0.0)
+    index = select(y, points, method)
+    return {"x": index.tolist(), "y": y[index].tolist()}
+
+
+def downsample_chart(chart_data: dict, points: int = None, method: str = None) -> dict:
+    """
+    chartData 전체 ({구분: {지표: 시계열}})를 같은 구조로 다운샘플링
+    """
+    return {category: {name: downsample(values, points, method) for name, values in table.items()}
+            for category, table in chart_data.items()}
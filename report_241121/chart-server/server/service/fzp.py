@@ -0,0 +1,208 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# 한 번에 읽는 레코드 수
+CHUNK_ROWS = 200_000
+
+# 정수/문자열 열 (나머지는 float64, 빈 값은 NaN)
+INT_COLUMNS = {"NO", "LANE\\LINK\\NO", "LANE\\INDEX", "QENCOUNT"}
+STRING_COLUMNS = {"DRIVSTATE", "LNCHG", "VEHTYPE\\NAME", "LANE\\LINK\\NAME"}
+
+# 네트워크 TTC 상한 [s] (앞 차량이 없거나 가까워지지 않을 때)
+TTC_CAP = 5.0
+
+_DESCRIPTION = re.compile(r"^\* ([^:\s]+): ([^,]+), (.*?)(?: \[([^\]]*)\])?$")
+
+
+class FzpSchema():
+    """
+    Vissim .fzp ($VISION) 파일 헤더 정보
+    columns: $VEHICLE 줄의 열 이름 목록
+    descriptions: 열 이름별 {"short", "long", "unit"}
+    header_lines: 데이터 시작 전 헤더 줄 수
+    """
+    def __init__(self, columns: list, descriptions: dict, header_lines: int, table: str = None):
+        self.columns = columns
+        self.descriptions = descriptions
+        self.header_lines = header_lines
+        self.table = table
+
+    def dtype(self, column: str):
+        if column in STRING_COLUMNS:
+            return object
+        if column in INT_COLUMNS:
+            return np.int64
+        return np.float64
+
+
+def read_schema(path: str) -> FzpSchema:
+    """
+    $VISION 헤더를 읽어 열 구성을 파악 (데이터 부분은 읽지 않음)
+    """
+    descriptions = dict()
+    table = None
+    with open(path, "r", encoding="utf-8-sig", errors="replace") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.rstrip("\r\n")
+            if line.startswith("$VEHICLE:"):
+                columns = line[len("$VEHICLE:"):].split(";")
+                return FzpSchema(columns, descriptions, line_number, table)
+            if line.startswith("* Table:"):
+                table = line[len("* Table:"):].strip()
+                continue
+            match = _DESCRIPTION.match(line)
+            if match:
+                name, short, long, unit = match.groups()
+                descriptions[name] = {"short": short, "long": long, "unit": unit}
+    raise ValueError(f"'{path}'에서 $VEHICLE 헤더를 찾을 수 없습니다.")
+
+
+def iter_records(path: str, columns: list = None, chunk_rows: int = CHUNK_ROWS):
+    """
+    차량 레코드를 chunk_rows 단위로 읽어 {열 이름: numpy 배열} dict로 yield
+    columns: 읽을 열 목록 (기본값은 전체) - 필요한 열만 읽어 메모리 사용을 줄임
+    """
+    schema = read_schema(path)
+    columns = columns or schema.columns
+    missing = [column for column in columns if column not in schema.columns]
+    if missing:
+        raise KeyError(f".fzp 파일에 {missing} 열이 없습니다.")
+
+    reader = pd.read_csv(path, sep=";", header=None, names=schema.columns, usecols=columns,
+                         skiprows=schema.header_lines, encoding="utf-8-sig", chunksize=chunk_rows,
+                         dtype={column: schema.dtype(column) for column in columns}, skip_blank_lines=True)
+    for frame in reader:
+        yield {column: frame[column].to_numpy() for column in columns}
+
+
+def _concat(parts: list) -> dict:
+    return {column: np.concatenate([part[column] for part in parts]) for column in parts[0]}
+
+
+def _take(records: dict, mask) -> dict:
+    return {column: values[mask] for column, values in records.items()}
+
+
+class _VehicleState():
+    """
+    청크 경계를 넘어 차량별 직전 속도/시간을 유지 (가속도 계산용)
+    """
+    def __init__(self):
+        self.speed = np.full(1024, np.nan)
+        self.time = np.full(1024, np.nan)
+
+    def _grow(self, size: int):
+        if size > len(self.speed):
+            capacity = max(size, len(self.speed) * 2)
+            self.speed = np.concatenate([self.speed, np.full(capacity - len(self.speed), np.nan)])
+            self.time = np.concatenate([self.time, np.full(capacity - len(self.time), np.nan)])
+
+    def acceleration(self, number, sim_time, speed) -> np.ndarray:
+        """
+        차량별 이전 레코드 대비 가속도 [m/s^2] (이전 레코드가 없으면 NaN)
+        """
+        self._grow(int(number.max()) + 1)
+        order = np.lexsort((sim_time, number))
+        number_s, time_s, speed_s = number[order], sim_time[order], speed[order]
+
+        prev_speed = np.empty(len(order))
+        prev_time = np.empty(len(order))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = number_s[1:] != number_s[:-1]
+        prev_speed[~first] = speed_s[:-1][~first[1:]]
+        prev_time[~first] = time_s[:-1][~first[1:]]
+        prev_speed[first] = self.speed[number_s[first]]
+        prev_time[first] = self.time[number_s[first]]
+
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = number_s[1:] != number_s[:-1]
+        self.speed[number_s[last]] = speed_s[last]
+        self.time[number_s[last]] = time_s[last]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            accel_s = (speed_s - prev_speed) / 3.6 / (time_s - prev_time)
+        accel = np.empty(len(order))
+        accel[order] = accel_s
+        return accel
+
+
+def _step_ttc(records: dict, ttc_cap: float) -> np.ndarray:
+    """
+    같은 시점, 같은 링크/차로에서 바로 앞(위치가 큰) 차량을 선행차로 보고 차량별 TTC 계산
+    """
+    sim_time = records["SIMSEC"]
+    link = records["LANE\\LINK\\NO"]
+    lane = records["LANE\\INDEX"]
+    pos = records["POS"]
+    speed = records["SPEED"]
+
+    order = np.lexsort((pos, lane, link, sim_time))
+    same_group = np.zeros(len(order), dtype=bool)
+    same_group[:-1] = ((sim_time[order][1:] == sim_time[order][:-1]) & (link[order][1:] == link[order][:-1])
+                       & (lane[order][1:] == lane[order][:-1]))
+
+    lead_speed = np.full(len(order), np.nan)
+    lead_speed[:-1] = speed[order][1:]
+    closing = (speed[order] - lead_speed) / 3.6
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ttc_s = np.where(same_group & (closing > 0), records["FOLLOWDISTNET"][order] / closing, ttc_cap)
+    ttc = np.empty(len(order))
+    ttc[order] = np.minimum(ttc_s, ttc_cap)
+    return ttc
+
+
+NETWORK_COLUMNS = ["SIMSEC", "NO", "LANE\\LINK\\NO", "LANE\\INDEX", "POS", "SPEED", "FOLLOWDISTNET"]
+
+
+def step_means(records: dict, accel: np.ndarray, ttc_cap: float = TTC_CAP) -> dict:
+    """
+    레코드(NETWORK_COLUMNS)와 차량별 가속도로 시점별 평균 속도/가속도/TTC 계산
+    (가속도가 없는 레코드는 평균에서 제외)
+    """
+    ttc = _step_ttc(records, ttc_cap)
+    steps, inverse = np.unique(records["SIMSEC"], return_inverse=True)
+    count = np.bincount(inverse, minlength=len(steps))
+    has_accel = ~np.isnan(accel)
+    accel_count = np.bincount(inverse, weights=has_accel, minlength=len(steps))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        acceleration = np.bincount(inverse, weights=np.where(has_accel, accel, 0.0), minlength=len(steps)) / accel_count
+    return {
+        "SIMSEC": steps,
+        "Speed": np.bincount(inverse, weights=records["SPEED"], minlength=len(steps)) / count,
+        "Acceleration": acceleration,
+        "TTC": np.bincount(inverse, weights=ttc, minlength=len(steps)) / count,
+    }
+
+
+def network_series(path: str, chunk_rows: int = CHUNK_ROWS, ttc_cap: float = TTC_CAP) -> dict:
+    """
+    .fzp 레코드를 스트리밍으로 읽어 시뮬레이션 시점별 네트워크 평균 속도/가속도/TTC 계산
+    청크 끝의 시점은 모든 차량이 모일 때까지 다음 청크로 넘겨서 계산
+    """
+    state = _VehicleState()
+    result = {"SIMSEC": [], "Speed": [], "Acceleration": [], "TTC": []}
+    carry = None
+
+    def flush(records: dict):
+        accel = state.acceleration(records["NO"], records["SIMSEC"], records["SPEED"])
+        for name, values in step_means(records, accel, ttc_cap).items():
+            result[name].append(values)
+
+    for chunk in iter_records(path, NETWORK_COLUMNS, chunk_rows):
+        records = _concat([carry, chunk]) if carry else chunk
+        if len(records["SIMSEC"]) == 0:
+            continue
+        tail = records["SIMSEC"] == records["SIMSEC"][-1]
+        carry = _take(records, tail)
+        if (~tail).any():
+            flush(_take(records, ~tail))
+
+    if carry and len(carry["SIMSEC"]):
+        flush(carry)
+
+    series = {name: np.concatenate(values) if values else np.empty(0) for name, values in result.items()}
+    # 첫 등장 시점의 차량만 있는 구간은 가속도 0으로 처리
+    series["Acceleration"] = np.nan_to_num(series["Acceleration"], nan=0.0)
+    return series
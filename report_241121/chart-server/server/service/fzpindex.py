@@ -0,0 +1,221 @@
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from . import fzp
+from . import sheetcache
+
+# 📌 .fzp 레코드와 보조 인덱스를 저장하는 캐시 디렉토리
+CACHE_DIR = os.getenv("FZP_INDEX_DIR", os.path.join(os.path.dirname(__file__), "..", "..", ".cache", "fzp"))
+
+KEY_COLUMNS = ["NO", "SIMSEC", "LANE\\LINK\\NO", "LANE\\INDEX"]
+META_FILE = "meta.json"
+
+
+def _column_file(column: str) -> str:
+    return "col_" + column.replace("\\", "__") + ".npy"
+
+
+def build_index(path: str, directory: str, chunk_rows: int = fzp.CHUNK_ROWS):
+    """
+    .fzp 레코드를 차량 번호/시간 순으로 정렬한 열 파일과 보조 인덱스를 directory에 저장
+    1차: 키 열만 읽어 정렬 순서 계산, 2차: 전체 열을 읽어 정렬된 위치에 기록 (메모리에는 키 열만 유지)
+
+    저장 내용
+    - col_<열>.npy: (NO, SIMSEC) 순으로 정렬된 레코드 (문자열 열은 코드 + meta의 categories)
+    - vehicle_no.npy / vehicle_start.npy: 차량 번호별 행 범위 [start[i], start[i+1])
+    - link_order.npy: (LINK, LANE, SIMSEC) 순서의 행 번호, link_key_*.npy: 그 순서의 키 값
+    """
+    schema = fzp.read_schema(path)
+    key_columns = [column for column in KEY_COLUMNS if column in schema.columns]
+    if len(key_columns) != len(KEY_COLUMNS):
+        raise KeyError(f".fzp 파일에 인덱스용 열 {KEY_COLUMNS}이 모두 있어야 합니다.")
+
+    # 1차: 키 열만 읽어서 정렬 순서 계산
+    keys = {column: [] for column in KEY_COLUMNS}
+    for chunk in fzp.iter_records(path, KEY_COLUMNS, chunk_rows):
+        for column in KEY_COLUMNS:
+            keys[column].append(chunk[column])
+    keys = {column: np.concatenate(values) if values else np.empty(0) for column, values in keys.items()}
+    total = len(keys["NO"])
+
+    order = np.lexsort((keys["SIMSEC"], keys["NO"]))
+    position = np.empty(total, dtype=np.int64)
+    position[order] = np.arange(total)
+
+    parent = os.path.dirname(directory)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, suffix=".tmp")
+    try:
+        # 2차: 모든 열을 정렬된 위치에 기록
+        categories = dict()
+        outputs = dict()
+        for column in schema.columns:
+            dtype = np.int32 if schema.dtype(column) is object else schema.dtype(column)
+            outputs[column] = np.lib.format.open_memmap(os.path.join(tmp_dir, _column_file(column)), mode="w+",
+                                                        dtype=dtype, shape=(total,))
+            if schema.dtype(column) is object:
+                categories[column] = dict()
+
+        offset = 0
+        for chunk in fzp.iter_records(path, None, chunk_rows):
+            size = len(chunk["NO"])
+            target = position[offset:offset + size]
+            for column, values in chunk.items():
+                if column in categories:
+                    codes = categories[column]
+                    values = np.array([codes.setdefault("" if value != value else str(value), len(codes))
+                                       for value in values], dtype=np.int32)
+                outputs[column][target] = values
+            offset += size
+        for output in outputs.values():
+            output.flush()
+        del outputs
+
+        # 차량 번호별 행 범위
+        sorted_no = keys["NO"][order]
+        vehicle_no, vehicle_start = np.unique(sorted_no, return_index=True)
+        np.save(os.path.join(tmp_dir, "vehicle_no.npy"), vehicle_no)
+        np.save(os.path.join(tmp_dir, "vehicle_start.npy"), np.append(vehicle_start, total))
+
+        # 링크/차로/시간 순서
+        link = keys["LANE\\LINK\\NO"][order]
+        lane = keys["LANE\\INDEX"][order]
+        sim_time = keys["SIMSEC"][order]
+        link_order = np.lexsort((sim_time, lane, link))
+        np.save(os.path.join(tmp_dir, "link_order.npy"), link_order)
+        np.save(os.path.join(tmp_dir, "link_key_link.npy"), link[link_order])
+        np.save(os.path.join(tmp_dir, "link_key_lane.npy"), lane[link_order])
+        np.save(os.path.join(tmp_dir, "link_key_time.npy"), sim_time[link_order])
+
+        meta = {
+            "source": os.path.abspath(path),
+            "rows": int(total),
+            "columns": schema.columns,
+            "categories": {column: list(codes) for column, codes in categories.items()},
+            "descriptions": schema.descriptions,
+        }
+        with open(os.path.join(tmp_dir, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        if os.path.isdir(directory):
+            shutil.rmtree(directory, ignore_errors=True)
+        os.rename(tmp_dir, directory)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+class FzpIndex():
+    """
+    정렬된 .fzp 레코드(메모리 매핑)와 차량/링크 보조 인덱스
+    차량 궤적과 링크/차로/시간 구간 조회를 이진 탐색(O(log n))으로 처리
+    """
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.columns = self.meta["columns"]
+        self.vehicle_no = self._load("vehicle_no.npy")
+        self.vehicle_start = self._load("vehicle_start.npy")
+        self.link_order = self._load("link_order.npy")
+        self.link_key = {name: self._load(f"link_key_{name}.npy") for name in ("link", "lane", "time")}
+        self._data = dict()
+
+    @classmethod
+    def open(cls, path: str, cache_dir: str = None):
+        """
+        .fzp 파일의 인덱스를 열고, 없거나 원본이 바뀌었으면 새로 만듦
+        """
+        cache_dir = cache_dir or CACHE_DIR
+        os.makedirs(cache_dir, exist_ok=True)
+        directory = os.path.join(cache_dir, sheetcache.content_key(path, cache_dir))
+        if not os.path.exists(os.path.join(directory, META_FILE)):
+            build_index(path, directory)
+        return cls(directory)
+
+    def _load(self, name: str) -> np.ndarray:
+        return np.load(os.path.join(self.directory, name), mmap_mode="r")
+
+    def column(self, column: str) -> np.ndarray:
+        if column not in self._data:
+            self._data[column] = self._load(_column_file(column))
+        return self._data[column]
+
+    def _gather(self, rows, columns: list = None) -> dict:
+        """
+        행 번호(slice 또는 배열)의 열 값을 dict로 반환 (문자열 열은 원래 값으로 복원)
+        """
+        result = dict()
+        for column in columns or self.columns:
+            values = np.asarray(self.column(column)[rows])
+            if column in self.meta["categories"]:
+                values = np.asarray(self.meta["categories"][column], dtype=object)[values]
+            result[column] = values
+        return result
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    def vehicles(self) -> np.ndarray:
+        return np.asarray(self.vehicle_no)
+
+    def vehicle_rows(self, no: int) -> slice:
+        """
+        차량 번호의 정렬된 행 범위
+        """
+        i = np.searchsorted(self.vehicle_no, no)
+        if i >= len(self.vehicle_no) or self.vehicle_no[i] != no:
+            return slice(0, 0)
+        return slice(int(self.vehicle_start[i]), int(self.vehicle_start[i + 1]))
+
+    def vehicle(self, no: int, columns: list = None, t0: float = None, t1: float = None) -> dict:
+        """
+        차량 하나의 궤적 (시간 순), t0/t1로 시간 구간 제한 가능
+        """
+        rows = self.vehicle_rows(no)
+        if t0 is not None or t1 is not None:
+            sim_time = self.column("SIMSEC")[rows]
+            lo = np.searchsorted(sim_time, t0, side="left") if t0 is not None else 0
+            hi = np.searchsorted(sim_time, t1, side="right") if t1 is not None else len(sim_time)
+            rows = slice(rows.start + lo, rows.start + hi)
+        return self._gather(rows, columns)
+
+    def _range(self, key: str, lo: int, hi: int, value) -> tuple:
+        """
+        정렬된 키 구간 [lo, hi)에서 value와 같은 값의 범위
+        """
+        keys = self.link_key[key][lo:hi]
+        return lo + int(np.searchsorted(keys, value, side="left")), lo + int(np.searchsorted(keys, value, side="right"))
+
+    def link_rows(self, link: int, lane: int = None, t0: float = None, t1: float = None) -> np.ndarray:
+        """
+        링크(와 차로)에서 시간 구간 [t0, t1]에 있는 레코드의 행 번호 (차로, 시간 순)
+        """
+        lo, hi = self._range("link", 0, len(self.link_order), link)
+        if lane is not None:
+            lanes = [lane]
+        else:
+            lanes = []
+            position = lo
+            while position < hi:
+                lanes.append(self.link_key["lane"][position])
+                position = self._range("lane", lo, hi, self.link_key["lane"][position])[1]
+
+        ranges = []
+        for lane_value in lanes:
+            lane_lo, lane_hi = self._range("lane", lo, hi, lane_value)
+            keys = self.link_key["time"]
+            time_lo = lane_lo + (int(np.searchsorted(keys[lane_lo:lane_hi], t0, side="left")) if t0 is not None else 0)
+            time_hi = lane_lo + (int(np.searchsorted(keys[lane_lo:lane_hi], t1, side="right")) if t1 is not None else lane_hi - lane_lo)
+            ranges.append(np.asarray(self.link_order[time_lo:time_hi]))
+        return np.concatenate(ranges) if ranges else np.empty(0, dtype=np.int64)
+
+    def link(self, link: int, lane: int = None, t0: float = None, t1: float = None, columns: list = None) -> dict:
+        """
+        링크/차로/시간 구간의 모든 차량 레코드
+        """
+        return self._gather(self.link_rows(link, lane, t0, t1), columns)
@@ -0,0 +1,118 @@
+import json
+import os
+
+import numpy as np
+
+from . import riskengine
+
+# 지표별 구간 경계와 라벨 (templates/index.html 막대 차트와 같은 구간)
+RANGE_TYPE = {
+    "Speed": [10, 20, 30, 40],
+    "Acceleration": [-4, 0, 4, 8],
+    "Headway": [20, 40, 60, 80],
+    "TTC": [1.2, 2.4, 3.6, 4.8],
+}
+
+LABELS = {
+    "Speed": ["0~10", "10~20", "20~30", "30~40", "40~"],
+    "Acceleration": ["~-4", "-4~0", "0~4", "4~8", "8~"],
+    "Headway": ["0~20", "20~40", "40~60", "60~80", "80~"],
+    "TTC": ["0~1.2", "1.2~2.4", "2.4~3.6", "3.6~4.8", "4.8~"],
+}
+
+# 📌 구간 설정 파일 (JSON: {지표: {"edges": [...], "labels": [...], "open_below": true/false}})
+# 파일에 있는 지표만 기본 구간을 덮어씀, labels는 edges보다 하나 많아야 함
+BIN_SPEC_FILE = os.getenv("REPORT_BIN_SPECS")
+
+
+def default_specs() -> dict:
+    """
+    기본 구간 설정 - Acceleration만 첫 구간이 아래로 열려 있고 나머지는 (0, 첫 경계)
+    """
+    return {name: {"edges": edges, "labels": LABELS[name], "open_below": name == "Acceleration"}
+            for name, edges in RANGE_TYPE.items()}
+
+
+def load_specs(path: str = BIN_SPEC_FILE) -> dict:
+    specs = default_specs()
+    if not path:
+        return specs
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            loaded = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Warning: 구간 설정 파일을 읽을 수 없어 기본 구간을 사용합니다: {path} ({e})")
+        return specs
+    for name, spec in loaded.items():
+        try:
+            edges = [float(edge) for edge in spec["edges"]]
+        except (KeyError, TypeError, ValueError):
+            edges = None
+        open_below = bool(spec.get("open_below", True)) if edges else True
+        bounds = [f"{edge:g}" for edge in edges or []]
+        labels = spec.get("labels") or [f"{low}~{high}" for low, high in zip(["" if open_below else "0"] + bounds, bounds + [""])]
+        if not edges or len(labels) != len(edges) + 1 or edges != sorted(edges):
+            print(f"⚠️ Warning: '{name}' 구간 설정이 올바르지 않아 무시합니다 (경계는 오름차순, 라벨은 경계보다 1개 많아야 함)")
+            continue
+        specs[name] = {"edges": edges, "labels": labels, "open_below": open_below}
+    return specs
+
+
+BIN_SPECS = load_specs()
+
+
+def bin_index(values, spec: dict) -> np.ndarray:
+    """
+    값마다 구간 번호 (경계 배열에 대한 searchsorted, NaN은 -1)
+    open_below가 False면 첫 구간은 (0, 경계) - 0 이하 값은 두 번째 구간에 포함 (기존 차트와 동일)
+    """
+    values = riskengine.to_array(values)
+    bins = np.searchsorted(np.asarray(spec["edges"], dtype=np.float64), values, side="right")
+    if not spec["open_below"]:
+        bins[(bins == 0) & (values <= 0)] = min(1, len(spec["edges"]))
+    bins[np.isnan(values)] = -1
+    return bins
+
+
+def bin_counts(name: str, values, specs: dict = None) -> list:
+    """
+    지표 시계열의 구간별 개수
+    """
+    spec = (specs or BIN_SPECS)[name]
+    bins = bin_index(values, spec)
+    return np.bincount(bins[bins >= 0], minlength=len(spec["labels"])).tolist()
+
+
+def distribution(name: str, values, specs: dict = None, time_step: float = riskengine.TIME_STEP_LENGTH,
+                 per_vehicle: bool = False) -> dict:
+    """
+    구간별 개수와 머문 시간, 비율 (시계열 한 점 = time_step초)
+    per_vehicle: 차량별 값이 모두 들어 있는 시계열이면 True - 머문 시간을 "vehicleSeconds" [veh·s]로 반환
+    (아니면 "seconds" [s])
+    """
+    spec = (specs or BIN_SPECS)[name]
+    counts = bin_counts(name, values, specs)
+    total = sum(counts)
+    key, unit = ("vehicleSeconds", "veh·s") if per_vehicle else ("seconds", "s")
+    return {
+        "title": name,
+        "labels": spec["labels"],
+        "counts": counts,
+        key: [round(count * time_step, 2) for count in counts],
+        "unit": unit,
+        "share": [round(count / total, 4) if total else 0 for count in counts],
+    }
+
+
+def chart_bins(chart_data: dict, specs: dict = None, time_step: float = riskengine.TIME_STEP_LENGTH,
+               per_vehicle: tuple = ()) -> dict:
+    """
+    chartData 전체(Ego/Around/Network)를 {구분: [{"title", "labels", "counts", "seconds" 또는 "vehicleSeconds", "unit", "share"}]}
+    막대 차트 데이터로 변환
+    per_vehicle: 차량별 값을 모두 모은 시계열인 구분 (한 점 = 차량 한 대의 time_step초, "vehicleSeconds"로 반환)
+    시계열마다 한 번씩만 구간을 나누므로 원본 시계열 없이 분포만 브라우저로 보냄
+    """
+    specs = specs or BIN_SPECS
+    return {category: [distribution(name, values, specs, time_step, category in per_vehicle)
+                       for name, values in table.items() if name in specs]
+            for category, table in chart_data.items()}
@@ -0,0 +1,168 @@
+import os
+import queue
+import threading
+import time
+import traceback
+import zipfile
+
+RAW_SUFFIX = "_Raw.xlsx"
+
+# 📌 파일 크기/수정 시각이 이 시간(초) 동안 그대로면 쓰기가 끝난 것으로 판단
+SETTLE_SECONDS = float(os.getenv("INGEST_SETTLE_SECONDS", 2.0))
+
+# 📌 짝이 맞지 않은 파일을 기다리는 최대 시간(초)
+PENDING_TTL = float(os.getenv("INGEST_PENDING_TTL", 600))
+
+# 📌 작업 큐 크기 / 작업 스레드 수
+QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", 64))
+WORKERS = int(os.getenv("INGEST_WORKERS", 2))
+
+
+def pair_name(path: str):
+    """
+    <base>.xlsx / <base>_Raw.xlsx 경로에서 base 이름 (엑셀 파일이 아니면 None)
+    """
+    file_name = os.path.basename(path)
+    if not file_name.endswith(".xlsx") or file_name.startswith("~$"):
+        return None
+    if file_name.endswith(RAW_SUFFIX):
+        return file_name[:-len(RAW_SUFFIX)]
+    return file_name[:-len(".xlsx")]
+
+
+class PendingPair():
+    """
+    아직 처리하지 않은 엑셀 파일 쌍의 상태
+    stats: 파일 경로별 마지막으로 확인한 (크기, mtime)
+    changed_at: 마지막 이벤트 또는 크기/mtime 변화 시각
+    """
+    def __init__(self, base_name: str, data_dir: str, now: float):
+        self.base_name = base_name
+        self.data_dir = data_dir
+        self.stats = dict()
+        self.seen_at = now
+        self.changed_at = now
+
+    @property
+    def paths(self) -> list:
+        return [os.path.join(self.data_dir, f"{self.base_name}.xlsx"),
+                os.path.join(self.data_dir, f"{self.base_name}{RAW_SUFFIX}")]
+
+    def check(self, now: float, settle_seconds: float) -> bool:
+        """
+        두 파일이 모두 있고 settle_seconds 동안 크기/mtime이 바뀌지 않았으면 True
+        """
+        stats = dict()
+        for path in self.paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return False
+            stats[path] = (stat.st_size, stat.st_mtime_ns)
+        if stats != self.stats:
+            self.stats = stats
+            self.changed_at = now
+            return False
+        if now - self.changed_at < settle_seconds:
+            return False
+        # xlsx는 zip 파일 - 끝부분(central directory)까지 쓰여야 열 수 있음
+        return all(zipfile.is_zipfile(path) for path in self.paths)
+
+
+class IngestQueue():
+    """
+    watchdog 이벤트를 받아 쓰기가 끝난 엑셀 파일 쌍만 작업 큐에 넣고, 작업 스레드가 process를 실행
+    - observer 스레드는 touch()로 기록만 하고 바로 반환
+    - 감시 스레드가 주기적으로 크기/mtime 안정 여부를 확인 (디바운스)
+    - 큐가 가득 차면 다음 확인 때 다시 시도 (observer는 막히지 않음)
+    - 짝이 맞지 않은 채 PENDING_TTL 동안 변화가 없는 파일은 목록에서 제거
+    process: (base_name, data_dir)를 받는 함수
+    """
+    def __init__(self, process, workers: int = WORKERS, maxsize: int = QUEUE_SIZE,
+                 settle_seconds: float = SETTLE_SECONDS, ttl: float = PENDING_TTL, poll_seconds: float = 0.5):
+        self.process = process
+        self.settle_seconds = settle_seconds
+        self.ttl = ttl
+        self.poll_seconds = poll_seconds
+        self.pending = dict()
+        self.active = set()
+        self.jobs = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = [threading.Thread(target=self._watch, name="ingest-watch", daemon=True)]
+        self._threads += [threading.Thread(target=self._work, name=f"ingest-worker-{i}", daemon=True)
+                          for i in range(workers)]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def touch(self, path: str) -> bool:
+        """
+        파일 생성/수정/이동 이벤트 기록 (엑셀 파일이 아니면 무시)
+        """
+        base_name = pair_name(path)
+        if base_name is None:
+            return False
+        data_dir = os.path.dirname(os.path.abspath(path))
+        now = time.monotonic()
+        with self._lock:
+            pair = self.pending.get((base_name, data_dir))
+            if pair is None:
+                self.pending[(base_name, data_dir)] = PendingPair(base_name, data_dir, now)
+            else:
+                pair.changed_at = now
+        return True
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_seconds):
+            self.poll()
+
+    def poll(self):
+        """
+        대기 중인 파일 쌍을 확인해 준비된 쌍은 큐에 넣고 오래된 쌍은 제거
+        """
+        now = time.monotonic()
+        with self._lock:
+            pairs = list(self.pending.items())
+        for key, pair in pairs:
+            # 처리 중인 쌍은 끝난 뒤에 다시 확인 (같은 시나리오를 동시에 처리하지 않음)
+            if key in self.active:
+                continue
+            if pair.check(now, self.settle_seconds):
+                try:
+                    self.jobs.put_nowait(key)
+                except queue.Full:
+                    continue
+                with self._lock:
+                    self.active.add(key)
+                    if self.pending.get(key) is pair:
+                        del self.pending[key]
+            elif now - pair.changed_at > self.ttl:
+                print(f"🗑️ {pair.base_name}: 짝이 맞는 파일이 {self.ttl:.0f}초 동안 없어 대기 목록에서 제거")
+                with self._lock:
+                    if self.pending.get(key) is pair:
+                        del self.pending[key]
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                key = self.jobs.get(timeout=self.poll_seconds)
+            except queue.Empty:
+                continue
+            base_name, data_dir = key
+            try:
+                self.process(base_name, data_dir)
+            except Exception:
+                print(f"🔥 {base_name} 처리 중 오류 발생!")
+                print(traceback.format_exc())
+            finally:
+                with self._lock:
+                    self.active.discard(key)
+                self.jobs.task_done()
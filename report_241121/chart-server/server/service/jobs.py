@@ -0,0 +1,130 @@
+import contextlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from . import compute
+from . import jsonconverter as jsc
+from . import reportmodel
+
+# 📌 메모리에 유지할 작업 기록 개수 (오래된 완료 작업부터 삭제)
+JOB_HISTORY = int(os.getenv("JOB_HISTORY", 100))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class Job():
+    """
+    리포트 계산 작업 하나의 상태와 단계별 진행 상황
+    sections: 계산할 섹션 (None이면 전체 + outputs 저장) - 필요 없는 단계는 skipped
+    """
+    def __init__(self, base_name: str, sections: list, output_dir: str = "outputs"):
+        self.id = uuid.uuid4().hex
+        self.base_name = base_name
+        self.sections = sections
+        self.output_dir = output_dir
+        self.state = QUEUED
+        self.stages = OrderedDict((name, {"state": "pending", "seconds": None}) for name in reportmodel.STAGES)
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.error = None
+        self.report = None
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """
+        reportmodel의 progress 인자로 넘기는 함수 - 단계 상태와 소요 시간을 기록
+        """
+        with self._lock:
+            if self.started is None:
+                self.state, self.started = RUNNING, time.time()
+            self.stages[name]["state"] = RUNNING
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self._end_stage(name, FAILED, start)
+            raise
+        self._end_stage(name, DONE, start)
+
+    def _end_stage(self, name: str, state: str, start: float):
+        with self._lock:
+            self.stages[name].update(state=state, seconds=round(time.perf_counter() - start, 4))
+
+    def finish(self, future):
+        """
+        계산 Future가 끝났을 때 호출 - 다른 요청이 계산했거나 캐시에 있던 경우 남은 단계는 skipped
+        """
+        with self._lock:
+            error = future.exception()
+            if error is None:
+                self.state, self.report = DONE, future.result()
+            else:
+                self.state, self.error = FAILED, f"{type(error).__name__}: {error}"
+            for stage in self.stages.values():
+                if stage["state"] == "pending":
+                    stage["state"] = "skipped"
+            self.started = self.started or self.created
+            self.finished = time.time()
+
+    @property
+    def progress(self) -> float:
+        with self._lock:
+            finished = [stage for stage in self.stages.values() if stage["state"] in (DONE, "skipped")]
+            return round(len(finished) / len(self.stages), 2)
+
+    def to_dict(self, links: dict = None) -> dict:
+        progress = self.progress
+        with self._lock:
+            result = {
+                "id": self.id,
+                "base_name": self.base_name,
+                "sections": self.sections,
+                "state": self.state,
+                "progress": progress,
+                "stages": {name: dict(stage) for name, stage in self.stages.items()},
+                "created": self.created,
+                "started": self.started,
+                "finished": self.finished,
+                "seconds": round(self.finished - self.created, 4) if self.finished else None,
+                "error": self.error,
+            }
+        if links:
+            result["links"] = links
+        return result
+
+
+class JobStore():
+    """
+    작업 id → Job (최근 JOB_HISTORY개만 유지)
+    """
+    def __init__(self, maxsize: int = JOB_HISTORY):
+        self.maxsize = maxsize
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, base_name: str, sections: list, output_dir: str = "outputs", data_dir: str = jsc.DATA_DIR) -> Job:
+        """
+        리포트 계산을 작업 스레드에 넣고 바로 Job 반환 (계산은 compute의 작업 스레드에서 실행)
+        """
+        job = Job(base_name, sections, output_dir)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.maxsize:
+                oldest = next(iter(self._jobs))
+                if self._jobs[oldest].state in (QUEUED, RUNNING):
+                    break
+                del self._jobs[oldest]
+        compute.submit(base_name, output_dir, data_dir, job.stage, sections).add_done_callback(job.finish)
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+
+jobs = JobStore()
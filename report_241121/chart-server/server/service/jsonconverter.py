@@ -1,29 +1,126 @@
 import pandas as pd
 import numpy as np
 import os
-import json
+from . import accumulator
+from . import riskengine
+from . import pet
+from . import metrics
+from . import sheetcache
+from . import netseries
+from . import resultbuilder
+from .fzpindex import FzpIndex
+from .sections import SheetBook, intermediate, section, resolve
+
+# 입력 데이터 디렉토리
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+
+# 엑셀 파일별 시트 이름
+ORIGIN_SHEETS = ["Result", "Speed", "Distnace", "Signal"]
+RAW_SHEETS = ["Speed", "Distnace", "Signal"]
+
 
 # uvicorn server.main:app --reload
 class json_converter():
-    def __init__(self, origin_path: str = None, raw_path: str = None):
-        self.origin_file = self.get_origin(origin_path)
-        self.raw_file = self.get_rawfile(raw_path)
+    def __init__(self, origin_path: str = None, raw_path: str = None, net_files: dict = None):
+        """
+        origin_path, raw_path: 엑셀 데이터 경로
+        net_files: {"Speed", "Acceleration", "TTC"} 네트워크 시계열 파일 경로 또는 {"fzp": .fzp 경로}
+                   (없으면 시나리오 이름으로 찾음)
+        """
+        # 시트와 섹션은 처음 요청될 때 읽고 계산함
+        self.origin_file = SheetBook(lambda names: self.get_origin(origin_path, names), ORIGIN_SHEETS)
+        self.raw_file = SheetBook(lambda names: self.get_rawfile(raw_path, names), RAW_SHEETS)
+        self._sections = dict()
+
+        # 네트워크 시계열과 .fzp는 엑셀 파일과 같은 디렉토리에서 찾음
+        base_name = os.path.basename(origin_path)[:-len(".xlsx")] if origin_path else None
+        data_dir = os.path.dirname(self.get_absolute_path(origin_path)) if origin_path else DATA_DIR
+        self.net_files = net_files or netseries.resolve_network_files(data_dir, base_name)
+
+        fzp_path = os.path.join(data_dir, f"{base_name}.fzp") if base_name else None
+        self.fzp_path = fzp_path if fzp_path and os.path.exists(fzp_path) else self.net_files.get("fzp")
 
         print(origin_path, raw_path)
-        
-        # Speed 시트의 E2 셀 값 가져오기
+        #self.legal_compliance_metrics = self.get_legalComplianceMetrics()
+
+    def require(self, *depends):
+        """
+        섹션/중간 테이블이 의존하는 시트를 파일별로 한 번에 읽음
+        depends: "origin:시트", "raw:시트" 또는 중간 테이블 이름
+        """
+        sheets, _ = resolve(type(self), depends)
+        books = {"origin": self.origin_file, "raw": self.raw_file}
+        for book in books:
+            names = [name.split(":", 1)[1] for name in sheets if name.startswith(f"{book}:")]
+            if names and isinstance(books[book], SheetBook):
+                books[book].load(names)
+
+    @classmethod
+    def dependencies(cls, name: str) -> dict:
+        """
+        섹션/중간 테이블이 (재귀적으로) 의존하는 시트와 중간 테이블 목록
+        """
+        sheets, tables = resolve(cls, getattr(cls, name).depends)
+        return {"sheets": sheets, "tables": tables}
+
+    @intermediate("origin:Speed")
+    def driving_time(self):
+        """
+        Speed 시트의 E2 셀 값 (첫 번째 행의 '주행 시간 [s]' 값)
+        """
         speed_sheet = self.origin_file['Speed']
-        
-        # E2 셀 값 가져오기
         if not speed_sheet.empty and '주행 시간 [s]' in speed_sheet.columns:
-            self.driving_time = speed_sheet['주행 시간 [s]'].iloc[0]  # 첫 번째 행의 '주행 시간 [s]' 값
-        else:
-            self.driving_time = 0  # 기본값 설정 또는 에러 처리
-        
-        self.Ego_live_table = self.get_egoData()
-        self.Around_live_table = self.get_aroundData()
-        self.Net_live_table = self.get_netData()
-        #self.legal_compliance_metrics = self.get_legalComplianceMetrics()
+            return speed_sheet['주행 시간 [s]'].iloc[0]
+        return 0  # 기본값 설정 또는 에러 처리
+
+    @intermediate("raw:Distnace")
+    def start_time(self):
+        """
+        chartData 시계열 첫 샘플의 시뮬레이션 시간 [s] (데이터가 없으면 0)
+        """
+        sim_time = self.raw_file["Distnace"]["시뮬레이션 시간"]
+        return float(sim_time.iloc[0]) if len(sim_time) else 0.0
+
+    @intermediate("raw:Speed", "raw:Distnace")
+    def Ego_live_table(self):
+        return self.get_egoData()
+
+    @intermediate("raw:Distnace", "Ego_live_table", "tgr_accel")
+    def Around_live_table(self):
+        return self.get_aroundData()
+
+    @intermediate("raw:Distnace")
+    def net_data(self):
+        """
+        get_netData 결과 (네트워크 시계열 테이블, 차량별 값 여부)
+        """
+        return self.get_netData()
+
+    @intermediate("net_data")
+    def Net_live_table(self):
+        return self.net_data[0]
+
+    @intermediate("net_data")
+    def net_per_vehicle(self):
+        """
+        네트워크 시계열이 차량별 값을 모두 모은 것이면 True (Network*.txt), 시점별 평균이면 False (.fzp)
+        """
+        return self.net_data[1]
+
+    @intermediate()
+    def fzp_index(self):
+        """
+        시나리오 .fzp 레코드의 차량/링크 인덱스 (.fzp가 없으면 None)
+        """
+        return FzpIndex.open(self.fzp_path) if self.fzp_path else None
+
+    @intermediate("raw:Distnace")
+    def tgr_accel(self):
+        """
+        앞 차량 가속도 시계열 (Around 테이블과 사고위험 지표가 공유)
+        """
+        return riskengine.acceleration(self.raw_file["Distnace"]["앞 차량 속도  [km/h]"])
 
     def get_TTC(self, ego_vel, tgr_vel, dist):
         """
@@ -46,89 +143,38 @@ class json_converter():
             acceleration.append(delta_speed / time_increment)
         return acceleration
 
-    def get_form(self, original: str, is_title: bool = False):
-        """
-        json 형식중 title과 row의 ''기호를 제거하기 위한 함수
-        is_title: chart 및 realtime 전용
-        """
-        words = dict()
-        if is_title:
-            words = {"\'title\'": "title", "\'rows\'": "rows", "\'drivingTime\'": "drivingTime"}
-        else:
-            words = {"\'Ego_vehicle\'": "Ego_vehicle", "\'Around_Vehicle\'": "Around_Vehicle",
-                     "\'Vehicles_in_network\'": "Vehicles_in_network"}
-
-        for i in words:
-            original = original.replace(i, words[i])
-        return original
-
-    def chart_form(self, data: dict):
-        """
-        ChartData만의 독특한 형식을 구축하기 위한 함수
-        """
-        return [["Min"] + [min(data[i]) for i in data], ["Max"] + [max(data[i]) for i in data],
-                ["Avg"] + [sum(data[i]) / len(data) for i in data]]
-
-    def convert_to(self, title: str = None, data: [list, dict] = None, var_name: str = None, is_title: bool = True) -> str:
-        """
-        기본적인 원하는 데이터 형식으로 만들기 위한 함수
-        json 저장시 var이름을 입력하기 위해서도 쓰임
-        title: json의 title 항목에 들어갈 이름
-        data: json의 rows 항목에 들어갈 데이터
-        var_name: json의 var에 쓰일 변수명
-        is_title: chartdata와 realTime data일때는 False
-        """
-        if var_name:
-            if is_title:
-                return ("[" + ",".join(data) + "]").replace("nan", "0.0")
-            else:
-                return "{" + ",".join(data) + "}"
-        else:
-            if is_title:
-                if type(data) == dict:
-                    result = {
-                        'title': title,
-                        'drivingTime': self.driving_time,  # 여기서 drivingTime 값을 사용
-                        'rows': data,
-                    }
-                    return str(result)
-            else:
-                result = {
-                    title: data
-                }
-                return str(result)
-
     def get_absolute_path(self, data_name: str = None):
         # 파일 위치를 찾아주는 함수
-        current_dir = os.path.dirname(__file__)
-        root_dir = os.path.join(current_dir, '..')
-        excel_path = os.path.join(root_dir, 'data', data_name)
+        excel_path = os.path.join(DATA_DIR, data_name)
         return excel_path
 
-    def get_origin(self, path: str = None):
+    @metrics.timed("get_origin")
+    def get_origin(self, path: str = None, sheet_names: list = None):
         """
         Rawfile이 아닌 엑셀 파일을 불러오기 위한 함수
         path: rawfile이 아닌 엑셀 데이터 경로
+        sheet_names: 읽을 시트 목록 (기본값은 전체)
         """
         data_name = 'temp_006_LosA.xlsx' if not path else path
         excel_path = self.get_absolute_path(data_name)
-        sheets = pd.read_excel(excel_path, sheet_name=["Result", "Speed", "Distnace", "Signal"], na_values='-')
-        for sheet in sheets:
-            sheets[sheet] = sheets[sheet].fillna(0)
+        sheets = sheetcache.read_sheets(excel_path, sheet_names or ORIGIN_SHEETS)
+        metrics.inc("report_rows_total", sum(len(sheet) for sheet in sheets.values()), stage="get_origin")
         return sheets
 
-    def get_rawfile(self, rawpath: str = None):
+    @metrics.timed("get_rawfile")
+    def get_rawfile(self, rawpath: str = None, sheet_names: list = None):
         """
         Raw 엑셀 파일을 불러오기 위한 함수
         rawpath: rawfile 엑셀 데이터 경로
+        sheet_names: 읽을 시트 목록 (기본값은 전체)
         """
         data_name = 'temp_006_LosA_Raw.xlsx' if not rawpath else rawpath
         excel_path = self.get_absolute_path(data_name)
-        sheets = pd.read_excel(excel_path, sheet_name=["Speed", "Distnace", "Signal"], na_values='-')
-        for sheet in sheets:
-            sheets[sheet] = sheets[sheet].fillna(0)
+        sheets = sheetcache.read_sheets(excel_path, sheet_names or RAW_SHEETS)
+        metrics.inc("report_rows_total", sum(len(sheet) for sheet in sheets.values()), stage="get_rawfile")
         return sheets
     
+    @metrics.timed("get_egoData")
     def get_egoData(self, rawpath: str = None):
         """
         Ego관련 데이터를 불러옴
@@ -142,18 +188,21 @@ class json_converter():
         ego_speed = raw_dist["속도  [km/h]"]
         ego_accel = raw_dist["가속도  [m/s^2]"]
 
-        ego_TTC = []
-        for i in range(len(raw_dist)):
-            rel_data = raw_dist.loc[i]
-            ego_TTC.append(self.get_TTC(rel_data["속도  [km/h]"], rel_data["앞 차량 속도  [km/h]"], rel_data["앞 차량과의 거리  [m]"]))
+        # get_TTC를 행 전체에 한 번에 적용
+        ego_vel = raw_dist["속도  [km/h]"].to_numpy()
+        tgr_vel = raw_dist["앞 차량 속도  [km/h]"].to_numpy()
+        dist = raw_dist["앞 차량과의 거리  [m]"].to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ego_TTC = np.where(ego_vel != tgr_vel, dist / (ego_vel - tgr_vel), dist).tolist()
 
         return {
-            "Speed": [value for value in list(ego_speed) if value != "nan"],
-            "Acceleration": [value for value in list(ego_accel) if value != "nan"],
+            "Speed": list(ego_speed),
+            "Acceleration": list(ego_accel),
             "Headway": list(raw_dist["앞 차량과의 거리  [m]"]),
             "TTC": ego_TTC
         }
 
+    @metrics.timed("get_aroundData")
     def get_aroundData(self, rawpath: str = None):
         """
         주위 차량 데이터관련 데이터를 뽑는 함수
@@ -166,46 +215,54 @@ class json_converter():
 
         return {
             "Speed": list(raw_dist["앞 차량 속도  [km/h]"].dropna()),
-            "Acceleration": self.calculate_acceleration(raw_dist["앞 차량 속도  [km/h]"].dropna()),
+            "Acceleration": self.tgr_accel.tolist(),
             "Headway": Ego_live_table["Headway"],
             "TTC": Ego_live_table["TTC"]
         }
 
+    @metrics.timed("get_netData")
     def get_netData(self, rawpath: str = None, Netfilename: list = None):
         """
         get Net_live_table data
         rawpath: rawfile경로
-        Netfilename: 네트워크 관련 파일 이름 리스트
+        Netfilename: 네트워크 관련 파일 경로 리스트 (Speed, Accel, TTC 순서, 없으면 self.net_files)
+        반환값: (Net_live_table, per_vehicle) - per_vehicle은 시계열 한 점이 차량 한 대의 값이면 True,
+        .fzp에서 계산한 시점별 평균이면 False
         """
         raw_data = self.raw_file
         raw_dist = raw_data["Distnace"]
 
-        net_table = dict()
-        nefilenames = ['NetworkSpeeddata.txt', 'NetworkAcceldata.txt', 'NetworkTTCdata.txt', ]
-        absolute_netfilenames = list()
-        for n in nefilenames:
-            absolute_netfilenames.append(self.get_absolute_path(n))
-
-        filename = absolute_netfilenames
+        net_files = dict(zip(["Speed", "Acceleration", "TTC"], Netfilename)) if Netfilename else self.net_files
 
-        for i in filename:
-            with open(i, 'r') as file:
-                lines = file.readlines()
+        net_table = dict()
+        if "fzp" in net_files:
+            # .fzp 차량 레코드에서 직접 시점별 네트워크 지표 계산
+            series = netseries.load_fzp_series(net_files["fzp"])
+            for name in ["Speed", "Acceleration", "TTC"]:
+                net_table[name] = series[name]
+        else:
+            for name in ["Speed", "Acceleration", "TTC"]:
+                net_table[name] = netseries.load_series(net_files[name])
 
-                # Convert lines to float values
-                values = [float(line.strip()) for line in lines]
-                if "Speed" in i:
-                    net_table["Speed"] = values
-                elif "Accel" in i:
-                    net_table["Acceleration"] = values
-                else:
-                    net_table["TTC"] = values
+        speed_diff = riskengine.to_array(raw_dist["앞 차량과의 속도 차이  [km/h]"])
+        length = min(len(net_table["TTC"]), len(speed_diff))
+        net_table["Headway"] = net_table["TTC"][:length] * speed_diff[:length]
+        metrics.inc("report_rows_total", length, stage="get_netData")
 
-        net_table["Headway"] = []
-        for i, j in zip(net_table["TTC"], raw_dist["앞 차량과의 속도 차이  [km/h]"]):
-            net_table["Headway"].append(i * j)
+        return {name: values.tolist() for name, values in net_table.items()}, "fzp" not in net_files
 
-        return net_table
+    def get_vehicleTrajectory(self, no: int, t0: float = None, t1: float = None, columns: list = None):
+        """
+        .fzp 레코드에서 차량 하나의 궤적을 시간 순으로 반환
+        no: 차량 번호
+        t0, t1: 시뮬레이션 시간 구간 [s]
+        columns: 반환할 열 (기본값은 SIMSEC, 링크, 차로, 위치, 속도, 차간거리)
+        """
+        if self.fzp_index is None:
+            return {}
+        columns = columns or ["SIMSEC", "LANE\\LINK\\NO", "LANE\\INDEX", "POS", "SPEED", "FOLLOWDISTNET"]
+        trajectory = self.fzp_index.vehicle(no, columns, t0, t1)
+        return {column: values.tolist() for column, values in trajectory.items()}
 
     def calculate_acceleration(self, speed):
         """
@@ -219,6 +276,8 @@ class json_converter():
             acceleration.append(delta_speed / time_increment)
         return acceleration
 
+    @section("origin:Result")
+    @metrics.timed("get_simulationSetting")
     def get_simulationSetting(self, path: str = None):
         """
         simulationSetting.js관련 데이터를 뽑는 함수
@@ -245,44 +304,53 @@ class json_converter():
         return Sim_set_data
 
 
+    @section("Ego_live_table", "Around_live_table", "Net_live_table")
+    @metrics.timed("get_realtimeMetrics")
     def get_realtimeMetrics(self, path: str = None, Netfilename: list = None):
         """
         realtimeMetrics.js관련 데이터를 뽑는 함수
         rawpath: rawfile 엑셀 데이터 경로
         Netfilename: 네트워크 관련 파일 이름 리스트
         """
-        Ego_live_table = self.Ego_live_table
-        Around_live_table = self.Around_live_table
-        Net_live_table = self.Net_live_table
-
-        Ego_real = [["Min"] + [round(min(Ego_live_table[i]), 2) for i in Ego_live_table]]
-        Ego_real.append(["Max"] + [round(max(Ego_live_table[i]), 2) for i in Ego_live_table])
-        Ego_real.append(["Avg"] + [round(sum(Ego_live_table[i]) / len(Ego_live_table[i]), 2) for i in Ego_live_table])
-
-        Around_real = [["Min"] + [round(min(Around_live_table[i]), 2) for i in Around_live_table]]
-        Around_real.append(["Max"] + [round(max(Around_live_table[i]), 2) for i in Around_live_table])
-        Around_real.append(["Avg"] + [round(sum(Around_live_table[i]) / len(Around_live_table[i]), 2) for i in Around_live_table])
-
-        Net_real = [["Min"] + [round(min(Net_live_table[i]), 2) for i in Net_live_table]]
-        Net_real.append(["Max"] + [round(max(Net_live_table[i]), 2) for i in Net_live_table])
-        Net_real.append(["Avg"] + [round(sum(Net_live_table[i]) / len(Net_live_table[i]), 2) for i in Net_live_table])
+        tables = {
+            "Ego_vehicle": self.Ego_live_table,
+            "Around_Vehicle": self.Around_live_table,
+            "Vehicles_in_network": self.Net_live_table,
+        }
+        # 시계열마다 한 번만 순회해 최소/최대/평균 계산 (숫자가 아닌 값은 제외)
+        summary = dict()
+        for name, table in tables.items():
+            columns = [statistics.row() for statistics in accumulator.table_statistics(table).values()]
+            summary[name] = [[label] + [column[i] for column in columns] for i, label in enumerate(["Min", "Max", "Avg"])]
 
-        return eval(self.convert_to(None, [self.convert_to("Ego_vehicle", Ego_real, is_title=False).replace("{", "").replace("}", ""),
-                                self.convert_to("Around_Vehicle", Around_real, is_title=False).replace("{", "").replace("}", ""),
-                                self.convert_to("Vehicles_in_network", Net_real, is_title=False).replace("{", "").replace("}", "")], "realTimeData", False).replace("nan", "0.0"))
+        return resultbuilder.summary_rows(summary)
 
+    @section("Ego_live_table", "Around_live_table", "Net_live_table")
+    @metrics.timed("get_chartData")
     def get_chartData(self, rawpath: str = None, Netfilename: list = None):
         """
         chartData.js관련 데이터를 가공하는 함수
         rawpath: rawfile 엑셀 데이터 경로
         Netfilename: 네트워크 관련 파일 이름 리스트
         """
-        result_table = dict()
-        result_table["Ego_vehicle"] = self.Ego_live_table
-        result_table["Around_Vehicle"] = self.Around_live_table
-        result_table["Vehicles_in_network"] = self.Net_live_table
-        
-        return eval(str(result_table).replace("nan", "0.0"))
+        return {
+            "Ego_vehicle": resultbuilder.series_table(self.Ego_live_table),
+            "Around_Vehicle": resultbuilder.series_table(self.Around_live_table),
+            "Vehicles_in_network": resultbuilder.series_table(self.Net_live_table),
+        }
+
+    @section("Ego_live_table", "Around_live_table", "Net_live_table")
+    @metrics.timed("get_chartStatistics")
+    def get_chartStatistics(self):
+        """
+        chartData와 같은 구분/지표별 누적기 (chartSummary, 배치 요약용)
+        NaN을 0으로 바꾸기 전의 시계열로 계산하므로 NaN은 invalid로 세고 min/평균/분위수에서 빠짐
+        """
+        return accumulator.chart_statistics({
+            "Ego_vehicle": self.Ego_live_table,
+            "Around_Vehicle": self.Around_live_table,
+            "Vehicles_in_network": self.Net_live_table,
+        })
 
     '''def get_legalComplianceMetrics(self, path: str = None, rawpath: str = None):
         """
@@ -294,8 +362,10 @@ class json_converter():
         final_title = ["Speed_Compliance", "Safetydistance_Compliance", "Signal_Compliance", "School_Zone", "Slowdown_compliance", "Gap_Analysis", "Nearspeed_Analysis", "Lanechange_Analysis"]
         
 
-        return eval(self.convert_to(None, [self.convert_to(f_title, f_data) for f_title, f_data in zip(final_title, final_data)], "legalComplianceMetrices"))'''
+        return resultbuilder.titled_rows(final_title, final_data, self.driving_time)'''
 
+    @section("origin:Speed", "origin:Distnace", "origin:Signal", "raw:Speed", "raw:Distnace", "tgr_accel", "driving_time")
+    @metrics.timed("get_accidentRiskRateMetrics")
     def get_accidentRiskRateMetrics(self, path: str = None, rawpath: str = None):
         """
         accidentRiskRateMetrics.js관련 데이터를 뽑는 함수
@@ -306,39 +376,18 @@ class json_converter():
         raw_file = self.raw_file
         raw_speed = raw_file["Speed"]
         raw_dist = raw_file["Distnace"]
-        rel_speed = raw_dist["앞 차량 속도  [km/h]"]
-        tgr_speed = list(raw_dist["앞 차량 속도  [km/h]"])
-        tgr_accel = self.calculate_acceleration(tgr_speed)
-
-        HardBrake_data = dict()
-        HardBrake_data["HardBrake"] = 0
-        HardBrake_data["HardBrakeDistance"] = 0.0
-        HardBrake_data["HardBrakeTime"] = 0.0
-        column_data = ["속도  [km/h]", "가속도  [m/s^2]"]
-        time_step_length = 0.1
+        tgr_accel = self.tgr_accel
 
-        for i in range(len(raw_speed)):
-            if raw_speed.loc[i][column_data[1]] < -3.0:
-                HardBrake_data["HardBrake"] += 1
-                HardBrake_data["HardBrakeTime"] += 0.1
-                HardBrake_data["HardBrakeDistance"] += raw_speed.loc[i][column_data[0]] / 3.6 * 0.1
-        HardBrake_data["HardBrakeTime"] = round(HardBrake_data["HardBrakeTime"], 2)
-        HardBrake_data["HardBrakeDistance"] = round(HardBrake_data["HardBrakeDistance"], 2)
+        time_step_length = 0.1
 
+        under_speed = int((raw_speed["속도  [km/h]"] < 30.0).sum())
         law_data = {
             "OverSafetyDistance": "False" if origin["Distnace"]["안전거리 확보율"][0] < 1.0 else True,
             "OverSpeed": origin["Speed"]["제한속도 준수 여부"][0],
             "OverSpeedTime": origin["Speed"]["제한속도 비준수 시간  [s]"][0],
-            "UnderSpeed": "True",
-            "UnderSpeedTime": 0.0
+            "UnderSpeed": "False" if under_speed else "True",
+            "UnderSpeedTime": round(under_speed * time_step_length, 2)
         }
-
-        for i in raw_speed["속도  [km/h]"]:
-            if i < 30.0:
-                if law_data["UnderSpeed"] == "True":
-                    law_data["UnderSpeed"] = "False"
-                law_data["UnderSpeedTime"] += 0.1
-        law_data["UnderSpeedTime"] = round(law_data["UnderSpeedTime"], 2)
         
         '''slowdown_data = {
             "OverSpeed_D": "N/A",
@@ -388,272 +437,40 @@ class json_converter():
         lanechange_data = dict()
 
         # 차로 변경 횟수와 차로 변경 시간 계산
-        lane_change_count = 0
-        lane_change_times = []
-        prev_lane = raw_speed["차선"].iloc[0]
-        prev_time = raw_speed["시뮬레이션 시간"].iloc[0]
-
-        PICUD_data = []
+        lane = raw_speed["차선"].to_numpy()
+        sim_time = raw_speed["시뮬레이션 시간"].to_numpy()
+        changed = riskengine.lane_changes(lane)
+        lane_change_count = len(changed)
+        lane_change_times = list(sim_time[changed] - sim_time[changed - 1])
+
+        # 마지막 차로 변경 시점의 PICUD 거리 확보 여부 (1: 준수, 2: 위반)
+        PICUD = riskengine.picud(raw_dist["속도  [km/h]"], raw_dist["앞 차량 속도  [km/h]"],
+                                 raw_dist["가속도  [m/s^2]"], tgr_accel, raw_dist["안전거리  [m]"])
         PICUD_Bool = 0
-        lane_change_violation = []
-        previous_lane = raw_speed["차선"].iloc[0]  # Initialize with the first lane value
-
-        for i in range(1, len(raw_dist)):
-            rel_data = raw_dist.loc[i]
-            prev_rel_data = raw_dist.loc[i - 1]
-            ego_vel = rel_data["속도  [km/h]"]
-            tgr_vel = rel_data["앞 차량 속도  [km/h]"]
-            dist = rel_data["앞 차량과의 거리  [m]"]
-            prev_dist = prev_rel_data["앞 차량과의 거리  [m]"]
-            delta_v = ego_vel - tgr_vel
-            delta_a = rel_data["가속도  [m/s^2]"] - tgr_accel[i]
-            S = rel_data["안전거리  [m]"]
-            # Check for NaN values and skip if any
-            
-
-            if delta_a != 0:
-                PICUD = ((ego_vel ** 2 - tgr_vel ** 2) / (2 * delta_a)) + S - tgr_vel * time_step_length
-            else:
-                PICUD = float('inf')  # delta_a가 0이면 PICUD를 무한대로 설정
-
-
-            # Check for lane change and determine if the lane change distance is sufficient
-            current_lane = raw_speed["차선"].iloc[i]
-            if current_lane != previous_lane:
-                if dist < PICUD:
-                    lane_change_violation.append("차선변경 거리 확보 위반")
-                    PICUD_Bool = 2
-                else:
-                    lane_change_violation.append("차선변경 거리 확보 준수")
-                    PICUD_Bool = 1
-            else:
-                lane_change_violation.append("차선변경 없음")
-
-            previous_lane = current_lane
-
-
-        for i in range(1, len(raw_speed)):
-            current_lane = raw_speed["차선"].iloc[i]
-            current_time = raw_speed["시뮬레이션 시간"].iloc[i]
-            # Check for NaN values and skip if any
-            
-            if current_lane != prev_lane:
-                lane_change_count += 1
-                lane_change_times.append(current_time - prev_time)
-                prev_lane = current_lane
-            prev_time = current_time
-        # Remove duplicates from lane_change_violations and check for violations
-        unique_lane_change_violations = list(set(lane_change_violation))
-        if not unique_lane_change_violations:
-            lane_change_violation_str = "차선변경 없음"
-        else:
-            lane_change_violation_str = ", ".join(unique_lane_change_violations)
+        changed = changed[changed < len(raw_dist)]
+        if len(changed) > 0:
+            i = changed[-1]
+            PICUD_Bool = 2 if raw_dist["앞 차량과의 거리  [m]"].iloc[i] < PICUD[i] else 1
 
         lanechange_data["LaneChanged"] = lane_change_count
         lanechange_data["LaneChangedTime"] = round(sum(lane_change_times), 2) if lane_change_times else 0
         #lanechange_data["NearLaneSpeed"] = sum(lane_rel) / len(lane_rel)
         lanechange_data["LaneChangeCompliance"] = True
-        if PICUD_Bool == 1:
-            lanechange_data["PICUD_Violation"] = "차선변경 거리 확보 준수"
-        elif PICUD_Bool == 2:
-            lanechange_data["PICUD_Violation"] = "차선변경 거리 확보 위반"
-        else:
-            lanechange_data["PICUD_Violation"] = "차선변경 없음"
+        lanechange_data["PICUD_Violation"] = riskengine.PICUD_RESULTS[PICUD_Bool]
 
         final_data = [OverSpeed_data, SafetyDistance_data, Signal_data, lateralapproach_data, rel_speed_data, lanechange_data]
         final_title = ["Speed_Compliance", "Safetydistance_Compliance", "Signal_Compliance", "Gap_Analysis", "Nearspeed_Analysis", "Lanechange_Analysis"]
         
-        raw_data = self.raw_file
-        raw_dist = raw_data["Distnace"]
-        
-        tgr_speed = list(raw_dist["앞 차량 속도  [km/h]"])
-        tgr_accel = self.calculate_acceleration(tgr_speed)
-        
-        TTC_data = []
-        MTTC_data = []
-        DRAC_data = []
-        RCRI_data = []
-        CPI_data = []
-        DeltaV_data = []
-        CAI_data = []
-        PET_data = []
-        Headway_data = []
-
-        # Define a threshold distance for a potential conflict point (e.g., 2 meters)
-        threshold_distance = 2.0
-        
-        td = 1.5  # Time delay (Brake reaction time)
-        vehicle_length = 4.65  # Length of the vehicle in meters
-        max_car_events_per_hour = len(raw_dist) * time_step_length  # Maximum number of car-following events per hour
-        num_freeway_lanes = 3  # Number of freeway lanes
-        analysis_period = len(raw_dist) * time_step_length  # Analysis period in seconds
-        time_step_length = 0.1  # Time step length in seconds
-        MADR = -7.8
-        SDI_data = []
-        total_travel_time = len(raw_dist) * time_step_length
-        
-        for i in range(1, len(raw_dist)):
-            rel_data = raw_dist.loc[i]
-            prev_rel_data = raw_dist.loc[i - 1]
-
-            ego_vel = rel_data["속도  [km/h]"]
-            tgr_vel = rel_data["앞 차량 속도  [km/h]"]
-            dist = rel_data["앞 차량과의 거리  [m]"]
-            prev_dist = prev_rel_data["앞 차량과의 거리  [m]"]
-            delta_v = ego_vel - tgr_vel
-            delta_a = rel_data["가속도  [m/s^2]"] - tgr_accel[i]
-            S = rel_data["안전거리  [m]"]
-            # 속도 데이터를 숫자로 변환
-            raw_dist["속도  [km/h]"] = pd.to_numeric(raw_dist["속도  [km/h]"], errors='coerce')
-            raw_dist["앞 차량 속도  [km/h]"] = pd.to_numeric(raw_dist["앞 차량 속도  [km/h]"], errors='coerce')
-            current_time = rel_data["시뮬레이션 시간"]
-            previous_time = prev_rel_data["시뮬레이션 시간"]
-            # Check for NaN values and skip if any
-            if dist > 0:
-                Headway_data.append(dist)
-            
-
-            # Calculate TTC
-            if delta_a != 0 and (delta_v ** 2 - 2 * delta_a * dist) >= 0:
-                t1 = (-delta_v - (delta_v ** 2 - 2 * delta_a * dist) ** 0.5) / delta_a
-                t2 = (-delta_v + (delta_v ** 2 - 2 * delta_a * dist) ** 0.5) / delta_a
-
-                if t1 > 0 and t2 > 0:
-                    TTC = min(t1, t2)
-                elif t1 > 0:
-                    TTC = t1
-                elif t2 > 0:
-                    TTC = t2
-                else:
-                    TTC = 0
-            else:
-                TTC = dist / delta_v if delta_v > 0 else 0
-            if TTC > 3:
-                TTC_data.append(TTC)
-
-            # Calculate MTTC
-            # 음수 값이 sqrt()로 들어가지 않도록 max(0, 값) 적용
-            if delta_a != 0:
-                sqrt_value = max(0, delta_v ** 2 + 2 * delta_a * dist)
-                t1 = (-delta_v - sqrt_value ** 0.5) / delta_a
-                t2 = (-delta_v + sqrt_value ** 0.5) / delta_a
-            else:
-                t1, t2 = float('inf'), float('inf')
-
-            if t1 > 0 and t2 > 0:
-                MTTC = min(t1, t2)
-            elif t1 > 0:
-                MTTC = t1
-            elif t2 > 0:
-                MTTC = t2
-            else:
-                MTTC = float('inf')  # NaN 방지
-
-            if MTTC > 3.5:
-                MTTC_data.append(MTTC)
-
-            # Calculate DRAC
-            delta_v_squared = (ego_vel - tgr_vel) ** 2
-            delta_p = dist
-            if delta_p != 0:
-                DRAC = delta_v_squared / (2 * delta_p) - vehicle_length
-            else:
-                DRAC = 0
-
-            
-            DRAC_data.append(DRAC)
-
-            # Calculate CPI
-            if DRAC >= -1*MADR:
-                CPI_data.append(1)
-            else:
-                CPI_data.append(0)
-
-            # Calculate SSD (Safe Stopping Distance)
-            S = S  # Using the safe distance (안전거리  [m])
-            SSD_L = S + (ego_vel * 1000 / 3600) ** 2 / (2 * 9.8)
-            SSD_F = (tgr_vel * 1000 / 3600) ** 2 / (2 * 9.8)
-
-            # Calculate SDI (Safe Distance Index)
-            if SSD_L > SSD_F:
-                SDI = 0  # safe
-            else:
-                SDI = 1  # dangerous
-            SDI_data.append(SDI)
-            
-            # 임계 거리 이하로 진입하는 순간 확인
-            if prev_dist > threshold_distance and dist <= threshold_distance:
-                entry_time = current_time
-
-                # 임계 거리에서 벗어나는 순간 찾기
-                for j in range(i + 1, len(raw_dist)):
-                    next_rel_data = raw_dist.loc[j]
-                    next_dist = next_rel_data["앞 차량과의 거리  [m]"]
-                    next_time = next_rel_data["시뮬레이션 시간"]
-
-                    # 거리 다시 임계 값 초과 시점 확인
-                    if next_dist > threshold_distance:
-                        exit_time = next_time
-
-                        # PET 계산 (초 단위)
-                        pet = exit_time - entry_time  # 상대 시간 차이 계산
-
-                        if pet > 0:
-                            PET_data.append(pet)
-                            break  # 내부 루프 종료
-    
-            # Calculate DeltaV
-            if TTC < 1.5:
-                DeltaV = abs(ego_vel - tgr_vel)
-            else:
-                DeltaV = 0
-            
-            if DeltaV > 0:
-                DeltaV_data.append(DeltaV)
-
-            # Calculate CAI
-            if MTTC > 0 and MTTC != float('inf') and not np.isnan(MTTC):
-                CAI_numerator = (ego_vel + rel_data["가속도  [m/s^2]"] * MTTC) ** 2 - (tgr_vel + tgr_accel[i] * MTTC) ** 2
-                CAI_denominator = 2 * MTTC ** 2
-
-                if CAI_denominator > 0:  # 0으로 나누는 것 방지
-                    CAI = CAI_numerator / CAI_denominator
-                else:
-                    CAI = 0  # 분모가 0이면 안전한 값으로 대체
-            else:
-                CAI = 0  # MTTC가 0, inf, NaN이면 CAI는 0
-
-            if CAI > 0:
-                CAI_data.append(CAI)
-
-
-        # Calculate RCRI
-        RCRI = sum(SDI_data) / (max_car_events_per_hour * (analysis_period / 3600) * num_freeway_lanes)
-        RCRI_data = [RCRI] * len(SDI_data)  # RCRI is constant for the analysis period
-
-        # Calculate CPI
-        #CPI = sum(CPI_data) * time_step_length / total_travel_time
-        
+        accident_risk_metrics = riskengine.risk_summary(raw_dist, raw_dist["가속도  [m/s^2]"], tgr_accel)
 
          # 급제동 횟수 계산
         hard_brake_count = len(raw_speed[raw_speed["가속도  [m/s^2]"] < -3.0])
 
-        accident_risk_metrics = {
-            "TTC": round(np.nanmin(TTC_data), 2),
-            "MTTC": round(np.nanmin(MTTC_data), 2),
-            "DRAC": round(np.nanmax(DRAC_data), 2),
-            "RCRI": round(np.nanmax(RCRI_data), 2),
-            "CPI": round(np.nanmean(CPI_data), 2),
-            "DeltaV": round(np.nanmax(DeltaV_data), 2),
-            "CAI": round(np.nanmax(CAI_data), 2),
-            "PET": round(np.nanmin(PET_data) if len(PET_data)>0 else 0 , 2),
-            "Headway": round(np.nanmin(Headway_data), 2)
-        }
-
         Time_data = {
             "TTC": accident_risk_metrics["TTC"],
             "MTTC": accident_risk_metrics["MTTC"],
             "PET": accident_risk_metrics["PET"],
+            "PET_Count": accident_risk_metrics["PET_Count"],
             "Headway": accident_risk_metrics["Headway"]
         }
 
@@ -672,16 +489,28 @@ class json_converter():
         final_data = [Signal_data, OverSpeed_data, SafetyDistance_data, lateralapproach_data, rel_speed_data,  lanechange_data, Decel_data, Time_data, V_data]
         final_title = ["Signal_Compliance", "Speed_Compliance", "Safetydistance_Compliance",  "Gap_Analysis", "Nearspeed_Analysis", "Lanechange_Analysis", "Decel_Based", "Time_Based", "V_Based"]
 
-        return eval(self.convert_to(None, [self.convert_to(f_title, f_data) for f_title, f_data in zip(final_title, final_data)], "accidentRiskRateMetrics"))
+        return resultbuilder.titled_rows(final_title, final_data, self.driving_time)
 
+    @section("raw:Distnace")
+    @metrics.timed("get_petEvents")
+    def get_petEvents(self, threshold: float = pet.THRESHOLD_DISTANCE):
+        """
+        임계 거리 진입/이탈로 계산한 모든 PET 이벤트 목록 (최소값만이 아닌 전체)
+        threshold: 잠재적 충돌 지점으로 보는 임계 거리 [m]
+        """
+        raw_dist = self.raw_file["Distnace"]
+        events = pet.detect_pet_events(riskengine.to_array(raw_dist["앞 차량과의 거리  [m]"]),
+                                       riskengine.to_array(raw_dist["시뮬레이션 시간"]), threshold)
+        return pet.pet_events_to_rows(events)
+
+    @section("origin:Result", "origin:Distnace", "raw:Speed", "driving_time")
+    @metrics.timed("get_otherMetrics")
     def get_otherMetrics(self, path: str = None, rawpath: str = None):
         """
         otherMetrics.js관련 데이터를 뽑는 함수
         path: rawfile이 아닌 엑셀 데이터 경로
         rawpath: rawfile 엑셀 데이터 경로
         """
-        Ego_live_table = self.Ego_live_table
-
         origin = self.origin_file
         raw_data = self.raw_file
         raw_speed = raw_data["Speed"]
@@ -725,8 +554,8 @@ class json_converter():
         }
 
 
-        return eval(self.convert_to(None, [self.convert_to("Traffic_Efficiency", efficiency_data),
-                                self.convert_to("Traffic_Environment", traffic_enviroment)], "otherMetrics"))
+        return resultbuilder.titled_rows(["Traffic_Efficiency", "Traffic_Environment"],
+                                         [efficiency_data, traffic_enviroment], self.driving_time)
 
 
 
@@ -763,24 +592,34 @@ class json_converter():
         Args:
             output_dir (str): Directory to save the output JSON file.
         """
-        simulation_settings = self.get_simulationSetting()
-        scenario_name = simulation_settings.get("ScenarioName", "default_scenario").replace(" ", "_")
-    
-        # Ensure the output directory exists
-        os.makedirs(output_dir, exist_ok=True)
-    
-        output_path = os.path.join(output_dir, f"{scenario_name}.json")
         data = {
-            "simulationSettings": simulation_settings,
+            "simulationSettings": self.get_simulationSetting(),
             "accidentRiskData": self.get_accidentRiskRateMetrics(),
             "otherData": self.get_otherMetrics(),
+            "petEvents": self.get_petEvents(),
         }
-    
-        with open(output_path, "w", encoding="utf-8") as outfile:
-            json.dump(data, outfile, indent=4, ensure_ascii=False)
-    
-        print(f"Data successfully saved to {output_path}")
+        return write_json(data, output_dir)
+
+
+@metrics.timed("write_json")
+def write_json(data: dict, output_dir="outputs"):
+    """
+    리포트 데이터를 ScenarioName 이름의 JSON 파일로 저장하고 경로를 반환
+
+    Args:
+        data (dict): simulationSettings를 포함한 리포트 데이터
+        output_dir (str): Directory to save the output JSON file.
+    """
+    scenario_name = data["simulationSettings"].get("ScenarioName", "default_scenario").replace(" ", "_")
+
+    # Ensure the output directory exists
+    os.makedirs(output_dir, exist_ok=True)
+
+    output_path = os.path.join(output_dir, f"{scenario_name}.json")
+    resultbuilder.dump(data, output_path)
 
+    print(f"Data successfully saved to {output_path}")
+    return output_path
 
 def safe_divide(numerator, denominator):
     """ 0으로 나누는 것을 방지하는 안전한 나눗셈 함수 """
@@ -0,0 +1,532 @@
+import json
+import math
+import os
+import socketserver
+import threading
+import time
+from collections import deque
+
+from . import accumulator
+from . import pet
+from . import resultbuilder
+from . import riskengine
+
+# 📌 시뮬레이터(또는 replay_runner.py)가 프레임을 보내는 로컬 소켓 주소
+LIVE_HOST = os.getenv("LIVE_HOST", "127.0.0.1")
+LIVE_PORT = int(os.getenv("LIVE_PORT", 8765))
+# 📌 브라우저로 변경분을 묶어 보내는 간격 [s]와 세션마다 보관하는 차트 점 개수 (10 Hz 기준 1시간)
+PUSH_INTERVAL = float(os.getenv("LIVE_PUSH_INTERVAL", 0.1))
+HISTORY_SIZE = int(os.getenv("LIVE_HISTORY_SIZE", 36000))
+# 세션마다 보관하는 최근 변경분 개수 (이보다 뒤처진 구독자는 전체 상태를 다시 받음)
+TICK_HISTORY = 64
+
+# 프레임 필드 → Raw 엑셀 열 이름 (lane은 Speed 시트, 나머지는 Distnace 시트)
+FRAME_FIELDS = {
+    "time": "시뮬레이션 시간",
+    "speed": "속도  [km/h]",
+    "accel": "가속도  [m/s^2]",
+    "lead_speed": "앞 차량 속도  [km/h]",
+    "dist": "앞 차량과의 거리  [m]",
+    "safe_dist": "안전거리  [m]",
+    "lane": "차선",
+}
+
+HARD_BRAKE_ACCEL = -3.0
+
+
+def _min_above(current: float, value: float, threshold: float) -> float:
+    return value if value > threshold and value < current else current
+
+
+def _max_above(current: float, value: float, threshold: float) -> float:
+    return value if value > threshold and value > current else current
+
+
+def _finite(value: float, default=0):
+    return round(value, 2) if math.isfinite(value) else default
+
+
+class LiveAnalyzer():
+    """
+    0.1초 프레임을 하나씩 받아 실시간 지표와 사고위험 지표를 O(1)로 갱신
+    실행이 끝났을 때의 값은 같은 데이터로 계산한 get_realtimeMetrics/risk_summary와 같음
+    """
+    SERIES = ["Speed", "Acceleration", "Headway", "TTC"]
+
+    def __init__(self, time_step: float = riskengine.TIME_STEP_LENGTH, pet_threshold: float = pet.THRESHOLD_DISTANCE):
+        self.time_step = time_step
+        self.pet_threshold = pet_threshold
+        self.frames = 0
+        self.last_time = None
+        self.ego = {name: accumulator.Accumulator() for name in self.SERIES}
+        self.around = {name: accumulator.Accumulator() for name in self.SERIES}
+
+        self.ttc_min = math.inf
+        self.mttc_min = math.inf
+        self.drac_max = -math.inf
+        self.cpi = accumulator.Accumulator()
+        self.sdi_total = 0
+        self.delta_v_max = -math.inf
+        self.cai_max = -math.inf
+        self.headway_min = math.inf
+
+        self.hard_brakes = 0
+        self.lane_changes = 0
+        self.lane_change_time = 0.0
+        # 마지막 차로 변경 시점의 PICUD 거리 확보 여부 (riskengine.PICUD_RESULTS의 키)
+        self.picud_result = 0
+
+        self.pet_min = math.inf
+        self.pet_count = 0
+        self._pet_entry = None
+        self._prev = None
+
+    def update(self, frame: dict) -> dict:
+        """
+        frame: FRAME_FIELDS 키를 가진 dict (lane, safe_dist는 없어도 됨)
+        반환값: 이 프레임의 차트 값 {"Ego_vehicle": [...], "Around_Vehicle": [...]} (SERIES 순서)
+        """
+        speed = float(frame["speed"])
+        accel = float(frame["accel"])
+        lead_speed = float(frame["lead_speed"])
+        dist = float(frame["dist"])
+        sim_time = float(frame.get("time", (self.frames + 1) * self.time_step))
+        prev = self._prev
+
+        # Ego_live_table / Around_live_table과 같은 정의의 실시간 값
+        ttc = dist / (speed - lead_speed) if speed != lead_speed else dist
+        lead_accel = (lead_speed - prev["lead_speed"]) / self.time_step if prev else 0.0
+        for stats, values in ((self.ego, (speed, accel, dist, ttc)), (self.around, (lead_speed, lead_accel, dist, ttc))):
+            for name, value in zip(self.SERIES, values):
+                stats[name].add(float(value))
+
+        if accel < HARD_BRAKE_ACCEL:
+            self.hard_brakes += 1
+        if prev and "lane" in frame and frame["lane"] != prev.get("lane"):
+            self.lane_changes += 1
+            self.lane_change_time += sim_time - prev["time"]
+            picud = riskengine.picud_one(speed, lead_speed, accel, lead_accel, float(frame.get("safe_dist", 0.0)))
+            self.picud_result = 2 if dist < picud else 1
+
+        # risk_summary와 같이 첫 프레임은 이전 시점이 없으므로 사고위험 지표에서 제외
+        if prev:
+            self._update_risk(speed, lead_speed, dist, accel, lead_accel, float(frame.get("safe_dist", 0.0)))
+        self._update_pet(dist, sim_time, prev)
+
+        self._prev = {"lead_speed": lead_speed, "dist": dist, "time": sim_time, "lane": frame.get("lane")}
+        self.frames += 1
+        self.last_time = sim_time
+        return {"Ego_vehicle": [speed, accel, dist, ttc], "Around_Vehicle": [lead_speed, lead_accel, dist, ttc]}
+
+    def _update_risk(self, speed, lead_speed, dist, accel, lead_accel, safe_dist):
+        # 프레임 하나는 배열을 만들지 않는 스칼라 계산 (surrogate_safety와 같은 값)
+        values = riskengine.surrogate_safety_one(speed, lead_speed, dist, accel, lead_accel, safe_dist)
+        ttc, mttc, drac, cpi, sdi, delta_v, cai = (values[name] for name in
+                                                   ["TTC", "MTTC", "DRAC", "CPI", "SDI", "DeltaV", "CAI"])
+        self.ttc_min = _min_above(self.ttc_min, ttc, riskengine.TTC_THRESHOLD)
+        self.mttc_min = _min_above(self.mttc_min, mttc, riskengine.MTTC_THRESHOLD)
+        if drac > self.drac_max:
+            self.drac_max = drac
+        self.cpi.add(cpi)
+        self.sdi_total += sdi
+        self.delta_v_max = _max_above(self.delta_v_max, delta_v, 0)
+        self.cai_max = _max_above(self.cai_max, cai, 0)
+        self.headway_min = _min_above(self.headway_min, dist, 0)
+
+    def _update_pet(self, dist, sim_time, prev):
+        # detect_pet_events와 같은 규칙: 임계값 이하로 진입한 뒤 처음 초과하는 시점이 이탈
+        if self._pet_entry is not None and dist > self.pet_threshold:
+            value = sim_time - self._pet_entry
+            if value > 0:
+                self.pet_count += 1
+                self.pet_min = min(self.pet_min, value)
+            self._pet_entry = None
+        elif prev and prev["dist"] > self.pet_threshold and dist <= self.pet_threshold:
+            self._pet_entry = sim_time
+
+    @property
+    def driving_time(self) -> float:
+        return round(self.frames * self.time_step, 2)
+
+    def realtime(self) -> dict:
+        """
+        realTimeData 형식의 실시간 요약 (네트워크 지표는 실행 중 알 수 없으므로 제외)
+        """
+        tables = dict()
+        for name, stats in (("Ego_vehicle", self.ego), ("Around_Vehicle", self.around)):
+            columns = [stats[series].row() for series in self.SERIES]
+            tables[name] = [[label] + [column[i] for column in columns] for i, label in enumerate(["Min", "Max", "Avg"])]
+        return resultbuilder.summary_rows(tables)
+
+    def risk(self) -> list:
+        """
+        accidentRiskData 형식의 사고위험 지표 (지금까지 받은 프레임 기준)
+        """
+        period = self.frames * self.time_step
+        rcri = self.sdi_total / (period * (period / 3600) * riskengine.NUM_FREEWAY_LANES) if period else 0
+        decel = {
+            "DRAC": _finite(self.drac_max),
+            "RCRI": round(rcri, 2),
+            "CPI": round(self.cpi.total / self.cpi.count, 2) if self.cpi.count else 0,
+            "HardBrake": self.hard_brakes,
+        }
+        time_based = {
+            "TTC": _finite(self.ttc_min),
+            "MTTC": _finite(self.mttc_min),
+            "PET": _finite(self.pet_min),
+            "PET_Count": self.pet_count,
+            "Headway": _finite(self.headway_min),
+        }
+        v_based = {
+            "DeltaV": _finite(self.delta_v_max),
+            "CrashIndex": _finite(self.cai_max),
+        }
+        lane_change = {
+            "LaneChanged": self.lane_changes,
+            "LaneChangedTime": round(self.lane_change_time, 2),
+            "LaneChangeCompliance": True,
+            "PICUD_Violation": riskengine.PICUD_RESULTS[self.picud_result],
+        }
+        return resultbuilder.titled_rows(["Decel_Based", "Time_Based", "V_Based", "Lanechange_Analysis"],
+                                         [decel, time_based, v_based, lane_change], self.driving_time)
+
+
+class LiveSession():
+    """
+    시나리오 하나의 실시간 분석 상태 (소켓 연결 스레드가 갱신하고 API가 읽음)
+    차트 점은 프레임 번호와 함께 최근 HISTORY_SIZE개만 보관
+    """
+    def __init__(self, name: str, history_size: int = HISTORY_SIZE):
+        self.name = name
+        self.analyzer = LiveAnalyzer()
+        self.state = "running"
+        self.started = time.time()
+        self.updated = None
+        self.errors = 0
+        self.history = deque(maxlen=history_size)
+        self.changed = threading.Condition()
+        # push 간격마다 세션에서 한 번만 계산하는 변경분 (모든 구독자가 같은 메시지를 공유)
+        self.ticks = deque(maxlen=TICK_HISTORY)
+        self.version = 0
+        self._tick_state = None
+        self._tick_time = None
+        self._tick_lock = threading.Lock()
+
+    def update(self, frame: dict):
+        with self.changed:
+            point = self.analyzer.update(frame)
+            self.history.append((self.analyzer.frames, self.analyzer.last_time, point))
+            self.updated = time.time()
+            self.changed.notify_all()
+
+    def add_error(self):
+        """
+        읽을 수 없는 프레임 수 증가 (snapshot과 같은 잠금 안에서 갱신)
+        """
+        with self.changed:
+            self.errors += 1
+            self.changed.notify_all()
+
+    def finish(self):
+        with self.changed:
+            self.state = "finished"
+            self.changed.notify_all()
+
+    def points_since(self, frame: int, until: int = None) -> dict:
+        """
+        frame번째 이후(until을 주면 until번째까지) 프레임의 차트 점 (열 단위: {"frames", "time", 구분: {지표: [...]}})
+        새 점 개수만큼만 확인함
+        """
+        rows = []
+        for row in reversed(self.history):
+            if row[0] <= frame:
+                break
+            if until is None or row[0] <= until:
+                rows.append(row)
+        rows.reverse()
+        points = {"frames": [row[0] for row in rows], "time": [row[1] for row in rows]}
+        for category in ("Ego_vehicle", "Around_Vehicle"):
+            points[category] = {name: [_json_number(row[2][category][i]) for row in rows]
+                                for i, name in enumerate(LiveAnalyzer.SERIES)}
+        return points
+
+    def snapshot(self, points_since: int = None) -> dict:
+        """
+        현재 지표 (points_since를 주면 그 이후 차트 점도 함께, 같은 잠금 안에서 읽어 서로 일치)
+        """
+        with self.changed:
+            analyzer = self.analyzer
+            result = {
+                "name": self.name,
+                "state": self.state,
+                "frames": analyzer.frames,
+                "time": analyzer.last_time,
+                "errors": self.errors,
+                "latency": round(time.time() - self.updated, 3) if self.updated else None,
+                "realTimeData": analyzer.realtime(),
+                "accidentRiskData": analyzer.risk(),
+            }
+            if points_since is not None:
+                result["points"] = self.points_since(points_since)
+            return result
+
+    def tick(self, interval: float = PUSH_INTERVAL) -> int:
+        """
+        마지막 tick 이후 interval이 지났고 바뀐 값이 있으면 변경분을 한 번 계산해 ticks에 추가
+        구독자가 몇 명이든 push 간격마다 세션당 한 번만 계산함 (실행이 끝나면 바로 계산)
+        반환값: 마지막 tick 번호
+        """
+        with self._tick_lock:
+            now = time.monotonic()
+            if self._tick_state is None:
+                self._tick_state = self.snapshot(points_since=0)
+                self._tick_time = now
+                return self.version
+            previous = self._tick_state
+            if previous["state"] == "finished":
+                return self.version
+            with self.changed:
+                unchanged = (self.analyzer.frames, self.state, self.errors) == \
+                    (previous["frames"], previous["state"], previous["errors"])
+                finished = self.state == "finished"
+            if unchanged or (now - self._tick_time < interval and not finished):
+                return self.version
+            current = self.snapshot(points_since=previous["frames"])
+            self.version += 1
+            event = "end" if current["state"] == "finished" else "delta"
+            self.ticks.append(_Tick(self.version, event, _delta(previous, current)))
+            self._tick_state = current
+            self._tick_time = now
+            return self.version
+
+    def join(self):
+        """
+        새 구독자에게 보낼 (tick 번호, 전체 상태) - 마지막 tick 시점의 값과 그때까지의 차트 점
+        """
+        self.tick()
+        with self._tick_lock:
+            state = dict(self._tick_state)
+            version = self.version
+        with self.changed:
+            state["points"] = self.points_since(0, until=state["frames"])
+        return version, state
+
+    def ticks_after(self, version: int):
+        """
+        version 이후의 tick 목록 (보관 범위를 벗어났으면 None)
+        """
+        with self._tick_lock:
+            ticks = [tick for tick in self.ticks if tick.version > version]
+            if version < self.version and (not ticks or ticks[0].version != version + 1):
+                return None
+        return ticks
+
+
+class _Tick():
+    """
+    세션의 변경분 하나 - 인코딩한 결과도 한 번만 만들어 모든 구독자가 공유
+    """
+    def __init__(self, version: int, event: str, data: dict):
+        self.version = version
+        self.event = event
+        self.data = data
+        self._encoded = dict()
+
+    def encode(self, encoder):
+        if encoder not in self._encoded:
+            self._encoded[encoder] = encoder(self.event, self.data)
+        return self._encoded[encoder]
+
+
+def _event_pair(event: str, data: dict) -> tuple:
+    return event, data
+
+
+def _delta(previous: dict, current: dict) -> dict:
+    """
+    이전 상태 대비 바뀐 값과 새 차트 점
+    """
+    message = {key: current[key] for key in ("frames", "time", "state", "errors", "latency", "points")}
+
+    realtime = {name: rows for name, rows in current["realTimeData"].items()
+                if rows != previous["realTimeData"].get(name)}
+    if realtime:
+        message["realTimeData"] = realtime
+
+    risk = dict()
+    old_risk = {elem["title"]: elem for elem in previous["accidentRiskData"]}
+    for elem in current["accidentRiskData"]:
+        old = old_risk.get(elem["title"], {"rows": {}})
+        rows = {key: value for key, value in elem["rows"].items() if old["rows"].get(key) != value}
+        if rows or elem["drivingTime"] != old.get("drivingTime"):
+            risk[elem["title"]] = {"drivingTime": elem["drivingTime"], "rows": rows}
+    if risk:
+        message["accidentRiskData"] = risk
+    return message
+
+
+def _merge(messages: list) -> dict:
+    """
+    연속된 변경분 여러 개를 하나로 합침 (push 간격보다 늦게 읽는 구독자용)
+    """
+    merged = {key: messages[-1][key] for key in ("frames", "time", "state", "errors", "latency")}
+    points = {"frames": [], "time": [], "Ego_vehicle": dict(), "Around_Vehicle": dict()}
+    realtime = dict()
+    risk = dict()
+    for message in messages:
+        points["frames"] += message["points"]["frames"]
+        points["time"] += message["points"]["time"]
+        for category in ("Ego_vehicle", "Around_Vehicle"):
+            for name, values in message["points"][category].items():
+                points[category][name] = points[category].get(name, []) + values
+        realtime.update(message.get("realTimeData", {}))
+        for title, elem in message.get("accidentRiskData", {}).items():
+            entry = risk.setdefault(title, {"drivingTime": None, "rows": dict()})
+            entry["drivingTime"] = elem["drivingTime"]
+            entry["rows"].update(elem["rows"])
+    merged["points"] = points
+    if realtime:
+        merged["realTimeData"] = realtime
+    if risk:
+        merged["accidentRiskData"] = risk
+    return merged
+
+
+def _json_number(value: float):
+    return value if math.isfinite(value) else None
+
+
+class LiveSessions():
+    """
+    시나리오 이름 → LiveSession (같은 이름으로 새 실행이 시작되면 교체)
+    """
+    def __init__(self):
+        self._sessions = dict()
+        self._lock = threading.Lock()
+
+    def open(self, name: str) -> LiveSession:
+        session = LiveSession(name)
+        with self._lock:
+            self._sessions[name] = session
+        return session
+
+    def get(self, name: str):
+        with self._lock:
+            return self._sessions.get(name)
+
+    def names(self) -> list:
+        with self._lock:
+            return sorted(self._sessions)
+
+
+live_sessions = LiveSessions()
+
+
+class LiveFeed():
+    """
+    구독자 하나에게 보낼 메시지 - 처음에는 전체 상태, 이후에는 세션이 push 간격마다 한 번 계산한 변경분
+    같은 이름으로 새 실행이 시작되면 다시 전체 상태를 보냄
+    encoder: (이벤트 이름, 데이터)를 받아 전송할 값을 만드는 함수 - 변경분은 tick마다 한 번만 인코딩해 공유
+    """
+    def __init__(self, name: str, sessions: LiveSessions = live_sessions, encoder=None, interval: float = PUSH_INTERVAL):
+        self.name = name
+        self.sessions = sessions
+        self.encoder = encoder or _event_pair
+        self.interval = interval
+        self.session = None
+        self.version = None
+        self.done = False
+
+    def next(self):
+        """
+        encoder 결과 (기본값은 (이벤트 이름, 데이터)) 또는 보낼 내용이 없으면 None
+        이벤트: "snapshot" (전체), "delta" (변경분), "end" (실행 종료 후 마지막 변경분)
+        """
+        session = self.sessions.get(self.name)
+        if session is None or self.done:
+            return None
+        if session is not self.session:
+            self.session = session
+            return self._snapshot(session)
+
+        session.tick(self.interval)
+        ticks = session.ticks_after(self.version)
+        if ticks is None:
+            # 보관된 변경분보다 뒤처졌으면 전체 상태를 다시 보냄
+            return self._snapshot(session)
+        if not ticks:
+            return None
+        self.version = ticks[-1].version
+        self.done = ticks[-1].event == "end"
+        if len(ticks) == 1:
+            return ticks[0].encode(self.encoder)
+        return self.encoder(ticks[-1].event, _merge([tick.data for tick in ticks]))
+
+    def _snapshot(self, session: LiveSession):
+        self.version, state = session.join()
+        self.done = state["state"] == "finished"
+        return self.encoder("snapshot", state)
+
+
+class _FrameHandler(socketserver.StreamRequestHandler):
+    """
+    한 줄에 JSON 하나 (첫 줄은 {"scenario": 이름}, 이후 줄은 프레임)
+    """
+    def handle(self):
+        try:
+            name = json.loads(self.rfile.readline() or b"{}").get("scenario")
+        except (ValueError, AttributeError):
+            name = None
+        if not name:
+            print("⚠️ Warning: 첫 줄에 {\"scenario\": 이름}이 없어 연결을 닫습니다.")
+            return
+        session = self.server.sessions.open(name)
+        print(f"📡 실시간 분석 시작: {name}")
+        try:
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                try:
+                    session.update(json.loads(line))
+                except (ValueError, KeyError, TypeError):
+                    session.add_error()
+        finally:
+            session.finish()
+            print(f"🏁 실시간 분석 종료: {name} ({session.analyzer.frames} 프레임)")
+
+
+class LiveServer(socketserver.ThreadingTCPServer):
+    """
+    시뮬레이터 프레임을 받는 로컬 TCP 서버 (연결마다 스레드 하나)
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, sessions: LiveSessions = live_sessions, host: str = LIVE_HOST, port: int = LIVE_PORT):
+        super().__init__((host, port), _FrameHandler)
+        self.sessions = sessions
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="live-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def frames_from_raw(raw_sheets: dict):
+    """
+    Raw 엑셀의 Speed/Distnace 시트를 시뮬레이터 프레임 순서대로 변환 (replay_runner.py에서 사용)
+    """
+    distance = raw_sheets["Distnace"]
+    columns = {field: riskengine.to_array(distance[column]) for field, column in FRAME_FIELDS.items()
+               if column in distance.columns and field != "lane"}
+    lanes = raw_sheets["Speed"][FRAME_FIELDS["lane"]].tolist() if "Speed" in raw_sheets else None
+    for i in range(len(distance)):
+        frame = {field: float(values[i]) for field, values in columns.items()}
+        if lanes is not None and i < len(lanes):
+            frame["lane"] = resultbuilder.to_native(lanes[i])
+        yield frame
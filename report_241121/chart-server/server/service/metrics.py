@@ -0,0 +1,132 @@
+import contextlib
+import contextvars
+import functools
+import threading
+import time
+from collections import defaultdict
+
+# 지표 이름 → (종류, 설명) - Prometheus 텍스트 형식의 HELP/TYPE 줄
+METRICS = {
+    "report_stage_seconds_total": ("counter", "리포트 계산 단계별 누적 소요 시간 [s]"),
+    "report_stage_calls_total": ("counter", "리포트 계산 단계별 실행 횟수"),
+    "report_rows_total": ("counter", "단계별로 읽거나 만든 행 수"),
+    "report_bytes_read_total": ("counter", "입력 소스별로 읽은 바이트 수"),
+    "report_cache_requests_total": ("counter", "캐시 조회 횟수 (result=hit/miss)"),
+    "report_cache_hit_ratio": ("gauge", "캐시 적중률"),
+    "report_http_requests_total": ("counter", "경로별 HTTP 요청 수"),
+    "report_http_request_seconds_total": ("counter", "경로별 HTTP 요청 누적 처리 시간 [s]"),
+}
+
+_values = defaultdict(float)
+_lock = threading.Lock()
+
+# 요청 하나에서 실행된 단계 (이름, 초) 목록 - Server-Timing 헤더용
+_timings = contextvars.ContextVar("report_timings", default=None)
+
+
+def inc(name: str, value: float = 1, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _values[key] += value
+
+
+def observe(stage: str, seconds: float):
+    """
+    단계 소요 시간을 누적하고, 요청 중이면 Server-Timing 목록에도 추가
+    """
+    inc("report_stage_seconds_total", seconds, stage=stage)
+    inc("report_stage_calls_total", stage=stage)
+    timings = _timings.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+@contextlib.contextmanager
+def timer(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+def timed(stage: str):
+    """
+    함수 실행 시간을 stage 이름으로 기록하는 데코레이터
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def cache_result(cache: str, hit: bool):
+    inc("report_cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+
+@contextlib.contextmanager
+def collect():
+    """
+    with 블록 안(같은 context를 복사한 스레드 포함)에서 실행된 단계 목록을 모음
+    """
+    timings = []
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def server_timing(timings: list, total: float = None) -> str:
+    """
+    Server-Timing 헤더 값 (밀리초)
+    """
+    entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings]
+    if total is not None:
+        entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def _hit_ratios(values: dict) -> dict:
+    requests = defaultdict(lambda: {"hit": 0.0, "miss": 0.0})
+    for (name, labels), value in values.items():
+        if name == "report_cache_requests_total":
+            labels = dict(labels)
+            requests[labels["cache"]][labels["result"]] += value
+    return {(("cache", cache),): counts["hit"] / (counts["hit"] + counts["miss"])
+            for cache, counts in requests.items() if counts["hit"] + counts["miss"]}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render() -> str:
+    """
+    지금까지 모은 지표를 Prometheus 텍스트 형식(0.0.4)으로 반환
+    """
+    with _lock:
+        values = dict(_values)
+    series = defaultdict(dict)
+    for (name, labels), value in values.items():
+        series[name][labels] = value
+    series["report_cache_hit_ratio"] = _hit_ratios(values)
+
+    lines = []
+    for name, (kind, description) in METRICS.items():
+        if not series.get(name):
+            continue
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(series[name].items()):
+            label_text = ",".join(f'{key}="{_escape(label)}"' for key, label in labels)
+            lines.append(f"{name}{{{label_text}}} {value!r}" if label_text else f"{name} {value!r}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _lock:
+        _values.clear()
@@ -0,0 +1,119 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from . import fzp
+from . import metrics
+
+# 네트워크 관련 시계열 파일 이름 (시나리오별 파일이 없을 때 쓰는 공용 파일)
+NETWORK_FILES = {
+    "Speed": "NetworkSpeeddata.txt",
+    "Acceleration": "NetworkAcceldata.txt",
+    "TTC": "NetworkTTCdata.txt",
+}
+
+# 한 번에 읽어 파싱하는 바이트 수
+CHUNK_BYTES = 8 * 1024 * 1024
+
+# 📌 프로세스에 보관하는 파싱된 네트워크 시계열 수 (가장 오래 쓰지 않은 파일부터 제거)
+NETWORK_CACHE_SIZE = int(os.getenv("NETWORK_CACHE_SIZE", 8))
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def iter_series(path: str, chunk_bytes: int = CHUNK_BYTES):
+    """
+    한 줄에 값 하나씩 저장된 텍스트 파일을 일정 크기 단위로 읽어 float64 배열로 yield
+    줄 중간에서 잘린 값은 다음 청크로 넘김
+    """
+    remainder = b""
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(chunk_bytes)
+            if not block:
+                break
+            block = remainder + block
+            cut = block.rfind(b"\n") + 1
+            remainder = block[cut:]
+            if cut:
+                yield np.array(block[:cut].split(), dtype=np.float64)
+    if remainder.strip():
+        yield np.array(remainder.split(), dtype=np.float64)
+
+
+def _cached(path: str, loader):
+    """
+    파일의 mtime/크기가 같으면 이전에 읽은 결과를 반환 (최근 NETWORK_CACHE_SIZE개 파일만 보관하는 LRU)
+    """
+    source = os.path.abspath(path)
+    stat = os.stat(source)
+    key = (loader.__name__, stat.st_mtime_ns, stat.st_size)
+
+    with _lock:
+        cached = _cache.get((source, loader.__name__))
+        if cached is not None:
+            _cache.move_to_end((source, loader.__name__))
+    metrics.cache_result("network", cached is not None and cached[0] == key)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    metrics.inc("report_bytes_read_total", stat.st_size, source="network")
+    value = loader(source)
+    with _lock:
+        _cache[(source, loader.__name__)] = (key, value)
+        _cache.move_to_end((source, loader.__name__))
+        while len(_cache) > NETWORK_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return value
+
+
+def _read_text(path: str) -> np.ndarray:
+    chunks = list(iter_series(path))
+    values = np.concatenate(chunks) if chunks else np.empty(0, dtype=np.float64)
+    values.setflags(write=False)
+    return values
+
+
+def _read_fzp(path: str) -> dict:
+    # 청크 단위 스트리밍으로 계산 (파일 전체를 메모리에 올리지 않음, 인덱스는 차량/링크 조회에만 사용)
+    series = fzp.network_series(path)
+    for values in series.values():
+        values.setflags(write=False)
+    return series
+
+
+def load_series(path: str) -> np.ndarray:
+    """
+    시계열 파일 전체를 float64 배열로 읽음 (mtime/크기가 같으면 캐시된 배열 반환)
+    반환 배열은 여러 리포트가 공유하므로 읽기 전용
+    """
+    return _cached(path, _read_text)
+
+
+def load_fzp_series(path: str) -> dict:
+    """
+    .fzp 차량 레코드에서 시점별 네트워크 Speed/Acceleration/TTC 배열을 계산 (mtime 기준 캐시)
+    """
+    return _cached(path, _read_fzp)
+
+
+def resolve_network_files(data_dir: str, base_name: str = None) -> dict:
+    """
+    시나리오의 네트워크 시계열 입력 경로
+    1. <base_name>_NetworkSpeeddata.txt 처럼 시나리오 이름이 붙은 파일
+    2. <base_name>.fzp 차량 레코드 ({"fzp": 경로} 반환)
+    3. 공용 Network*.txt 파일
+    """
+    if base_name:
+        files = {name: os.path.join(data_dir, f"{base_name}_{file_name}") for name, file_name in NETWORK_FILES.items()}
+        if all(os.path.exists(path) for path in files.values()):
+            return files
+
+        fzp_path = os.path.join(data_dir, f"{base_name}.fzp")
+        if os.path.exists(fzp_path):
+            return {"fzp": fzp_path}
+
+    return {name: os.path.join(data_dir, file_name) for name, file_name in NETWORK_FILES.items()}
@@ -0,0 +1,49 @@
+import numpy as np
+
+# 잠재적 충돌 지점으로 보는 임계 거리 (e.g., 2 meters)
+THRESHOLD_DISTANCE = 2.0
+
+
+def detect_pet_events(dist, sim_time, threshold: float = THRESHOLD_DISTANCE) -> dict:
+    """
+    앞 차량과의 거리가 임계값 이하로 진입(enter)했다가 다시 초과(exit)하는 구간을 한번에 찾음
+    dist: 앞 차량과의 거리 배열
+    sim_time: 시뮬레이션 시간 배열 (단조 증가)
+    threshold: 임계 거리 [m]
+
+    진입 시점은 이전 거리가 임계값 초과, 현재 거리가 임계값 이하인 행이고
+    이탈 시점은 진입 이후 처음으로 거리가 임계값을 초과하는 행 (NaN은 어느 쪽도 아님)
+    이탈하지 못한 진입 구간은 PET가 없으므로 제외
+    """
+    dist = np.asarray(dist, dtype=np.float64)
+    sim_time = np.asarray(sim_time, dtype=np.float64)
+
+    above = dist > threshold
+    entry_index = np.flatnonzero(above[:-1] & (dist[1:] <= threshold)) + 1
+
+    # 각 진입 뒤의 첫 임계값 초과 행을 이진 탐색으로 연결
+    above_index = np.flatnonzero(above)
+    position = np.searchsorted(above_index, entry_index, side="right")
+    closed = position < len(above_index)
+    entry_index = entry_index[closed]
+    exit_index = above_index[position[closed]]
+
+    pet = sim_time[exit_index] - sim_time[entry_index]
+    positive = pet > 0
+    return {
+        "entry_index": entry_index[positive],
+        "exit_index": exit_index[positive],
+        "entry_time": sim_time[entry_index[positive]],
+        "exit_time": sim_time[exit_index[positive]],
+        "pet": pet[positive],
+    }
+
+
+def pet_events_to_rows(events: dict, digits: int = 2) -> list:
+    """
+    PET 이벤트 배열을 리포트용 dict 리스트로 변환
+    """
+    return [
+        {"EntryTime": round(float(entry), digits), "ExitTime": round(float(exit_), digits), "PET": round(float(pet), digits)}
+        for entry, exit_, pet in zip(events["entry_time"], events["exit_time"], events["pet"])
+    ]
@@ -0,0 +1,130 @@
+import os
+import threading
+
+import numpy as np
+
+from . import riskengine
+
+STATS = ("min", "max", "mean")
+
+_cache = dict()
+_lock = threading.Lock()
+
+
+def build_levels(values, time_step: float = riskengine.TIME_STEP_LENGTH) -> dict:
+    """
+    시계열 하나의 해상도별 요약
+    level 0: 원본, level k: 2^k개 샘플 구간별 min/max/mean (마지막 구간은 남은 샘플만 사용)
+    반환값: {"0/raw": 원본, "k/min": ..., "k/max": ..., "k/mean": ...}
+    """
+    values = np.nan_to_num(np.asarray(values, dtype=np.float64), nan=0.0)
+    levels = {"0/raw": values}
+    n = len(values)
+    level = 1
+    while n and (1 << (level - 1)) < n:
+        size = 1 << level
+        starts = np.arange(0, n, size)
+        counts = np.minimum(starts + size, n) - starts
+        levels[f"{level}/min"] = np.minimum.reduceat(values, starts)
+        levels[f"{level}/max"] = np.maximum.reduceat(values, starts)
+        levels[f"{level}/mean"] = np.add.reduceat(values, starts) / counts
+        level += 1
+    return levels
+
+
+def save(chart_data: dict, path: str, time_step: float = riskengine.TIME_STEP_LENGTH, t_start: float = 0.0) -> str:
+    """
+    chartData 전체의 피라미드를 한 .npz 파일로 저장 (키: "구분/지표/level/통계")
+    t_start: 시계열 첫 샘플의 시뮬레이션 시간 [s]
+    """
+    arrays = {"time_step": np.float64(time_step), "t_start": np.float64(t_start)}
+    for category, table in chart_data.items():
+        for name, values in table.items():
+            for key, array in build_levels(values, time_step).items():
+                arrays[f"{category}/{name}/{key}"] = array
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+    return path
+
+
+class Pyramid():
+    """
+    저장된 피라미드에서 시간 구간/픽셀 폭에 맞는 해상도의 요약을 꺼냄
+    """
+    def __init__(self, arrays: dict):
+        self.arrays = arrays
+        self.time_step = float(arrays["time_step"])
+        # t_start가 없는 이전 파일은 첫 샘플을 0초로 봄
+        self.t_start = float(arrays["t_start"]) if "t_start" in arrays else 0.0
+
+    @classmethod
+    def load(cls, path: str):
+        """
+        .npz 파일을 읽음 (mtime/크기가 같으면 이전에 읽은 결과 반환)
+        """
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        with _lock:
+            cached = _cache.get(key[0])
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        with np.load(path) as data:
+            pyramid = cls({name: data[name] for name in data.files})
+        with _lock:
+            _cache[key[0]] = (key, pyramid)
+        return pyramid
+
+    def series(self) -> dict:
+        """
+        {구분: [지표, ...]} 목록
+        """
+        result = dict()
+        for name in self.arrays:
+            parts = name.split("/")
+            if len(parts) == 4 and parts[2] == "0":
+                result.setdefault(parts[0], []).append(parts[1])
+        return result
+
+    def sample_index(self, t: float) -> int:
+        """
+        시뮬레이션 시간 t 이하인 마지막 샘플 번호 (부동소수점 오차 허용)
+        """
+        return int(np.floor((t - self.t_start) / self.time_step + 1e-9))
+
+    def window(self, category: str, name: str, t0: float = None, t1: float = None, width: int = 1000) -> dict:
+        """
+        [t0, t1] 구간(시뮬레이션 시간 [s])을 width개 이하의 점으로 요약
+        구간 안 샘플 수가 width 이하이면 원본(level 0), 아니면 2^level >= 샘플 수 / width인 가장 낮은 level
+        t1 < t0이면 ValueError
+        """
+        if t0 is not None and t1 is not None and t1 < t0:
+            raise ValueError(f"t1({t1})이 t0({t0})보다 작습니다.")
+        prefix = f"{category}/{name}/"
+        if prefix + "0/raw" not in self.arrays:
+            raise KeyError(f"{category}/{name}")
+        raw = self.arrays[prefix + "0/raw"]
+        n = len(raw)
+        lo = min(n, max(0, self.sample_index(t0))) if t0 is not None else 0
+        hi = min(n, max(0, self.sample_index(t1) + 1)) if t1 is not None else n
+        hi = max(lo, hi)
+        width = max(1, int(width))
+
+        level = 0
+        while (hi - lo) > width * (1 << level):
+            level += 1
+        if level == 0:
+            values = raw[lo:hi]
+            index = np.arange(lo, hi)
+            return {"level": 0, "bucket": 1, "time": (self.t_start + index * self.time_step).tolist(),
+                    "min": values.tolist(), "max": values.tolist(), "mean": values.tolist()}
+
+        size = 1 << level
+        first, last = lo // size, (hi - 1) // size + 1
+        return {
+            "level": level,
+            "bucket": size,
+            "time": (self.t_start + np.arange(first, last) * size * self.time_step).tolist(),
+            **{stat: self.arrays[f"{prefix}{level}/{stat}"][first:last].tolist() for stat in STATS},
+        }
@@ -0,0 +1,75 @@
+import os
+import threading
+import time
+
+from . import batch
+
+
+class Scenario():
+    """
+    서버에 등록된 시나리오 (엑셀 파일 쌍 위치)
+    """
+    def __init__(self, base_name: str, data_dir: str):
+        self.base_name = base_name
+        self.data_dir = os.path.abspath(data_dir)
+        self.registered_at = time.time()
+
+    def file(self, suffix: str) -> str:
+        """
+        data_dir에 있는 <base_name><suffix> 파일 이름 (없으면 빈 문자열)
+        """
+        name = f"{self.base_name}{suffix}"
+        return name if os.path.exists(os.path.join(self.data_dir, name)) else ""
+
+    @property
+    def download_files(self) -> dict:
+        return {
+            "fzp": self.file(".fzp"),
+            "xlsx": self.file(".xlsx"),
+            "raw_xlsx": self.file("_Raw.xlsx"),
+        }
+
+
+class ScenarioRegistry():
+    """
+    서버가 제공하는 시나리오 목록 (watchdog 스레드와 요청 처리 스레드가 함께 사용)
+    """
+    def __init__(self):
+        self._items = dict()
+        self._lock = threading.Lock()
+
+    def register(self, base_name: str, data_dir: str) -> Scenario:
+        scenario = Scenario(base_name, data_dir)
+        with self._lock:
+            self._items[base_name] = scenario
+        return scenario
+
+    def scan(self, directory: str) -> list:
+        """
+        directory의 모든 엑셀 파일 쌍을 등록하고 이름 목록을 반환
+        """
+        if not os.path.isdir(directory):
+            return []
+        base_names = batch.discover_pairs(directory)
+        for base_name in base_names:
+            self.register(base_name, directory)
+        return base_names
+
+    def get(self, base_name: str) -> Scenario:
+        with self._lock:
+            return self._items.get(base_name)
+
+    def names(self) -> list:
+        """
+        등록된 시나리오 이름 (최근 등록 순)
+        """
+        with self._lock:
+            items = list(self._items.values())
+        return [scenario.base_name for scenario in sorted(items, key=lambda s: s.registered_at, reverse=True)]
+
+    def __contains__(self, base_name: str):
+        with self._lock:
+            return base_name in self._items
+
+
+scenarios = ScenarioRegistry()
@@ -0,0 +1,308 @@
+import contextlib
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from . import jsonconverter as jsc
+from . import accumulator
+from . import downsample
+from . import histogram
+from . import metrics
+from . import netseries
+from . import pyramid
+from .sections import resolve
+
+# 📌 메모리에 유지할 리포트 개수 (LRU)
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", 8))
+
+# JSON 파일로 저장하는 섹션
+JSON_SECTIONS = ["simulationSettings", "accidentRiskData", "otherData", "petEvents"]
+
+# 리포트 계산 단계 (진행 상황 보고용, 순서대로 실행)
+STAGES = ["load", "tables", "risk", "other", "serialize"]
+
+# 섹션별 (계산 단계, 의존하는 json_converter getter) - chartBins/chartPreview는 chartData에서 만듦
+SECTION_STAGES = {
+    "simulationSettings": ("other", "get_simulationSetting"),
+    "realTimeData": ("other", "get_realtimeMetrics"),
+    "accidentRiskData": ("risk", "get_accidentRiskRateMetrics"),
+    "otherData": ("other", "get_otherMetrics"),
+    "chartData": ("other", "get_chartData"),
+    "chartBins": ("other", "get_chartData"),
+    "chartPreview": ("other", "get_chartData"),
+    "chartSummary": ("other", "get_chartStatistics"),
+    "petEvents": ("risk", "get_petEvents"),
+}
+SECTIONS = list(SECTION_STAGES)
+
+# 섹션 데이터 형식이 바뀌면 올려서 이전 ETag/버전 URL을 무효화
+SECTION_FORMAT = 5
+
+
+def input_files(base_name: str, data_dir: str = jsc.DATA_DIR) -> list:
+    """
+    리포트 하나를 만드는 데 쓰이는 입력 파일 경로 목록
+    """
+    names = [f"{base_name}.xlsx", f"{base_name}_Raw.xlsx"]
+    network_files = netseries.resolve_network_files(data_dir, base_name)
+    return [os.path.join(data_dir, name) for name in names] + list(network_files.values())
+
+
+def fingerprint(paths: list) -> tuple:
+    """
+    입력 파일들의 (경로, mtime, 크기) 묶음 - 파일이 바뀌면 값이 달라짐
+    """
+    result = []
+    for path in paths:
+        stat = os.stat(path)
+        result.append((os.path.abspath(path), stat.st_mtime_ns, stat.st_size))
+    return tuple(result)
+
+
+def version(key: tuple) -> str:
+    """
+    입력 fingerprint로 만든 리포트 버전 문자열 (입력 파일이 바뀌면 달라짐)
+    리포트를 계산하지 않고도 구할 수 있어 ETag/버전 URL에 사용
+    """
+    return hashlib.sha256(repr((SECTION_FORMAT, key)).encode("utf-8")).hexdigest()[:16]
+
+
+def current_version(base_name: str, data_dir: str = jsc.DATA_DIR) -> str:
+    return version(fingerprint(input_files(base_name, data_dir)))
+
+
+def no_progress(stage: str):
+    return contextlib.nullcontext()
+
+
+class ReportModel():
+    """
+    한 입력 세트의 리포트 섹션 묶음 - 섹션은 처음 요청될 때 한 번만 계산 (json_converter의 지연 getter 사용)
+    HTML 템플릿과 JSON 저장이 같은 결과를 공유함
+    """
+    def __init__(self, base_name: str, key: tuple, data):
+        """
+        data: 섹션을 계산하는 json_converter (모든 섹션을 계산하면 해제)
+        """
+        self.base_name = base_name
+        self.key = key
+        self.data = data
+        self.sections = dict()
+        self.written = False
+        self._statistics = None
+        self._t_start = None
+        self._lock = threading.RLock()
+
+    @classmethod
+    def open(cls, base_name: str, key: tuple = None, data_dir: str = jsc.DATA_DIR):
+        """
+        아무 섹션도 계산하지 않은 모델 (시트도 필요할 때 읽음)
+        """
+        data = jsc.json_converter(os.path.join(data_dir, f"{base_name}.xlsx"), os.path.join(data_dir, f"{base_name}_Raw.xlsx"))
+        return cls(base_name, key or fingerprint(input_files(base_name, data_dir)), data)
+
+    @classmethod
+    def build(cls, base_name: str, key: tuple = None, data_dir: str = jsc.DATA_DIR, progress=no_progress,
+              sections: list = None):
+        """
+        sections 섹션을 계산한 모델 (None이면 전체)
+        progress: 단계 이름(STAGES)을 받아 context manager를 반환하는 함수 - 단계마다 with로 감싸 실행
+        """
+        return cls.open(base_name, key, data_dir).materialize(sections, progress)
+
+    def ready(self, sections: list = None) -> bool:
+        """
+        sections가 모두 계산되어 있으면 True (None이면 전체 계산 + outputs 저장까지)
+        """
+        with self._lock:
+            if sections is None:
+                return self.written
+            return all(name in self.sections for name in sections)
+
+    def materialize(self, sections: list = None, progress=no_progress):
+        """
+        요청한 섹션만 계산 (None이면 전체) - 이미 계산한 섹션과 필요 없는 단계는 건너뜀
+        """
+        with self._lock:
+            missing = [name for name in (sections or SECTIONS) if name not in self.sections]
+            if not missing:
+                return self
+            getters = list(dict.fromkeys(SECTION_STAGES[name][1] for name in missing))
+            with progress("load"):
+                # 요청한 섹션이 쓰는 시트를 파일별로 한 번에 읽음
+                self.data.require(*getters)
+            _, tables = resolve(type(self.data), getters)
+            tables = [name for name in tables if name not in vars(self.data)]
+            if tables:
+                with progress("tables"):
+                    for name in tables:
+                        getattr(self.data, name)
+            for stage in ("risk", "other"):
+                names = [name for name in missing if SECTION_STAGES[name][0] == stage]
+                if names:
+                    with progress(stage):
+                        for name in names:
+                            self.section(name)
+            if all(name in self.sections for name in SECTIONS):
+                # 모든 섹션을 계산했으면 남은 값도 구해 두고 시트/중간 테이블을 해제
+                self._statistics = self.statistics
+                self._t_start = self.t_start
+                self.data = None
+        return self
+
+    def write_outputs(self, output_dir="outputs", progress=no_progress):
+        """
+        전체 섹션을 outputs/<scenario>.json과 피라미드로 한 번만 저장
+        """
+        with self._lock:
+            if self.written:
+                return
+            self.materialize(None, progress)
+            with progress("serialize"):
+                self.write_json(output_dir)
+                with metrics.timer("write_pyramid"):
+                    self.write_pyramid(output_dir)
+            self.written = True
+
+    def section(self, name: str):
+        """
+        섹션 하나 (계산되어 있지 않으면 계산)
+        """
+        with self._lock:
+            if name not in self.sections:
+                self.sections[name] = self._compute(name)
+            return self.sections[name]
+
+    def _compute(self, name: str):
+        data = self.data
+        # 브라우저에는 원본 대신 구간별 개수와 다운샘플링된 시계열만 보냄 (원본은 chartData API로 제공)
+        if name == "chartBins":
+            per_vehicle = ("Vehicles_in_network",) if data.net_per_vehicle else ()
+            return histogram.chart_bins(self.section("chartData"), per_vehicle=per_vehicle)
+        if name == "chartPreview":
+            return downsample.downsample_chart(self.section("chartData"))
+        if name == "chartSummary":
+            return accumulator.summarize(self.statistics)
+        if name == "petEvents":
+            return data.get_petEvents()
+        return getattr(data, SECTION_STAGES[name][1])() or {}
+
+    @property
+    def statistics(self) -> dict:
+        """
+        chartData 시계열의 구분/지표별 누적기 (배치 요약에서 시나리오끼리 합칠 때 사용)
+        NaN을 0으로 바꾸기 전의 값으로 계산
+        """
+        with self._lock:
+            if self._statistics is None:
+                self._statistics = self.data.get_chartStatistics()
+            return self._statistics
+
+    @property
+    def t_start(self) -> float:
+        """
+        chartData 시계열 첫 샘플의 시뮬레이션 시간 [s]
+        """
+        with self._lock:
+            if self._t_start is None:
+                self._t_start = self.data.start_time
+            return self._t_start
+
+    @property
+    def version(self) -> str:
+        return version(self.key)
+
+    @property
+    def scenario_name(self) -> str:
+        return self.section("simulationSettings").get("ScenarioName", "default_scenario").replace(" ", "_")
+
+    def write_json(self, output_dir="outputs") -> str:
+        return jsc.write_json({name: self.section(name) for name in JSON_SECTIONS}, output_dir)
+
+    def pyramid_path(self, output_dir="outputs") -> str:
+        return os.path.join(output_dir, f"{self.scenario_name}.pyramid.npz")
+
+    def write_pyramid(self, output_dir="outputs") -> str:
+        """
+        chartData의 해상도별 min/max/mean 요약을 outputs/<scenario>.pyramid.npz로 저장
+        """
+        return pyramid.save(self.section("chartData"), self.pyramid_path(output_dir), t_start=self.t_start)
+
+    def pyramid(self, output_dir="outputs") -> pyramid.Pyramid:
+        path = self.pyramid_path(output_dir)
+        if not os.path.exists(path):
+            self.write_pyramid(output_dir)
+        return pyramid.Pyramid.load(path)
+
+
+class ReportCache():
+    """
+    입력 파일 fingerprint를 키로 하는 프로세스 내 LRU 캐시
+    """
+    def __init__(self, maxsize: int = REPORT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple):
+        with self._lock:
+            model = self._items.get(key)
+            if model is not None:
+                self._items.move_to_end(key)
+            return model
+
+    def put(self, model: ReportModel):
+        with self._lock:
+            # 같은 시나리오의 이전 입력 버전은 제거
+            for key in [k for k, m in self._items.items() if m.base_name == model.base_name]:
+                del self._items[key]
+            self._items[model.key] = model
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+report_cache = ReportCache()
+
+
+# 입력 fingerprint마다 모델을 하나만 만들기 위한 잠금 - 같은 입력을 동시에 요청하면 같은 모델의 잠금에서 한 번만 계산
+_models_lock = threading.Lock()
+
+
+def get_report(base_name: str, output_dir: str = "outputs", data_dir: str = jsc.DATA_DIR,
+               progress=no_progress, sections: list = None) -> ReportModel:
+    """
+    입력 파일이 바뀌지 않았으면 캐시된 리포트를, 바뀌었으면 새 리포트를 반환
+    sections: 계산할 섹션 (None이면 전체 계산 후 outputs/<scenario>.json과 피라미드 저장)
+    다른 스레드가 같은 입력을 계산 중이면 그 계산이 끝나기를 기다림 (이미 계산된 단계는 progress가 호출되지 않음)
+    """
+    key = fingerprint(input_files(base_name, data_dir))
+    model = report_cache.get(key)
+    metrics.cache_result("report", model is not None and model.ready(sections))
+    if model is None:
+        with _models_lock:
+            model = report_cache.get(key)
+            if model is None:
+                model = ReportModel.open(base_name, key, data_dir)
+                report_cache.put(model)
+
+    if sections is None:
+        model.write_outputs(output_dir, progress)
+    else:
+        model.materialize(sections, progress)
+    return model
+
+
+def cached_report(base_name: str, data_dir: str = jsc.DATA_DIR, sections: list = None):
+    """
+    현재 입력 파일로 이미 sections가 계산된 리포트 (없으면 None, 계산하지 않음)
+    """
+    model = report_cache.get(fingerprint(input_files(base_name, data_dir)))
+    if model is not None and model.ready(sections):
+        metrics.cache_result("report", True)
+        return model
+    return None
@@ -0,0 +1,120 @@
+import json
+import math
+import re
+
+import numpy as np
+
+# 📌 orjson이 있으면 JSON 직렬화에 사용 (없으면 표준 json 모듈, 두 경우 모두 같은 형식으로 출력)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 들여쓰기 칸 수 (기존 outputs/*.json과 같은 4칸, orjson은 2칸만 지원하므로 줄 앞 공백을 두 배로 늘림)
+INDENT = 4
+_LEADING_SPACES = re.compile(r"^( +)", re.MULTILINE)
+
+
+def to_native(value):
+    """
+    numpy/pandas 값을 JSON에 바로 쓸 수 있는 파이썬 기본형으로 변환 (NaN은 0.0, ±inf는 None)
+    dict/list는 재귀적으로 변환, 배열은 한 번에 변환
+    """
+    if isinstance(value, dict):
+        return {key: to_native(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_native(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return series(value)
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return 0.0 if math.isnan(value) else None
+    return value
+
+
+def series(values) -> list:
+    """
+    숫자 시계열을 파이썬 리스트로 변환 (NaN → 0.0을 한 번에 처리, ±inf는 None)
+    숫자가 아닌 값이 섞여 있으면 값별로 변환
+    """
+    array = np.asarray(values)
+    if array.dtype.kind == "f":
+        result = np.nan_to_num(array, nan=0.0, posinf=np.inf, neginf=-np.inf).tolist()
+        if np.isinf(array).any():
+            result = [value if math.isfinite(value) else None for value in result]
+        return result
+    if array.dtype.kind in "iub":
+        return array.tolist()
+    return [to_native(item) for item in values]
+
+
+def series_table(table: dict) -> dict:
+    """
+    {이름: 시계열} 테이블 변환 (chartData의 Ego_vehicle, Around_Vehicle, Vehicles_in_network)
+    """
+    return {name: series(values) for name, values in table.items()}
+
+
+def titled_rows(titles: list, rows: list, driving_time) -> list:
+    """
+    [{"title", "drivingTime", "rows"}] 형식의 지표 목록 (accidentRiskData, otherData)
+    """
+    driving_time = to_native(driving_time)
+    return [{"title": title, "drivingTime": driving_time, "rows": to_native(row)} for title, row in zip(titles, rows)]
+
+
+def summary_rows(tables: dict) -> dict:
+    """
+    {이름: [["Min", ...], ["Max", ...], ["Avg", ...]]} 형식의 요약 (realTimeData)
+    """
+    return {name: to_native(rows) for name, rows in tables.items()}
+
+
+def _default(value):
+    if isinstance(value, (np.generic, np.ndarray)):
+        return to_native(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _finite(value):
+    """
+    표준 json 모듈용 - NaN/inf를 None으로 (orjson과 같이 null로 출력)
+    """
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        # 문자열이 아닌 키는 orjson(OPT_NON_STR_KEYS)과 같이 JSON 표기로 변환
+        return {key if isinstance(key, str) else json.dumps(_finite(key)): _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    if isinstance(value, (np.generic, np.ndarray)):
+        return _finite(value.tolist())
+    return value
+
+
+def dumps(data, indent: int = None, sort_keys: bool = False, **kwargs) -> str:
+    """
+    리포트 데이터를 JSON 문자열로 변환 (orjson이 있으면 orjson 사용)
+    indent: 값이 있으면 INDENT(4칸) 들여쓰기, 없으면 공백 없는 한 줄
+    Jinja2 tojson 필터의 dumps 함수로도 사용
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        text = orjson.dumps(data, default=_default, option=option).decode("utf-8")
+        # 문자열 안의 줄바꿈은 \n으로 이스케이프되므로 줄 앞 공백은 모두 들여쓰기
+        return _LEADING_SPACES.sub(lambda match: match.group(1) * 2, text) if indent else text
+    return json.dumps(_finite(data), indent=INDENT if indent else None, separators=(",", ": ") if indent else (",", ":"),
+                      sort_keys=sort_keys, ensure_ascii=False, allow_nan=False)
+
+
+def dump(data, path: str, indent: bool = True):
+    """
+    리포트 데이터를 JSON 파일로 저장 (dumps와 같은 형식)
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(dumps(data, indent=indent))
@@ -0,0 +1,253 @@
+import math
+
+import numpy as np
+
+from .pet import THRESHOLD_DISTANCE, detect_pet_events
+
+# 사고위험 지표 계산에 쓰이는 상수
+TIME_STEP_LENGTH = 0.1  # Time step length in seconds
+VEHICLE_LENGTH = 4.65  # Length of the vehicle in meters
+NUM_FREEWAY_LANES = 3  # Number of freeway lanes
+MADR = -7.8
+TTC_THRESHOLD = 3.0
+MTTC_THRESHOLD = 3.5
+DELTAV_TTC_THRESHOLD = 1.5
+
+# 마지막 차로 변경 시점의 PICUD 거리 확보 여부 (0: 차로 변경 없음, 1: 준수, 2: 위반) → Lanechange_Analysis 표시 값
+PICUD_RESULTS = {0: "차선변경 없음", 1: "차선변경 거리 확보 준수", 2: "차선변경 거리 확보 위반"}
+
+
+def to_array(values) -> np.ndarray:
+    """
+    Series/list를 float64 배열로 변환 (숫자가 아닌 값은 NaN)
+    """
+    if hasattr(values, "to_numpy"):
+        values = values.to_numpy()
+    array = np.asarray(values)
+    if array.dtype.kind in "fiub":
+        return array.astype(np.float64, copy=False)
+    result = np.full(len(array), np.nan)
+    for i, value in enumerate(array):
+        try:
+            result[i] = float(value)
+        except (TypeError, ValueError):
+            pass
+    return result
+
+
+def acceleration(speed, time_increment: float = TIME_STEP_LENGTH) -> np.ndarray:
+    """
+    속도 배열로부터 가속도 계산 (첫 값은 0)
+    """
+    speed = to_array(speed)
+    accel = np.zeros(len(speed))
+    if len(speed) > 1:
+        accel[1:] = np.diff(speed) / time_increment
+    return accel
+
+
+def _positive_root(t1: np.ndarray, t2: np.ndarray, fallback: float) -> np.ndarray:
+    """
+    두 근 중 양수인 최소값을 선택, 둘 다 양수가 아니면 fallback
+    """
+    return np.where((t1 > 0) & (t2 > 0), np.minimum(t1, t2),
+                    np.where(t1 > 0, t1, np.where(t2 > 0, t2, fallback)))
+
+
+def surrogate_safety(ego_vel, tgr_vel, dist, ego_accel, tgr_accel, safe_dist) -> dict:
+    """
+    행 단위 대리안전지표(TTC, MTTC, DRAC, CPI, SDI, DeltaV, CAI)를 열 단위로 한번에 계산
+    모든 입력은 같은 길이의 배열이며 결과도 행마다 하나의 값을 가짐
+    """
+    ego_vel = to_array(ego_vel)
+    tgr_vel = to_array(tgr_vel)
+    dist = to_array(dist)
+    ego_accel = to_array(ego_accel)
+    tgr_accel = to_array(tgr_accel)
+    safe_dist = to_array(safe_dist)
+
+    delta_v = ego_vel - tgr_vel
+    delta_a = ego_accel - tgr_accel
+    has_accel = delta_a != 0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Calculate TTC
+        discriminant = delta_v ** 2 - 2 * delta_a * dist
+        quadratic = has_accel & (discriminant >= 0)
+        root = np.sqrt(np.where(quadratic, discriminant, 0.0))
+        t1 = (-delta_v - root) / delta_a
+        t2 = (-delta_v + root) / delta_a
+        linear = np.where(delta_v > 0, dist / delta_v, 0.0)
+        TTC = np.where(quadratic, _positive_root(t1, t2, 0.0), linear)
+
+        # Calculate MTTC (음수 값이 sqrt()로 들어가지 않도록 0으로 제한)
+        sqrt_value = delta_v ** 2 + 2 * delta_a * dist
+        root = np.sqrt(np.where(sqrt_value > 0, sqrt_value, 0.0))
+        t1 = np.where(has_accel, (-delta_v - root) / delta_a, np.inf)
+        t2 = np.where(has_accel, (-delta_v + root) / delta_a, np.inf)
+        MTTC = _positive_root(t1, t2, np.inf)
+
+        # Calculate DRAC
+        DRAC = np.where(dist != 0, delta_v ** 2 / (2 * dist) - VEHICLE_LENGTH, 0.0)
+
+        # Calculate CPI
+        CPI = (DRAC >= -1 * MADR).astype(np.int64)
+
+        # Calculate SDI (Safe Distance Index) - SSD 비교
+        SSD_L = safe_dist + (ego_vel * 1000 / 3600) ** 2 / (2 * 9.8)
+        SSD_F = (tgr_vel * 1000 / 3600) ** 2 / (2 * 9.8)
+        SDI = np.where(SSD_L > SSD_F, 0, 1)
+
+        # Calculate DeltaV
+        DeltaV = np.where(TTC < DELTAV_TTC_THRESHOLD, np.abs(delta_v), 0.0)
+
+        # Calculate CAI (MTTC가 0, inf, NaN이면 CAI는 0)
+        valid = (MTTC > 0) & (MTTC != np.inf) & ~np.isnan(MTTC)
+        numerator = (ego_vel + ego_accel * MTTC) ** 2 - (tgr_vel + tgr_accel * MTTC) ** 2
+        denominator = 2 * MTTC ** 2
+        CAI = np.where(valid & (denominator > 0), numerator / denominator, 0.0)
+
+    return {
+        "TTC": TTC,
+        "MTTC": MTTC,
+        "DRAC": DRAC,
+        "CPI": CPI,
+        "SDI": SDI,
+        "DeltaV": DeltaV,
+        "CAI": CAI,
+    }
+
+
+
+def _positive_root_one(t1: float, t2: float, fallback: float) -> float:
+    if t1 > 0 and t2 > 0:
+        return min(t1, t2)
+    if t1 > 0:
+        return t1
+    if t2 > 0:
+        return t2
+    return fallback
+
+
+def surrogate_safety_one(ego_vel: float, tgr_vel: float, dist: float, ego_accel: float, tgr_accel: float,
+                         safe_dist: float) -> dict:
+    """
+    한 시점의 대리안전지표 (surrogate_safety와 같은 값, 실시간 분석에서 프레임마다 호출)
+    배열을 만들지 않고 math로 계산 (0으로 나누는 경우는 surrogate_safety의 inf/NaN 결과와 같게 처리)
+    """
+    delta_v = ego_vel - tgr_vel
+    delta_a = ego_accel - tgr_accel
+    has_accel = delta_a != 0
+
+    # TTC
+    discriminant = delta_v * delta_v - 2 * delta_a * dist
+    if has_accel and discriminant >= 0:
+        root = math.sqrt(discriminant)
+        ttc = _positive_root_one((-delta_v - root) / delta_a, (-delta_v + root) / delta_a, 0.0)
+    else:
+        ttc = dist / delta_v if delta_v > 0 else 0.0
+
+    # MTTC
+    if has_accel:
+        sqrt_value = delta_v * delta_v + 2 * delta_a * dist
+        root = math.sqrt(sqrt_value) if sqrt_value > 0 else 0.0
+        mttc = _positive_root_one((-delta_v - root) / delta_a, (-delta_v + root) / delta_a, math.inf)
+    else:
+        mttc = math.inf
+
+    # DRAC / CPI
+    drac = delta_v * delta_v / (2 * dist) - VEHICLE_LENGTH if dist != 0 else 0.0
+    cpi = 1 if drac >= -1 * MADR else 0
+
+    # SDI
+    ego_ms = ego_vel * 1000 / 3600
+    tgr_ms = tgr_vel * 1000 / 3600
+    ssd_l = safe_dist + ego_ms * ego_ms / (2 * 9.8)
+    ssd_f = tgr_ms * tgr_ms / (2 * 9.8)
+    sdi = 0 if ssd_l > ssd_f else 1
+
+    # DeltaV
+    delta_v_value = abs(delta_v) if ttc < DELTAV_TTC_THRESHOLD else 0.0
+
+    # CAI
+    cai = 0.0
+    if mttc > 0 and mttc != math.inf and not math.isnan(mttc):
+        denominator = 2 * mttc * mttc
+        if denominator > 0:
+            ego_term = ego_vel + ego_accel * mttc
+            tgr_term = tgr_vel + tgr_accel * mttc
+            cai = (ego_term * ego_term - tgr_term * tgr_term) / denominator
+
+    return {"TTC": ttc, "MTTC": mttc, "DRAC": drac, "CPI": cpi, "SDI": sdi, "DeltaV": delta_v_value, "CAI": cai}
+
+def picud(ego_vel, tgr_vel, ego_accel, tgr_accel, safe_dist) -> np.ndarray:
+    """
+    차선 변경시 필요한 PICUD 거리 계산 (delta_a가 0이면 무한대)
+    """
+    ego_vel = to_array(ego_vel)
+    tgr_vel = to_array(tgr_vel)
+    delta_a = to_array(ego_accel) - to_array(tgr_accel)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = (ego_vel ** 2 - tgr_vel ** 2) / (2 * delta_a) + to_array(safe_dist) - tgr_vel * TIME_STEP_LENGTH
+    return np.where(delta_a != 0, value, np.inf)
+
+
+
+def picud_one(ego_vel: float, tgr_vel: float, ego_accel: float, tgr_accel: float, safe_dist: float) -> float:
+    """
+    한 시점의 PICUD 거리 (picud와 같은 값)
+    """
+    delta_a = ego_accel - tgr_accel
+    if delta_a == 0:
+        return math.inf
+    return (ego_vel * ego_vel - tgr_vel * tgr_vel) / (2 * delta_a) + safe_dist - tgr_vel * TIME_STEP_LENGTH
+
+def lane_changes(lane) -> np.ndarray:
+    """
+    이전 시점 대비 차선이 바뀐 행의 인덱스 (첫 행 제외)
+    """
+    lane = np.asarray(lane)
+    return np.flatnonzero(lane[1:] != lane[:-1]) + 1
+
+
+def risk_summary(raw_dist, ego_accel, tgr_accel, pet_threshold: float = THRESHOLD_DISTANCE) -> dict:
+    """
+    Distnace 시트 전체에 대해 사고위험 지표 요약값을 계산
+    get_accidentRiskRateMetrics의 TTC/MTTC/DRAC/RCRI/CPI/DeltaV/CAI/PET/Headway와 같은 값
+    ego_accel, tgr_accel: 자차/앞 차량 가속도 시계열 (json_converter의 tgr_accel처럼 이미 계산한 값을 넘김)
+    """
+    ego_vel = to_array(raw_dist["속도  [km/h]"])
+    tgr_vel = to_array(raw_dist["앞 차량 속도  [km/h]"])
+    dist = to_array(raw_dist["앞 차량과의 거리  [m]"])
+    ego_accel = to_array(ego_accel)
+    tgr_accel = to_array(tgr_accel)
+    safe_dist = to_array(raw_dist["안전거리  [m]"])
+    sim_time = to_array(raw_dist["시뮬레이션 시간"])
+
+    # 첫 행은 이전 시점이 없으므로 제외
+    metrics = surrogate_safety(ego_vel[1:], tgr_vel[1:], dist[1:], ego_accel[1:], tgr_accel[1:], safe_dist[1:])
+
+    TTC = metrics["TTC"]
+    MTTC = metrics["MTTC"]
+    DeltaV = metrics["DeltaV"]
+    CAI = metrics["CAI"]
+    headway = dist[1:]
+
+    period = len(raw_dist) * TIME_STEP_LENGTH
+    RCRI = np.sum(metrics["SDI"]) / (period * (period / 3600) * NUM_FREEWAY_LANES)
+
+    PET_data = detect_pet_events(dist, sim_time, pet_threshold)["pet"]
+
+    return {
+        "TTC": round(np.nanmin(TTC[TTC > TTC_THRESHOLD]), 2),
+        "MTTC": round(np.nanmin(MTTC[MTTC > MTTC_THRESHOLD]), 2),
+        "DRAC": round(np.nanmax(metrics["DRAC"]), 2),
+        "RCRI": round(RCRI, 2),
+        "CPI": round(np.nanmean(metrics["CPI"]), 2),
+        "DeltaV": round(np.nanmax(DeltaV[DeltaV > 0]), 2),
+        "CAI": round(np.nanmax(CAI[CAI > 0]), 2),
+        "PET": round(np.nanmin(PET_data) if len(PET_data) > 0 else 0, 2),
+        "Headway": round(np.nanmin(headway[headway > 0]), 2),
+        "PET_Count": len(PET_data),
+    }
+
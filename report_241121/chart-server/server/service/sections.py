@@ -0,0 +1,103 @@
+import functools
+from collections.abc import Mapping
+
+
+class SheetBook(Mapping):
+    """
+    필요한 시트만 읽어오는 지연 로딩 시트 dict
+    loader: 시트 이름 리스트를 받아 {시트 이름: DataFrame}을 반환하는 함수
+    """
+    def __init__(self, loader, sheet_names: list):
+        self._loader = loader
+        self._names = list(sheet_names)
+        self._sheets = dict()
+
+    def load(self, names):
+        """
+        아직 읽지 않은 시트를 한 번에 읽음 (엑셀 파싱을 한 번으로 묶기 위함)
+        """
+        missing = [name for name in names if name not in self._sheets]
+        if missing:
+            self._sheets.update(self._loader(missing))
+
+    @property
+    def loaded(self) -> list:
+        return list(self._sheets)
+
+    def __getitem__(self, name):
+        if name not in self._names:
+            raise KeyError(name)
+        self.load([name])
+        return self._sheets[name]
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+
+class intermediate():
+    """
+    처음 접근할 때 한 번만 계산되는 중간 테이블 (인스턴스 속성으로 저장)
+    depends: 사용하는 시트("origin:Speed", "raw:Distnace")와 다른 중간 테이블 이름
+    """
+    def __init__(self, *depends):
+        self.depends = depends
+
+    def __call__(self, func):
+        self.func = func
+        self.__doc__ = func.__doc__
+        return self
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        instance.require(*self.depends)
+        value = self.func(instance)
+        instance.__dict__[self.name] = value
+        return value
+
+
+def section(*depends):
+    """
+    리포트 섹션 getter를 지연 계산 + 메모이제이션
+    depends: 사용하는 시트와 중간 테이블 이름 - 계산 전에 필요한 시트를 한 번에 읽음
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key = (func.__name__, args, tuple(sorted(kwargs.items())))
+            if key not in self._sections:
+                self.require(*depends)
+                self._sections[key] = func(self, *args, **kwargs)
+            return self._sections[key]
+        wrapper.depends = depends
+        return wrapper
+    return decorator
+
+
+def resolve(owner, depends) -> tuple:
+    """
+    의존성을 재귀적으로 펼쳐 (시트 목록, 중간 테이블 목록)을 계산 순서대로 반환
+    """
+    sheets = []
+    tables = []
+
+    def visit(name):
+        if ":" in name:
+            if name not in sheets:
+                sheets.append(name)
+            return
+        if name in tables:
+            return
+        for dependency in getattr(getattr(owner, name), "depends", ()):
+            visit(dependency)
+        tables.append(name)
+
+    for name in depends:
+        visit(name)
+    return sheets, tables
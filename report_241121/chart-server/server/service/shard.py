@@ -0,0 +1,255 @@
+import glob
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import live
+from . import pet
+from . import riskengine
+from . import sheetcache
+
+# 📌 샤드마다 앞에 붙여 읽는 이전 행 수 (앞 차량 가속도, PET 진입, 차로 변경은 바로 이전 행만 봄)
+OVERLAP = 1
+# 📌 맵 단계 결과(샤드별 부분 집계)를 저장하는 공유 디렉토리 (여러 머신이 같은 경로를 마운트해서 사용)
+PARTIAL_DIR = os.getenv("SHARD_PARTIAL_DIR", os.path.join(os.path.dirname(__file__), "..", "..", ".cache", "partials"))
+
+# Distnace 시트에서 읽는 열 (live.FRAME_FIELDS와 같은 이름), 급제동/차로 변경은 Speed 시트 기준
+DISTANCE_COLUMNS = ["time", "speed", "accel", "lead_speed", "dist", "safe_dist"]
+SPEED_COLUMNS = {"time": "시뮬레이션 시간", "speed": "속도  [km/h]", "accel": "가속도  [m/s^2]", "lane": "차선"}
+
+
+def plan_shards(rows: int, shards: int) -> list:
+    """
+    [0, rows)를 거의 같은 크기의 연속 구간 shards개로 나눔 → [(start, stop), ...]
+    """
+    shards = max(1, min(shards, rows))
+    bounds = np.linspace(0, rows, shards + 1).round().astype(int).tolist()
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def row_count(raw_path: str, cache_dir: str = None) -> int:
+    """
+    Raw 엑셀 Distnace 시트의 행 수 (처음이면 시트를 한 번 파싱해 캐시에 저장)
+    """
+    return len(sheetcache.read_columns(raw_path, "Distnace", [live.FRAME_FIELDS["time"]], cache_dir)[live.FRAME_FIELDS["time"]])
+
+
+class ShardPartial(live.LiveAnalyzer):
+    """
+    시간축 구간 하나의 부분 집계 - 실시간 분석기(LiveAnalyzer)와 같은 상태를 행 배열로 한 번에 채우고
+    인접한 구간끼리 merge로 합침 (합친 결과의 realtime()/risk()는 전체를 한 번에 계산한 값과 같음)
+    구간 경계를 넘는 PET 구간은 왼쪽의 열린 진입 시점과 오른쪽의 첫 임계값 초과 시점으로 이어 붙임
+    """
+    def __init__(self, start: int = 0, stop: int = 0, **kwargs):
+        super().__init__(**kwargs)
+        self.start = start
+        self.stop = stop
+        self.first_above_time = None
+        self.open_entry_time = None
+
+    def add_rows(self, distance: dict, speed: dict, start: int, stop: int):
+        """
+        distance: DISTANCE_COLUMNS 키의 Distnace 시트 열, speed: SPEED_COLUMNS 키의 Speed 시트 열
+        두 dict 모두 전체 행 배열(메모리 매핑)이며, [start - OVERLAP, stop) 범위만 읽음
+        """
+        begin = max(0, start - OVERLAP)
+        head = start - begin
+        columns = {name: riskengine.to_array(values[begin:stop]) for name, values in distance.items()}
+        time, dist = columns["time"], columns["dist"]
+        ego = (columns["speed"], columns["accel"])
+        lead_speed = columns["lead_speed"]
+
+        # 전체 첫 행의 앞 차량 가속도는 0 (riskengine.acceleration과 같음)
+        lead_accel = riskengine.acceleration(lead_speed, self.time_step)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ttc = np.where(ego[0] != lead_speed, dist / (ego[0] - lead_speed), dist)
+        rows = slice(head, None)
+        for stats, values in ((self.ego, (ego[0], ego[1], dist, ttc)), (self.around, (lead_speed, lead_accel, dist, ttc))):
+            for name, array in zip(self.SERIES, values):
+                stats[name].add_array(array[rows])
+
+        # 사고위험 지표는 앞에 붙인 행을 빼고, 첫 샤드는 risk_summary와 같이 전체 첫 행을 제외 (둘 다 1행)
+        risk = slice(1, None)
+        self._add_risk(riskengine.surrogate_safety(ego[0][risk], lead_speed[risk], dist[risk], ego[1][risk],
+                                                   lead_accel[risk], columns["safe_dist"][risk]), dist[risk])
+        self._add_pet(dist, time, head)
+
+        lane = np.asarray(speed["lane"][begin:stop])
+        speed_time = riskengine.to_array(speed["time"][begin:stop])
+        brake = riskengine.to_array(speed["accel"][start:stop]) < live.HARD_BRAKE_ACCEL
+        self.hard_brakes += int(np.count_nonzero(brake))
+        changed = riskengine.lane_changes(lane)
+        self.lane_changes += len(changed)
+        self.lane_change_time += float(np.sum(speed_time[changed] - speed_time[changed - 1]))
+        # 이 구간의 마지막 차로 변경 시점 PICUD (Distnace 시트에 있는 행만, get_accidentRiskRateMetrics와 같음)
+        changed = changed[changed < len(dist)]
+        if len(changed):
+            i = changed[-1]
+            picud = riskengine.picud_one(float(ego[0][i]), float(lead_speed[i]), float(ego[1][i]), float(lead_accel[i]),
+                                         float(columns["safe_dist"][i]))
+            self.picud_result = 2 if dist[i] < picud else 1
+
+        self.frames += stop - start
+        self.last_time = float(time[-1]) if len(time) else self.last_time
+        self.start, self.stop = start, stop
+        return self
+
+    def _add_risk(self, values: dict, headway: np.ndarray):
+        def extreme(reduce, array, current):
+            return reduce(current, float(np.min(array) if reduce is min else np.max(array))) if len(array) else current
+
+        ttc, mttc, drac = values["TTC"], values["MTTC"], values["DRAC"]
+        self.ttc_min = extreme(min, ttc[ttc > riskengine.TTC_THRESHOLD], self.ttc_min)
+        self.mttc_min = extreme(min, mttc[mttc > riskengine.MTTC_THRESHOLD], self.mttc_min)
+        self.drac_max = extreme(max, drac[~np.isnan(drac)], self.drac_max)
+        self.cpi.add_array(values["CPI"])
+        self.sdi_total += int(np.sum(values["SDI"]))
+        self.delta_v_max = extreme(max, values["DeltaV"][values["DeltaV"] > 0], self.delta_v_max)
+        self.cai_max = extreme(max, values["CAI"][values["CAI"] > 0], self.cai_max)
+        self.headway_min = extreme(min, headway[headway > 0], self.headway_min)
+
+    def _add_pet(self, dist: np.ndarray, time: np.ndarray, head: int):
+        # 앞에 붙인 행은 진입 판정(이전 거리)에만 쓰고, 진입/이탈 시점은 이 구간의 행만 사용
+        events = pet.detect_pet_events(dist, time, self.pet_threshold)
+        if len(events["pet"]):
+            self.pet_count += len(events["pet"])
+            self.pet_min = min(self.pet_min, float(np.min(events["pet"])))
+
+        above = np.flatnonzero(dist[head:] > self.pet_threshold) + head
+        if len(above):
+            self.first_above_time = float(time[above[0]])
+        entries = np.flatnonzero((dist[:-1] > self.pet_threshold) & (dist[1:] <= self.pet_threshold)) + 1
+        if len(entries) and (not len(above) or entries[-1] > above[-1]):
+            self.open_entry_time = float(time[entries[-1]])
+
+    def merge(self, other: "ShardPartial"):
+        """
+        바로 오른쪽(시간상 뒤) 구간의 부분 집계를 합침
+        """
+        if other.start != self.stop:
+            raise ValueError(f"인접하지 않은 샤드는 합칠 수 없습니다: [{self.start}, {self.stop}) + [{other.start}, {other.stop})")
+        for stats, other_stats in ((self.ego, other.ego), (self.around, other.around)):
+            for name in self.SERIES:
+                stats[name].merge(other_stats[name])
+        self.ttc_min = min(self.ttc_min, other.ttc_min)
+        self.mttc_min = min(self.mttc_min, other.mttc_min)
+        self.drac_max = max(self.drac_max, other.drac_max)
+        self.cpi.merge(other.cpi)
+        self.sdi_total += other.sdi_total
+        self.delta_v_max = max(self.delta_v_max, other.delta_v_max)
+        self.cai_max = max(self.cai_max, other.cai_max)
+        self.headway_min = min(self.headway_min, other.headway_min)
+        self.hard_brakes += other.hard_brakes
+        self.lane_changes += other.lane_changes
+        self.lane_change_time += other.lane_change_time
+        if other.picud_result:
+            self.picud_result = other.picud_result
+
+        # 왼쪽에서 열린 PET 구간은 오른쪽의 첫 임계값 초과 시점에 닫힘
+        self.pet_count += other.pet_count
+        self.pet_min = min(self.pet_min, other.pet_min)
+        if self.open_entry_time is not None and other.first_above_time is not None:
+            value = other.first_above_time - self.open_entry_time
+            if value > 0:
+                self.pet_count += 1
+                self.pet_min = min(self.pet_min, value)
+            self.open_entry_time = other.open_entry_time
+        elif self.open_entry_time is None:
+            self.open_entry_time = other.open_entry_time
+        if self.first_above_time is None:
+            self.first_above_time = other.first_above_time
+
+        self.frames += other.frames
+        self.last_time = other.last_time if other.last_time is not None else self.last_time
+        self.stop = other.stop
+        return self
+
+    def summary(self) -> dict:
+        return {"rows": [self.start, self.stop], "realTimeData": self.realtime(), "accidentRiskData": self.risk()}
+
+
+def map_shard(raw_path: str, start: int, stop: int, cache_dir: str = None) -> ShardPartial:
+    """
+    [start, stop) 행의 부분 집계 (작업 프로세스에서 실행, 필요한 열의 해당 범위만 읽음)
+    """
+    distance = sheetcache.read_columns(raw_path, "Distnace", [live.FRAME_FIELDS[name] for name in DISTANCE_COLUMNS], cache_dir)
+    speed = sheetcache.read_columns(raw_path, "Speed", list(SPEED_COLUMNS.values()), cache_dir)
+    return ShardPartial(start, stop).add_rows(
+        {name: distance[live.FRAME_FIELDS[name]] for name in DISTANCE_COLUMNS},
+        {name: speed[column] for name, column in SPEED_COLUMNS.items()}, start, stop)
+
+
+def partial_path(partial_dir: str, scenario: str, index: int, shards: int) -> str:
+    return os.path.join(partial_dir, scenario, f"shard-{index:04d}-of-{shards:04d}.pkl")
+
+
+def write_partial(partial: ShardPartial, path: str):
+    """
+    임시 파일에 쓴 뒤 교체 (다른 머신의 reduce 단계가 쓰는 중인 파일을 읽지 않도록)
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        pickle.dump(partial, f)
+    os.replace(tmp_path, path)
+
+
+def run_map(raw_path: str, scenario: str, shards: int, indexes: list = None, partial_dir: str = PARTIAL_DIR,
+            workers: int = None, cache_dir: str = None, on_result=None) -> list:
+    """
+    샤드들을 ProcessPoolExecutor로 나눠 계산하고 partial_dir/<scenario>/에 저장
+    indexes: 이 머신에서 계산할 샤드 번호 (기본값은 전체)
+    반환값: 저장한 부분 집계 파일 경로 목록
+    """
+    plan = plan_shards(row_count(raw_path, cache_dir), shards)
+    indexes = range(len(plan)) if indexes is None else [index for index in indexes if index < len(plan)]
+    paths = []
+    if not indexes:
+        return []
+    with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(indexes))) as executor:
+        futures = {index: executor.submit(map_shard, raw_path, *plan[index], cache_dir) for index in indexes}
+        for index, future in futures.items():
+            path = partial_path(partial_dir, scenario, index, len(plan))
+            write_partial(future.result(), path)
+            paths.append(path)
+            if on_result:
+                on_result(index, plan[index], path)
+    return paths
+
+
+def reduce_partials(scenario: str, partial_dir: str = PARTIAL_DIR) -> ShardPartial:
+    """
+    partial_dir/<scenario>/의 샤드 부분 집계를 시간 순서로 합침 (빠진 샤드가 있으면 FileNotFoundError)
+    """
+    paths = sorted(glob.glob(os.path.join(partial_dir, scenario, "shard-*-of-*.pkl")))
+    if not paths:
+        raise FileNotFoundError(f"샤드 부분 집계가 없습니다: {os.path.join(partial_dir, scenario)}")
+    shards = int(os.path.basename(paths[0]).split("-of-")[1].split(".")[0])
+    missing = [index for index in range(shards) if partial_path(partial_dir, scenario, index, shards) not in paths]
+    if missing:
+        raise FileNotFoundError(f"아직 계산되지 않은 샤드: {missing}")
+
+    result = None
+    for index in range(shards):
+        with open(partial_path(partial_dir, scenario, index, shards), "rb") as f:
+            partial = pickle.load(f)
+        result = partial if result is None else result.merge(partial)
+    return result
+
+
+def run(raw_path: str, shards: int = None, workers: int = None, cache_dir: str = None) -> ShardPartial:
+    """
+    한 머신에서 샤드 계산과 병합을 한 번에 수행 (파일 없이 프로세스 간에 부분 집계만 전달)
+    """
+    shards = shards or os.cpu_count() or 1
+    plan = plan_shards(row_count(raw_path, cache_dir), shards)
+    with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(plan))) as executor:
+        partials = [future.result() for future in
+                    [executor.submit(map_shard, raw_path, start, stop, cache_dir) for start, stop in plan]]
+    result = partials[0]
+    for partial in partials[1:]:
+        result.merge(partial)
+    return result
@@ -0,0 +1,303 @@
+import contextlib
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+
+# 📌 배치 작업의 여러 프로세스가 같은 캐시를 쓰므로 index.json 갱신과 정리는 파일 잠금으로 보호
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+import numpy as np
+import pandas as pd
+
+from . import metrics
+
+# 📌 파싱된 엑셀 시트를 열 단위 .npy 파일로 저장하는 캐시 디렉토리
+CACHE_DIR = os.getenv("REPORT_CACHE_DIR", os.path.join(os.path.dirname(__file__), "..", "..", ".cache", "sheets"))
+# 캐시 전체 크기 상한 (0 이하이면 캐시 사용 안 함)
+CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+# 최근 이 시간(초) 안에 사용된 항목은 다른 프로세스가 메모리 매핑 중일 수 있으므로 상한을 넘어도 삭제하지 않음
+CACHE_EVICT_GRACE = float(os.getenv("REPORT_CACHE_EVICT_GRACE", 600))
+
+INDEX_FILE = "index.json"
+LOCK_FILE = "index.lock"
+META_FILE = "meta.pkl"
+
+_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def _cache_lock(cache_dir: str):
+    """
+    캐시 디렉토리 단위의 배타 잠금 (같은 프로세스의 스레드와 다른 프로세스 모두 대기)
+    """
+    with _lock, open(os.path.join(cache_dir, LOCK_FILE), "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK은 10초 동안 재시도 후 실패하므로 잠길 때까지 반복
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _touch(cache_dir: str, key: str):
+    """
+    항목의 최근 사용 시각 갱신 (LRU 순서와 삭제 유예 기준)
+    """
+    try:
+        os.utime(os.path.join(cache_dir, key))
+    except OSError:
+        pass
+
+
+def _in_use(path: str, now: float) -> bool:
+    try:
+        return now - os.stat(path).st_mtime < CACHE_EVICT_GRACE
+    except OSError:
+        return False
+
+
+def file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    파일 내용의 sha256 해시
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_index(cache_dir: str) -> dict:
+    try:
+        with open(os.path.join(cache_dir, INDEX_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(cache_dir: str, index: dict):
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(tmp_path, os.path.join(cache_dir, INDEX_FILE))
+
+
+def content_key(path: str, cache_dir: str = None) -> str:
+    """
+    원본 파일의 내용 해시를 캐시 키로 반환
+    mtime과 크기가 그대로면 저장된 해시를 재사용하고, 바뀌었으면 다시 해시를 계산
+    해시가 바뀐 경우 이전 해시의 캐시 항목은 바로 삭제
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    source = os.path.abspath(path)
+    stat = os.stat(source)
+
+    with _cache_lock(cache_dir):
+        entry = _load_index(cache_dir).get(source)
+    if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+        return entry["sha256"]
+
+    # 해시 계산은 잠금 밖에서 (큰 파일을 해시하는 동안 다른 프로세스가 기다리지 않도록)
+    sha256 = file_digest(source)
+    with _cache_lock(cache_dir):
+        # 잠금을 다시 잡은 뒤 최신 index를 읽어 다른 프로세스의 갱신을 잃지 않음
+        index = _load_index(cache_dir)
+        previous = index.get(source)
+        index[source] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha256}
+        if previous and previous["sha256"] != sha256 and all(e["sha256"] != previous["sha256"] for e in index.values()):
+            # 다른 프로세스가 아직 사용 중일 수 있는 항목은 남겨 두고 이후 evict에서 정리
+            stale = os.path.join(cache_dir, previous["sha256"])
+            if not _in_use(stale, time.time()):
+                shutil.rmtree(stale, ignore_errors=True)
+        _save_index(cache_dir, index)
+    return sha256
+
+
+def _sheet_dir(cache_dir: str, key: str, sheet: str) -> str:
+    sheet_key = hashlib.md5(sheet.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(cache_dir, key, sheet_key)
+
+
+def _write_sheet(directory: str, sheet: str, frame: pd.DataFrame):
+    """
+    DataFrame을 열마다 하나의 .npy 파일로 저장 (임시 디렉토리에 쓴 뒤 교체)
+    """
+    parent = os.path.dirname(directory)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, suffix=".tmp")
+    try:
+        for i in range(frame.shape[1]):
+            values = frame.iloc[:, i].to_numpy()
+            np.save(os.path.join(tmp_dir, f"c{i:04d}.npy"), values, allow_pickle=values.dtype.hasobject)
+        with open(os.path.join(tmp_dir, META_FILE), "wb") as f:
+            pickle.dump({"sheet": sheet, "columns": frame.columns, "index": frame.index}, f)
+        try:
+            os.rename(tmp_dir, directory)
+        except OSError:
+            # 다른 프로세스가 먼저 같은 시트를 저장한 경우
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def _read_sheet(directory: str) -> pd.DataFrame:
+    """
+    저장된 열 파일을 메모리 매핑으로 읽어 DataFrame 구성 (object 열은 pickle로 읽음)
+    """
+    with open(os.path.join(directory, META_FILE), "rb") as f:
+        meta = pickle.load(f)
+    columns = {}
+    for i in range(len(meta["columns"])):
+        path = os.path.join(directory, f"c{i:04d}.npy")
+        try:
+            columns[i] = np.load(path, mmap_mode="r")
+        except ValueError:
+            columns[i] = np.load(path, allow_pickle=True)
+    # copy=False: 열마다 메모리 매핑 배열을 그대로 블록으로 사용 (합쳐서 복사하지 않음)
+    frame = pd.DataFrame(columns, index=meta["index"], copy=False)
+    frame.columns = meta["columns"]
+    return frame
+
+
+def read_columns(excel_path: str, sheet: str, columns: list, cache_dir: str = None) -> dict:
+    """
+    시트의 필요한 열만 {열 이름: 배열}로 반환 (read_sheets와 같은 값)
+    캐시된 열 파일을 메모리 매핑하므로 잘라 쓰는 행 범위만 실제로 읽힘 (샤드 처리용)
+    """
+    if CACHE_MAX_BYTES > 0:
+        cache_dir = cache_dir or CACHE_DIR
+        os.makedirs(cache_dir, exist_ok=True)
+        key = content_key(excel_path, cache_dir)
+        directory = _sheet_dir(cache_dir, key, sheet)
+        try:
+            with open(os.path.join(directory, META_FILE), "rb") as f:
+                names = list(pickle.load(f)["columns"])
+            result = dict()
+            for column in columns:
+                path = os.path.join(directory, f"c{names.index(column):04d}.npy")
+                try:
+                    result[column] = np.load(path, mmap_mode="r")
+                except ValueError:
+                    result[column] = np.load(path, allow_pickle=True)
+            # 메모리 매핑한 항목이 다른 프로세스의 정리 대상이 되지 않도록 사용 시각 갱신
+            _touch(cache_dir, key)
+            metrics.cache_result("sheet", True)
+            return result
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            # 캐시에 시트나 열이 없으면 read_sheets로 다시 읽음 (없는 열은 아래에서 KeyError)
+            pass
+
+    frame = read_sheets(excel_path, [sheet], cache_dir)[sheet]
+    return {column: frame[column].to_numpy() for column in columns}
+
+
+def _directory_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def evict(cache_dir: str = None, max_bytes: int = None, keep: str = None):
+    """
+    캐시 크기가 상한을 넘으면 가장 오래 사용하지 않은 항목부터 삭제하고 index.json에서도 제거
+    keep: 지금 사용 중인 캐시 키 (상한을 넘어도 삭제하지 않음)
+    CACHE_EVICT_GRACE 안에 사용된 항목은 다른 프로세스가 열어 두었을 수 있으므로 삭제하지 않음
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    with _cache_lock(cache_dir):
+        now = time.time()
+        entries = []
+        for entry in os.scandir(cache_dir):
+            if entry.is_dir() and not entry.name.endswith(".tmp"):
+                entries.append((entry.stat().st_mtime, _directory_size(entry.path), entry.name))
+
+        total = sum(size for _, size, _ in entries)
+        removed = set()
+        for used, size, key in sorted(entries):
+            if total <= max_bytes or now - used < CACHE_EVICT_GRACE:
+                # 이후 항목은 모두 더 최근에 사용됨
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(os.path.join(cache_dir, key), ignore_errors=True)
+            removed.add(key)
+            total -= size
+
+        if removed:
+            index = _load_index(cache_dir)
+            _save_index(cache_dir, {source: entry for source, entry in index.items() if entry["sha256"] not in removed})
+
+
+def read_sheets(excel_path: str, sheet_names: list, cache_dir: str = None) -> dict:
+    """
+    pd.read_excel(sheet_name=[...], na_values='-') 후 fillna(0)한 결과와 같은 시트 dict를 반환
+    처음 읽는 시트만 엑셀을 파싱해 캐시에 저장하고, 이후에는 캐시를 메모리 매핑으로 읽음
+    """
+    if CACHE_MAX_BYTES <= 0:
+        metrics.inc("report_bytes_read_total", os.path.getsize(excel_path), source="excel")
+        return _parse(excel_path, sheet_names)
+
+    cache_dir = cache_dir or CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    key = content_key(excel_path, cache_dir)
+
+    sheets = dict()
+    missing = []
+    for sheet in sheet_names:
+        directory = _sheet_dir(cache_dir, key, sheet)
+        try:
+            sheets[sheet] = _read_sheet(directory)
+            metrics.inc("report_bytes_read_total", _directory_size(directory), source="sheet_cache")
+        except (OSError, EOFError, pickle.UnpicklingError):
+            missing.append(sheet)
+        metrics.cache_result("sheet", sheet not in missing)
+
+    if missing:
+        metrics.inc("report_bytes_read_total", os.path.getsize(excel_path), source="excel")
+        parsed = _parse(excel_path, missing)
+        for sheet in missing:
+            _write_sheet(_sheet_dir(cache_dir, key, sheet), sheet, parsed[sheet])
+            sheets[sheet] = parsed[sheet]
+
+    # 최근 사용 시각 갱신 (LRU) - 방금 저장한 항목이 가장 오래된 항목으로 삭제되지 않도록 정리 전에 갱신
+    _touch(cache_dir, key)
+    if missing:
+        evict(cache_dir, keep=key)
+
+    return {sheet: sheets[sheet] for sheet in sheet_names}
+
+
+def _parse(excel_path: str, sheet_names: list) -> dict:
+    sheets = pd.read_excel(excel_path, sheet_name=list(sheet_names), na_values='-')
+    for sheet in sheets:
+        sheets[sheet] = sheets[sheet].fillna(0)
+    return sheets
@@ -0,0 +1,99 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+# 📌 정적 리포트 스냅샷 저장 위치 (outputs/snapshots/<base_name>/<version>/)
+SNAPSHOT_DIR = os.path.join("outputs", "snapshots")
+
+INDEX_FILE = "index.html"
+
+# 📌 새 버전으로 바뀐 뒤 이전 버전 스냅샷을 남겨 두는 시간 [s] (이미 열린 페이지가 섹션 파일을 마저 받을 수 있도록)
+SNAPSHOT_KEEP_SECONDS = float(os.getenv("SNAPSHOT_KEEP_SECONDS", 600))
+
+
+def version(report_version: str, render_version: str) -> str:
+    """
+    스냅샷 버전 - 입력 파일(report_version)과 템플릿/매핑(render_version) 중 하나라도 바뀌면 달라짐
+    """
+    return hashlib.sha256(f"{report_version}:{render_version}".encode("utf-8")).hexdigest()[:16]
+
+
+def directory(base_name: str, snapshot_version: str, snapshot_dir: str = SNAPSHOT_DIR) -> str:
+    return os.path.join(snapshot_dir, base_name, snapshot_version)
+
+
+def find(base_name: str, snapshot_version: str, snapshot_dir: str = SNAPSHOT_DIR):
+    """
+    해당 버전의 스냅샷 index.html 경로 (없으면 None)
+    """
+    path = os.path.join(directory(base_name, snapshot_version, snapshot_dir), INDEX_FILE)
+    return path if os.path.exists(path) else None
+
+
+def write(base_name: str, snapshot_version: str, html: str, files: dict, snapshot_dir: str = SNAPSHOT_DIR) -> str:
+    """
+    index.html과 데이터 파일({상대 경로: str 또는 bytes})을 임시 디렉토리에 모두 쓴 뒤 rename 한 번으로 공개
+    버전 경로는 내용이 바뀌지 않으므로 이미 있는 버전은 덮어쓰지 않음 (동시에 쓴 쪽이 먼저 공개한 디렉토리 사용)
+    같은 시나리오의 이전 버전은 SNAPSHOT_KEEP_SECONDS가 지난 뒤 prune에서 삭제
+    """
+    target = directory(base_name, snapshot_version, snapshot_dir)
+    parent = os.path.dirname(target)
+    os.makedirs(parent, exist_ok=True)
+
+    if not os.path.isdir(target):
+        tmp_dir = tempfile.mkdtemp(dir=parent, suffix=".tmp")
+        try:
+            for name, content in {**files, INDEX_FILE: html}.items():
+                path = os.path.join(tmp_dir, name)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if isinstance(content, str):
+                    content = content.encode("utf-8")
+                with open(path, "wb") as f:
+                    f.write(content)
+            os.rename(tmp_dir, target)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not os.path.isdir(target):
+                raise
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+    # 디렉토리 mtime = 현재 버전이 된 시각 (이전 버전이 다시 현재 버전이 된 경우 포함)
+    os.utime(target)
+
+    prune(parent)
+    return os.path.join(target, INDEX_FILE)
+
+
+def prune(parent: str, keep_seconds: float = SNAPSHOT_KEEP_SECONDS):
+    """
+    시나리오 디렉토리에서 더 새로운 버전으로 바뀐 지 keep_seconds가 지난 버전을 삭제
+    삭제할 디렉토리는 먼저 다른 이름으로 옮긴 뒤 지우므로 일부만 지워진 버전이 버전 경로로 보이지 않음
+    """
+    versions = []
+    for name in os.listdir(parent):
+        path = os.path.join(parent, name)
+        if name.endswith(".old"):
+            # 이전에 옮겨 놓고 지우지 못한 디렉토리
+            shutil.rmtree(path, ignore_errors=True)
+        elif not name.endswith(".tmp") and os.path.isdir(path):
+            try:
+                versions.append((os.stat(path).st_mtime, name))
+            except OSError:
+                continue
+    versions.sort()
+
+    now = time.time()
+    # 각 버전은 바로 다음(더 새로운) 버전이 현재 버전이 된 시각에 교체됨
+    for (_, name), (replaced, _) in zip(versions, versions[1:]):
+        if now - replaced < keep_seconds:
+            continue
+        path = os.path.join(parent, name)
+        aside = f"{path}.{os.getpid()}.old"
+        try:
+            os.rename(path, aside)
+        except OSError:
+            continue
+        shutil.rmtree(aside, ignore_errors=True)
@@ -0,0 +1,64 @@
+import argparse
+import os
+import sys
+import time
+
+from server.service import resultbuilder
+from server.service import shard
+
+# 📌 기본 입력 디렉토리 (Excel 파일 저장 위치)
+DATA_DIRECTORY = os.path.join(os.path.dirname(__file__), "server", "data")
+
+
+def print_shard(index, rows, path):
+    print(f"✅ 샤드 {index} [{rows[0]}, {rows[1]}) → {path}")
+    sys.stdout.flush()
+
+
+def write_result(result, base_name: str, output_dir: str) -> str:
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{base_name}.shards.json")
+    resultbuilder.dump(result.summary(), path)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="긴 실행 하나(<base>_Raw.xlsx)를 시간축 샤드로 나눠 병렬 계산한 뒤 합침")
+    parser.add_argument("base_name", help="시나리오 이름 (<base>_Raw.xlsx)")
+    parser.add_argument("-d", "--directory", default=DATA_DIRECTORY, help="엑셀 파일 디렉토리")
+    parser.add_argument("-o", "--output-dir", default="outputs", help="합친 결과 저장 디렉토리")
+    parser.add_argument("-s", "--shards", type=int, default=os.cpu_count() or 1, help="샤드 수 (기본값: CPU 코어 수)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="작업 프로세스 수 (기본값: CPU 코어 수)")
+    parser.add_argument("--partials", default=None,
+                        help="부분 집계 공유 디렉토리 (지정하면 샤드 결과를 파일로 저장, 여러 머신에서 나눠 실행할 때 사용)")
+    parser.add_argument("--only", type=int, nargs="+", default=None, help="이 머신에서 계산할 샤드 번호 (--partials와 함께 사용)")
+    parser.add_argument("--reduce", action="store_true", help="계산하지 않고 --partials의 부분 집계만 합침")
+    args = parser.parse_args()
+
+    raw_path = os.path.join(args.directory, f"{args.base_name}_Raw.xlsx")
+    if not args.reduce and not os.path.exists(raw_path):
+        print(f"❌ 파일을 찾을 수 없습니다: {raw_path}")
+        sys.exit(1)
+    if (args.only or args.reduce) and not args.partials:
+        print("❌ --only/--reduce는 --partials와 함께 사용해야 합니다.")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    if args.partials is None:
+        print(f"🧩 {args.base_name}: 샤드 {args.shards}개로 계산")
+        result = shard.run(raw_path, args.shards, args.workers)
+    else:
+        if not args.reduce:
+            print(f"🧩 {args.base_name}: 샤드 {args.shards}개 중 {args.only or '전체'} 계산 → {args.partials}")
+            shard.run_map(raw_path, args.base_name, args.shards, args.only, args.partials, args.workers, on_result=print_shard)
+        if args.only and not args.reduce:
+            print(f"📊 완료 ({time.perf_counter() - start:.2f}s) - 모든 샤드가 끝나면 --reduce로 합치세요.")
+            sys.exit(0)
+        try:
+            result = shard.reduce_partials(args.base_name, args.partials)
+        except FileNotFoundError as e:
+            print(f"⚠️ {e}")
+            sys.exit(1)
+
+    print(f"📊 완료: {result.frames} 행, PET {result.pet_count}건, 총 {time.perf_counter() - start:.2f}s")
+    print(f"💾 저장 완료 → {write_result(result, args.base_name, args.output_dir)}")
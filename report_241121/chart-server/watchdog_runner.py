@@ -1,107 +1,67 @@
 import time
-import subprocess
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import os
-import sys
-import re
+import uvicorn
+
+from server.main import app, write_snapshot
+from server.service import reportmodel
+from server.service.ingest import IngestQueue
+from server.service.registry import scenarios
 
 # 📌 감시할 디렉토리 설정 (Excel 파일 저장 위치)
 WATCH_DIRECTORY = os.path.join(os.path.dirname(__file__), "server", "data")
 
-# 감지된 파일을 저장할 딕셔너리
-detected_files = {}
-
 # 🌎 유저가 접속할 서버 URL (포트는 변경 가능)
 HOST = "127.0.0.1"
 PORT = 8000  # 필요하면 다른 포트로 변경 가능
 
-class ExcelFileHandler(FileSystemEventHandler):
-    def on_created(self, event):
-        if event.is_directory:
-            return
-        
-        file_path = event.src_path
-        file_name = os.path.basename(file_path)
-
-        # `_Raw.xlsx` 또는 `.xlsx` 파일인지 확인
-        if file_name.endswith(".xlsx"):
-            base_name = file_name.replace("_Raw.xlsx", "").replace(".xlsx", "")
-
-            # 파일 감지 기록
-            if base_name not in detected_files:
-                detected_files[base_name] = set()
-            
-            detected_files[base_name].add(file_name)
-
-            # `_Raw.xlsx`와 `.xlsx` 두 개의 파일이 존재하면 실행
-            if f"{base_name}.xlsx" in detected_files[base_name] and f"{base_name}_Raw.xlsx" in detected_files[base_name]:
-                print(f"✅ {base_name}.xlsx & {base_name}_Raw.xlsx 감지 완료! 서버 실행")
-                self.run_python_server(base_name)
-                # 실행 후 해당 파일 세트 제거 (다시 감지 가능하도록)
-                del detected_files[base_name]
+def process_pair(base_name, data_dir):
+    # 작업 스레드에서 실행: 리포트를 미리 계산하고 실행 중인 서버에 시나리오 등록 (서버 재시작 없음)
+    start = time.time()
+    reportmodel.get_report(base_name, output_dir="outputs", data_dir=data_dir)
+    scenarios.register(base_name, data_dir)
+    # 정적 스냅샷을 만들어 두면 이후 요청은 파일 전송만 함
+    write_snapshot(base_name)
+    print(f"✅ {base_name}.xlsx & {base_name}_Raw.xlsx 처리 완료 ({time.time() - start:.2f}s)")
+    print(f"🌎 브라우저에서 접근 가능: http://{HOST}:{PORT}/report/{base_name}")
 
-    def run_python_server(self, base_name):
-        
-        # base_name에서 fzp_base_name 추출
-        fzp_base_name = base_name
-        
-        print(f"🔄 Python 리포팅 서버 실행 중... (파일: {fzp_base_name}.fzp, {base_name}.xlsx, {base_name}_Raw.xlsx)")
 
-        # 환경 변수에 BASE_NAME, FZP_BASE_NAME 저장
-        env = os.environ.copy()
-        env["BASE_NAME"] = base_name
-        env["FZP_BASE_NAME"] = fzp_base_name 
-
-        # 서버 URL 출력
-        server_url = f"http://{HOST}:{PORT}"
-        print(f"🌎 브라우저에서 접근 가능: {server_url}")
+class ExcelFileHandler(FileSystemEventHandler):
+    """
+    생성/수정/이동 이벤트를 ingest 큐에 기록만 함 (무거운 작업은 큐의 작업 스레드에서 처리)
+    """
+    def __init__(self, ingest):
+        self.ingest = ingest
 
-        # `uvicorn` 실행
-        process = subprocess.Popen(
-            ["poetry", "run", "uvicorn", "server.main:app", "--reload", "--host", HOST, "--port", str(PORT)],
-            env=env,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1  # 한 줄씩 출력
-        )
+    def on_created(self, event):
+        if not event.is_directory:
+            self.ingest.touch(event.src_path)
 
-        # stdout & stderr을 실시간으로 읽어서 출력
-        while True:
-            output = process.stdout.readline()
-            if output:
-                print(f"📝 서버 로그: {output.strip()}")
-                sys.stdout.flush()  # 즉시 출력
-            
-            error = process.stderr.readline()
-            if error:
-                if "ERROR" in error or "CRITICAL" in error:
-                    print(f"⚠️ 서버 오류: {error.strip()}")  # 진짜 오류
-                else:
-                    print(f"📝 서버 로그: {error.strip()}")  # INFO, DEBUG는 일반 로그로 출력
-                sys.stdout.flush()  # 즉시 출력
-            
-            # 프로세스 종료 감지
-            if process.poll() is not None:
-                break
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.ingest.touch(event.src_path)
 
-        process.stdout.close()
-        process.stderr.close()
+    def on_moved(self, event):
+        # 임시 파일로 쓴 뒤 이름을 바꾸는 경우 최종 이름 기준
+        if not event.is_directory:
+            self.ingest.touch(event.dest_path)
 
 
 if __name__ == "__main__":
-    event_handler = ExcelFileHandler()
+    ingest = IngestQueue(process_pair).start()
+    event_handler = ExcelFileHandler(ingest)
     observer = Observer()
     observer.schedule(event_handler, WATCH_DIRECTORY, recursive=False)
     
     print(f"👀 감시 시작: {WATCH_DIRECTORY}")
     observer.start()
-    
+
+    # 📌 리포팅 서버는 한 번만 실행 (새 파일 쌍은 같은 프로세스에서 등록)
+    print(f"🔄 Python 리포팅 서버 실행 중... http://{HOST}:{PORT}")
     try:
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
+        uvicorn.run(app, host=HOST, port=PORT)
+    finally:
         observer.stop()
-    
-    observer.join()
+        observer.join()
+        ingest.stop(timeout=5)